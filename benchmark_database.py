@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+SQLite throughput benchmark: concurrent writers and readers in several processes,
+pooled WAL connections vs. a new rollback-journal connection per call
+"""
+import sys
+import os
+import time
+import sqlite3
+import logging
+import tempfile
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# Add src to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.database import PlaylistDatabase
+
+
+class PerCallDatabase(PlaylistDatabase):
+    """The previous behaviour: connect, use and close on every call"""
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def get_connection(self):
+        conn = self._connect()
+        try:
+            yield conn
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
+
+
+MODES = {'per-call': PerCallDatabase, 'pooled WAL': PlaylistDatabase}
+
+
+class ErrorCounter(logging.Handler):
+    """Counts the errors the database layer logs instead of raising"""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+
+
+def worker(mode: str, db_path: str, writers: int, readers: int, seconds: float, results):
+    """One process (think API or bot): writer threads log API usage, readers sum the quota ledger"""
+    errors = ErrorCounter()
+    logging.getLogger('src.database').addHandler(errors)
+    logging.getLogger('src.database').propagate = False
+    database = MODES[mode](db_path)
+    since = (datetime.utcnow() - timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S')
+
+    counts = {'writes': 0, 'reads': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def write():
+        done = 0
+        while time.perf_counter() < deadline:
+            database.log_api_usage('youtube', 'videos.list', cost_estimate=1, account='bench')
+            done += 1
+        with lock:
+            counts['writes'] += done
+
+    def read():
+        done = 0
+        while time.perf_counter() < deadline:
+            database.get_quota_used('youtube', since)
+            database.get_playlist_history(limit=10)
+            done += 1
+        with lock:
+            counts['reads'] += done
+
+    threads = [threading.Thread(target=write) for _ in range(writers)]
+    threads += [threading.Thread(target=read) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.put((counts['writes'], counts['reads'], errors.count))
+
+
+def run(mode: str, processes: int, writers: int, readers: int, seconds: float):
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, 'bench.db')
+        MODES[mode](db_path)  # create the schema up front
+
+        results = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(target=worker, args=(mode, db_path, writers, readers, seconds, results))
+            for _ in range(processes)
+        ]
+        for process in workers:
+            process.start()
+        totals = [results.get() for _ in workers]
+        for process in workers:
+            process.join()
+
+    writes = sum(t[0] for t in totals)
+    reads = sum(t[1] for t in totals)
+    errors = sum(t[2] for t in totals)
+    print(f"{mode:<12} {writes / seconds:10,.0f} writes/s {reads / seconds:10,.0f} reads/s  ({errors} errors)")
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    processes, writers, readers = 2, 4, 4
+
+    print(f"🗄️  SQLite benchmark ({processes} processes x {writers} writers + {readers} readers, {seconds:g}s each)")
+    print("=" * 50)
+    for mode in MODES:
+        run(mode, processes, writers, readers, seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: import time of each entry point and first-request latency
+"""
+import sys
+import os
+import json
+import subprocess
+import tempfile
+import logging
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Modules whose import used to dominate startup
+HEAVY_MODULES = ['openai', 'googleapiclient.discovery', 'google_auth_oauthlib.flow']
+
+# Runs in a fresh interpreter so every measurement starts cold
+PROBE = r'''
+import sys, json, time
+timings = {}
+start = time.perf_counter()
+import importlib
+importlib.import_module(sys.argv[1])
+timings['import'] = time.perf_counter() - start
+loaded = [name for name in sys.argv[2].split(',') if name in sys.modules]
+
+if sys.argv[3] == 'first-request':
+    from src.playlist_core import PlaylistGenerator
+
+    start = time.perf_counter()
+    generator = PlaylistGenerator(youtube_api_key='benchmark', openai_api_key='benchmark')
+    timings['construct'] = time.perf_counter() - start
+
+    # Build (but do not send) the first request of a playlist: a videos.list call
+    start = time.perf_counter()
+    with generator._service() as youtube:
+        youtube.videos().list(part='snippet,contentDetails', id='dQw4w9WgXcQ')
+    timings['first_request'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with generator._service() as youtube:
+        youtube.videos().list(part='snippet,contentDetails', id='dQw4w9WgXcQ')
+    timings['second_request'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    generator.openai_client
+    timings['openai_client'] = time.perf_counter() - start
+
+    from googleapiclient.discovery import build
+    start = time.perf_counter()
+    build('youtube', 'v3', developerKey='benchmark')
+    timings['discovery_build'] = time.perf_counter() - start
+
+print(json.dumps({'timings': timings, 'loaded': loaded}))
+'''
+
+
+def probe(module: str, mode: str = 'import', repeat: int = 3):
+    """Best-of-N timings for importing `module` in a fresh interpreter"""
+    env = dict(os.environ, PYTHONPATH=ROOT, YOUTUBE_API_KEY='benchmark')
+    best = None
+    # Run from a scratch directory so the benchmark never touches playlists.db or .env
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(repeat):
+            output = subprocess.run(
+                [sys.executable, '-c', PROBE, module, ','.join(HEAVY_MODULES), mode],
+                cwd=workdir, env=env, capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            if best is None or result['timings']['import'] < best['timings']['import']:
+                best = result
+    return best
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    print(f"🚀 Startup benchmark (best of {repeat} cold starts)")
+    print("=" * 50)
+    for module in ['src.playlist_core', 'src.api', 'src.bot']:
+        result = probe(module, repeat=repeat)
+        loaded = ', '.join(result['loaded']) or 'none'
+        print(f"import {module:<22} {result['timings']['import'] * 1000:8.1f} ms  (heavy modules loaded: {loaded})")
+
+    result = probe('src.playlist_core', mode='first-request', repeat=repeat)
+    timings = result['timings']
+    print()
+    print(f"{'PlaylistGenerator()':<29} {timings['construct'] * 1000:8.1f} ms")
+    print(f"{'first request (cold service)':<29} {timings['first_request'] * 1000:8.1f} ms")
+    print(f"{'second request':<29} {timings['second_request'] * 1000:8.1f} ms")
+    print(f"{'first OpenAI client access':<29} {timings['openai_client'] * 1000:8.1f} ms")
+    print(f"{'build() for comparison':<29} {timings['discovery_build'] * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
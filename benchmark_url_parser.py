@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for YouTube URL -> video ID extraction
+"""
+import sys
+import os
+import random
+import string
+import time
+import logging
+
+# Add src to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.url_parser import extract_video_ids, find_youtube_urls
+
+URL_TEMPLATES = [
+    "https://www.youtube.com/watch?v={id}",
+    "https://youtube.com/watch?v={id}&t=42s",
+    "https://m.youtube.com/watch?feature=share&v={id}",
+    "https://www.youtube.com/watch?v={id}&list=PL590L5WQmH8fJ54F369BLDSqIwcs-TCfs&index=3",
+    "https://youtu.be/{id}?t=90",
+    "youtu.be/{id}",
+    "https://www.youtube.com/shorts/{id}",
+    "https://www.youtube.com/embed/{id}?start=10",
+    "https://www.youtube.com/live/{id}?si=abcdef",
+    "https://music.youtube.com/watch?v={id}&feature=share",
+    "https://www.youtube-nocookie.com/embed/{id}",
+    "https://example.com/watch?v={id}",
+    "not a url at all",
+]
+
+
+def random_video_id(rng: random.Random) -> str:
+    return ''.join(rng.choice(string.ascii_letters + string.digits + '-_') for _ in range(11))
+
+
+def build_urls(count: int, seed: int = 42):
+    """Build a mixed list of URLs; roughly 1 in 5 repeats an earlier video"""
+    rng = random.Random(seed)
+    ids = []
+    urls = []
+    for _ in range(count):
+        if ids and rng.random() < 0.2:
+            video_id = rng.choice(ids)
+        else:
+            video_id = random_video_id(rng)
+            ids.append(video_id)
+        urls.append(rng.choice(URL_TEMPLATES).format(id=video_id))
+    return urls
+
+
+def bench(name, func, arg, count: int, repeat: int = 5):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(arg)
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:<28} {best * 1000:8.1f} ms  ({count / best:,.0f} URLs/s)  -> {len(result):,} results")
+    return result
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    urls = build_urls(count)
+    text = "\n".join(urls)
+
+    print(f"🔗 URL extraction benchmark ({count:,} mixed URLs)")
+    print("=" * 50)
+    bench("extract_video_ids(urls)", extract_video_ids, urls, count)
+    bench("find_youtube_urls(text)", find_youtube_urls, text, count)
+
+
+if __name__ == "__main__":
+    main()
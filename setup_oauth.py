@@ -6,6 +6,7 @@ Setup script for YouTube OAuth2 authentication
 import os
 import sys
 import json
+import argparse
 from src.youtube_auth import YouTubeAuth
 from src.config import get_settings
 from dotenv import load_dotenv
@@ -14,11 +15,19 @@ load_dotenv()
 
 
 def main():
+    settings = get_settings()
+    
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--token-file",
+        default=settings.oauth_token_file,
+        help="Where to save the token; use one file per YOUTUBE_ACCOUNTS entry"
+    )
+    args = parser.parse_args()
+    
     print("🔐 YouTube OAuth2 Setup")
     print("=" * 50)
     
-    settings = get_settings()
-    
     # Check if we have client ID and secret in .env
     if not settings.youtube_client_id or settings.youtube_client_id == "your_client_id_here":
         print("\n❌ YouTube OAuth credentials not found in .env file!")
@@ -33,7 +42,12 @@ def main():
         return
     
     # Create credentials.json from .env values
-    auth = YouTubeAuth()
+    # Only the primary token file takes over an old token.pickle; any other
+    # account must go through its own consent flow
+    auth = YouTubeAuth(
+        token_file=args.token_file,
+        legacy_token_file=settings.get_legacy_token_file(args.token_file)
+    )
     
     print(f"\n✅ Found OAuth credentials in .env")
     print(f"Client ID: {settings.youtube_client_id[:30]}...")
@@ -54,7 +68,7 @@ def main():
     try:
         credentials = auth.authenticate()
         print("\n✅ Authentication successful!")
-        print("Token saved to token.pickle")
+        print(f"Token saved to {args.token_file}")
         
         # Test the authentication
         youtube = auth.get_youtube_service()
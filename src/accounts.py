@@ -0,0 +1,133 @@
+"""
+Routing YouTube work across several OAuth credentials (Google Cloud projects)
+"""
+import random
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Collection, Dict, List, Optional, Tuple
+
+from .quota import QuotaScheduler, QuotaReservation, QuotaExceededError
+
+logger = logging.getLogger(__name__)
+
+
+class YouTubeAccount:
+    """One credential with its own daily quota and service pool"""
+
+    def __init__(self, name: str, quota: QuotaScheduler, auth=None):
+        self.name = name
+        self.quota = quota
+        self.auth = auth  # YouTubeAuth, or None when calls use the API key
+        self.pool = None  # ServicePool, built on first use
+
+
+# Account the calling code is pinned to, e.g. the owner of the playlist being
+# filled, and the account a single unpinned call was routed to. run_blocking()
+# copies the context into worker threads, so calls made there use them too.
+_pinned_account: ContextVar[Optional[YouTubeAccount]] = ContextVar("pinned_youtube_account", default=None)
+_routed_account: ContextVar[Optional[YouTubeAccount]] = ContextVar("routed_youtube_account", default=None)
+
+
+class AccountRouter:
+    """Picks the account for each piece of YouTube work.
+
+    Unpinned work goes to an account chosen at random, weighted by the quota
+    it has left today, so projects drain at the same pace. A playlist is
+    pinned to the account that created it, since only the owner can change
+    its items.
+    """
+
+    def __init__(self, accounts: List[YouTubeAccount]):
+        if not accounts:
+            raise ValueError("At least one YouTube account is required")
+        self.accounts = accounts
+        self._by_name = {account.name: account for account in accounts}
+
+        self._lock = threading.Lock()
+        self.failovers = 0
+
+    @property
+    def default(self) -> YouTubeAccount:
+        return self.accounts[0]
+
+    def get(self, name: Optional[str]) -> YouTubeAccount:
+        """Account by name; None (playlists from before accounts existed) is the default account"""
+        if name is None:
+            return self.default
+        account = self._by_name.get(name)
+        if account is None:
+            raise ValueError(f"YouTube account '{name}' is not configured")
+        return account
+
+    @staticmethod
+    def pinned_account() -> Optional[YouTubeAccount]:
+        return _pinned_account.get()
+
+    @staticmethod
+    def current() -> Optional[YouTubeAccount]:
+        """Account the calling code is using, if any"""
+        return _routed_account.get() or _pinned_account.get()
+
+    @contextmanager
+    def pinned(self, account: YouTubeAccount):
+        """Send all YouTube calls in a with block through one account"""
+        token = _pinned_account.set(account)
+        try:
+            yield account
+        finally:
+            _pinned_account.reset(token)
+
+    @contextmanager
+    def routed(self, account: YouTubeAccount):
+        """Mark the account a single unpinned call was routed to"""
+        token = _routed_account.set(account)
+        try:
+            yield account
+        finally:
+            _routed_account.reset(token)
+
+    def choose(self, units: int = 1, exclude: Collection[str] = ()) -> YouTubeAccount:
+        """Pick an account with at least `units` left, weighted by remaining quota"""
+        accounts = [account for account in self.accounts if account.name not in exclude]
+        if len(accounts) == 1:
+            # Nothing to route; the account's own scheduler reports a shortfall
+            return accounts[0]
+
+        remaining = [(account, account.quota.remaining()) for account in accounts]
+        candidates = [(account, left) for account, left in remaining if left >= units]
+        if not candidates:
+            raise QuotaExceededError(
+                f"YouTube quota exhausted: {units} units needed, "
+                f"{max((left for _, left in remaining), default=0)} remaining today on any account"
+            )
+        chosen, weights = zip(*candidates)
+        return random.choices(chosen, weights=weights)[0]
+
+    def reserve(self, units: int) -> Tuple[YouTubeAccount, QuotaReservation]:
+        """Reserve units on a routed account, trying the others if it cannot admit them"""
+        tried = set()
+        while True:
+            account = self.choose(units, exclude=tried)
+            try:
+                return account, account.quota.reserve(units)
+            except QuotaExceededError as e:
+                tried.add(account.name)
+                if len(tried) == len(self.accounts):
+                    raise
+                logger.warning(f"YouTube account '{account.name}' cannot take {units} units: {e}")
+
+    def remaining(self) -> int:
+        """Units left today over all accounts"""
+        return sum(account.quota.remaining() for account in self.accounts)
+
+    def record_failover(self, account: YouTubeAccount):
+        """Count a switch away from an account YouTube reported out of quota"""
+        with self._lock:
+            self.failovers += 1
+        logger.warning(f"YouTube account '{account.name}' is out of quota; failing over")
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Return each account's quota budget"""
+        return {account.name: account.quota.stats() for account in self.accounts}
@@ -1,29 +1,35 @@
 """
 FastAPI backend for YouTube playlist generator
 """
-import os
+import asyncio
 import logging
+import threading
 from datetime import datetime
 from typing import Optional
-from fastapi import FastAPI, HTTPException, Query, Depends
+from fastapi import FastAPI, HTTPException, Query, Depends, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from .models import (
     CreatePlaylistRequest,
+    UpdatePlaylistRequest,
     ValidateVideosRequest,
     PlaylistResponse,
+    PlaylistUpdateResponse,
     ValidateVideosResponse,
     PlaylistHistoryResponse,
     StatsResponse,
     HealthResponse,
+    MetricsResponse,
+    JobResponse,
     ErrorResponse,
     VideoInfo as VideoInfoModel
 )
-from .playlist_core import PlaylistGenerator, VideoInfo
+from .playlist_core import PlaylistGenerator, VideoInfo, IdempotencyConflictError
+from .quota import QuotaExceededError
 from .config import get_settings
-from .youtube_auth import YouTubeAuth
-from .database import db
+from .token_store import TokenStore
+from .database import db, AsyncPlaylistDatabase, history_cursor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -41,6 +47,9 @@ app = FastAPI(
 # Global settings
 settings = get_settings()
 
+# Endpoints query the database through this so the event loop never waits on SQLite
+async_db = AsyncPlaylistDatabase(db, max_workers=settings.database_max_workers)
+
 # Configure CORS
 origins = settings.get_allowed_origins_list()
 app.add_middleware(
@@ -53,21 +62,86 @@ app.add_middleware(
 
 # Initialize playlist generator
 playlist_generator = None
+playlist_generator_lock = threading.Lock()
+
+
+def oauth_configured() -> bool:
+    """Whether a token has been saved for any YouTube account"""
+    return any(
+        TokenStore(token_file, legacy_path=settings.get_legacy_token_file(token_file)).exists()
+        for _, token_file, _ in settings.get_youtube_accounts()
+    )
 
 
 def get_playlist_generator():
     """Get or create playlist generator instance"""
     global playlist_generator
-    if not playlist_generator:
-        use_oauth = os.path.exists('token.pickle')
-        playlist_generator = PlaylistGenerator(
-            youtube_api_key=settings.youtube_api_key,
-            openai_api_key=settings.openai_api_key,
-            use_oauth=use_oauth
-        )
+    if playlist_generator is None:
+        # Sync dependencies run on FastAPI's thread pool, so two requests can get here at once
+        with playlist_generator_lock:
+            if playlist_generator is None:
+                use_oauth = oauth_configured()
+                playlist_generator = PlaylistGenerator(
+                    youtube_api_key=settings.youtube_api_key,
+                    openai_api_key=settings.openai_api_key,
+                    use_oauth=use_oauth
+                )
     return playlist_generator
 
 
+def playlist_response(result) -> PlaylistResponse:
+    """Convert a PlaylistResult to its response model"""
+    return PlaylistResponse(
+        success=result.success,
+        playlist_id=result.playlist_id,
+        playlist_url=result.playlist_url,
+        title=result.title,
+        description=result.description,
+        video_count=result.video_count,
+        videos_added=[
+            VideoInfoModel(
+                video_id=v.video_id,
+                title=v.title,
+                channel=v.channel,
+                duration=v.duration,
+                url=f"https://youtube.com/watch?v={v.video_id}",
+                status=v.status,
+                error=v.error
+            ) for v in (result.videos_added or [])
+        ],
+        videos_skipped=[
+            VideoInfoModel(
+                video_id=v.video_id,
+                title=v.title,
+                channel=v.channel,
+                duration=v.duration,
+                url=f"https://youtube.com/watch?v={v.video_id}",
+                status=v.status,
+                error=v.error
+            ) for v in (result.videos_skipped or [])
+        ],
+        job_id=result.job_id,
+        reused=result.reused,
+        parts=[playlist_response(part) for part in (result.parts or [])],
+        error=result.error
+    )
+
+
+@app.on_event("startup")
+async def resume_playlist_jobs():
+    """Warm up the generator and resume playlist jobs interrupted by a restart"""
+    generator = get_playlist_generator()
+    generator.run_in_background(generator.warm_up())
+    if generator.use_oauth:
+        generator.run_in_background(generator.resume_incomplete_jobs())
+
+
+@app.on_event("shutdown")
+async def close_database_pool():
+    """Stop the database threads"""
+    async_db.shutdown()
+
+
 # Error handler
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
@@ -88,7 +162,7 @@ async def http_exception_handler(request, exc):
 @app.get("/api/health", response_model=HealthResponse, tags=["System"])
 async def health_check():
     """Check API health and configuration status"""
-    youtube_auth = os.path.exists('token.pickle')
+    youtube_auth = oauth_configured()
     
     return HealthResponse(
         status="healthy",
@@ -115,9 +189,19 @@ async def get_version():
 @app.post("/api/v1/playlists", response_model=PlaylistResponse, tags=["Playlists"])
 async def create_playlist(
     request: CreatePlaylistRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(
+        None,
+        max_length=255,
+        description="Repeating a request with the same key returns the playlist it created"
+    ),
     generator: PlaylistGenerator = Depends(get_playlist_generator)
 ):
-    """Create a new YouTube playlist from video URLs"""
+    """Create a new YouTube playlist from video URLs
+    
+    A split request where only some parts were created answers 207 with
+    every part, so the client learns the playlists that do exist.
+    """
     try:
         logger.info(f"Creating playlist with {len(request.videos)} videos")
         
@@ -125,31 +209,62 @@ async def create_playlist(
         result = await generator.create_playlist(
             video_urls=request.videos,
             custom_title=request.title,
-            description=request.description
+            description=request.description,
+            privacy=request.privacy,
+            idempotency_key=idempotency_key,
+            split_size=request.split_size
         )
         
         if not result.success:
-            raise HTTPException(status_code=400, detail=result.error)
+            if not any(part.success for part in result.parts or []):
+                raise HTTPException(status_code=400, detail=result.error)
+            response.status_code = 207
         
         # Convert to response model
-        response = PlaylistResponse(
+        return playlist_response(result)
+        
+    except HTTPException:
+        raise
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except QuotaExceededError as e:
+        logger.warning(f"Rejected playlist request: {e}")
+        raise HTTPException(status_code=429, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error creating playlist: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Update playlist endpoint
+@app.patch("/api/v1/playlists/{playlist_id}", response_model=PlaylistUpdateResponse, tags=["Playlists"])
+async def update_playlist(
+    playlist_id: str,
+    request: UpdatePlaylistRequest,
+    generator: PlaylistGenerator = Depends(get_playlist_generator)
+):
+    """Change a playlist's videos, applying only the inserts, moves and deletes needed"""
+    try:
+        result = await generator.update_playlist(
+            playlist_id,
+            video_urls=request.videos,
+            title=request.title,
+            description=request.description
+        )
+        
+        if not result.success:
+            raise HTTPException(status_code=400 if result.playlist_id else 404, detail=result.error)
+        
+        return PlaylistUpdateResponse(
             success=result.success,
             playlist_id=result.playlist_id,
             playlist_url=result.playlist_url,
             title=result.title,
-            description=result.description,
             video_count=result.video_count,
-            videos_added=[
-                VideoInfoModel(
-                    video_id=v.video_id,
-                    title=v.title,
-                    channel=v.channel,
-                    duration=v.duration,
-                    url=f"https://youtube.com/watch?v={v.video_id}",
-                    status=v.status,
-                    error=v.error
-                ) for v in (result.videos_added or [])
-            ],
+            inserted=result.inserted,
+            moved=result.moved,
+            deleted=result.deleted,
+            quota_used=result.quota_used,
+            quota_saved=result.quota_saved,
             videos_skipped=[
                 VideoInfoModel(
                     video_id=v.video_id,
@@ -164,14 +279,60 @@ async def create_playlist(
             error=result.error
         )
         
-        # TODO: Save to database
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except QuotaExceededError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error updating playlist {playlist_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Get playlist job endpoint
+@app.get("/api/v1/jobs/{job_id}", response_model=JobResponse, tags=["Playlists"])
+async def get_job(job_id: str):
+    """Get the progress of a playlist creation job"""
+    job = await async_db.get_playlist_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    
+    return JobResponse(
+        id=job['id'],
+        status=job['status'],
+        playlist_id=job['youtube_id'],
+        title=job['title'],
+        total_videos=len(job['videos']),
+        inserted_videos=len(job['inserted']),
+        attempts=job['attempts'],
+        error=job['error'],
+        created_at=job['created_at'],
+        updated_at=job['updated_at']
+    )
+
+
+# Resume playlist job endpoint
+@app.post("/api/v1/jobs/{job_id}/resume", response_model=PlaylistResponse, tags=["Playlists"])
+async def resume_job(
+    job_id: str,
+    generator: PlaylistGenerator = Depends(get_playlist_generator)
+):
+    """Resume a failed or interrupted playlist job at its first missing video"""
+    try:
+        result = await generator.resume_job(job_id)
+        
+        if not result.success:
+            raise HTTPException(status_code=409 if result.job_id else 404, detail=result.error)
         
-        return response
+        return playlist_response(result)
         
     except HTTPException:
         raise
+    except QuotaExceededError as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
-        logger.error(f"Error creating playlist: {e}")
+        logger.error(f"Error resuming job {job_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -183,10 +344,13 @@ async def validate_videos(
 ):
     """Validate YouTube video URLs before creating playlist"""
     try:
-        # Extract video IDs
-        video_ids = generator.extract_video_ids(request.videos)
+        # Extract video IDs, expanding playlists and channels as they are validated
+        video_ids = generator.iter_video_ids(request.videos)
+        
+        # Validate videos
+        valid_videos, invalid_videos = await generator.run_blocking(generator.validate_videos, video_ids)
         
-        if not video_ids:
+        if not valid_videos and not invalid_videos:
             return ValidateVideosResponse(
                 success=False,
                 total_count=len(request.videos),
@@ -194,9 +358,6 @@ async def validate_videos(
                 invalid_count=len(request.videos)
             )
         
-        # Validate videos
-        valid_videos, invalid_videos = generator.validate_videos(video_ids)
-        
         # Convert to response model
         return ValidateVideosResponse(
             success=True,
@@ -227,6 +388,8 @@ async def validate_videos(
             invalid_count=len(invalid_videos)
         )
         
+    except QuotaExceededError as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         logger.error(f"Error validating videos: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -237,22 +400,28 @@ async def validate_videos(
 async def get_playlist_history(
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(10, ge=1, le=100, description="Items per page"),
-    user_id: Optional[str] = Query(None, description="Filter by user ID")
+    user_id: Optional[str] = Query(None, description="Filter by user ID"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; replaces page"),
+    include_total: bool = Query(True, description="Include the total number of playlists")
 ):
     """Get playlist creation history"""
     try:
-        # Get playlists from database
+        # Get playlists from database; one extra row tells whether there is a next page
         offset = (page - 1) * per_page
-        playlists = db.get_playlist_history(
+        history = async_db.get_playlist_history(
             user_identifier=user_id,
-            limit=per_page,
+            limit=per_page + 1,
             offset=offset,
-            include_videos=True
+            include_videos=True,
+            after=cursor
         )
+        if include_total:
+            playlists, total = await asyncio.gather(history, async_db.count_playlists(user_id))
+        else:
+            playlists, total = await history, None
         
-        # Get total count for pagination
-        stats = db.get_statistics(user_identifier=user_id)
-        total = stats['total_playlists']
+        has_next = len(playlists) > per_page
+        playlists = playlists[:per_page]
         
         # Convert to response models
         playlist_items = []
@@ -284,10 +453,13 @@ async def get_playlist_history(
             total=total,
             page=page,
             per_page=per_page,
-            has_next=(page * per_page) < total,
-            has_prev=page > 1
+            has_next=has_next,
+            has_prev=page > 1 or cursor is not None,
+            next_cursor=history_cursor(playlists[-1]) if has_next else None
         )
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting playlist history: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -298,26 +470,21 @@ async def get_playlist_history(
 async def get_statistics():
     """Get usage statistics"""
     try:
-        stats = db.get_statistics()
-        
-        # Get API usage counts
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT service, COUNT(*) as count
-                FROM api_usage
-                GROUP BY service
-            ''')
-            api_usage = {row['service']: row['count'] for row in cursor.fetchall()}
+        stats, api_usage = await asyncio.gather(
+            async_db.get_statistics(),
+            async_db.get_api_usage_counts()
+        )
         
         return StatsResponse(
             total_playlists=stats['total_playlists'],
             total_videos=stats['total_videos'],
             playlists_today=stats['playlists_today'],
-            playlists_this_week=0,  # TODO: Add weekly stats
-            playlists_this_month=0,  # TODO: Add monthly stats
+            playlists_this_week=stats['playlists_this_week'],
+            playlists_this_month=stats['playlists_this_month'],
             most_common_videos=stats['most_common_videos'],
             average_playlist_size=stats['average_playlist_size'],
+            total_runtime_seconds=stats['total_runtime_seconds'],
+            average_playlist_runtime_seconds=stats['average_playlist_runtime_seconds'],
             api_usage=api_usage
         )
         
@@ -326,6 +493,20 @@ async def get_statistics():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Metrics endpoint
+@app.get("/api/v1/metrics", response_model=MetricsResponse, tags=["System"])
+async def get_metrics(generator: PlaylistGenerator = Depends(get_playlist_generator)):
+    """Get in-process performance counters"""
+    return MetricsResponse(
+        video_cache=generator.video_cache.stats(),
+        title_cache=generator.title_cache.stats(),
+        quota=generator.quota.stats(),
+        retry=generator.retry.stats(),
+        youtube_pool=generator.youtube_pool_stats(),
+        youtube_accounts=generator.accounts.stats()
+    )
+
+
 # Root endpoint
 @app.get("/", tags=["System"])
 async def root():
@@ -2,10 +2,9 @@
 Telegram bot for YouTube playlist generator
 """
 import logging
-import re
-import asyncio
 from typing import List
 from telegram import Update
+from telegram.helpers import escape_markdown
 from telegram.ext import (
     Application,
     CommandHandler,
@@ -17,6 +16,10 @@ from telegram.ext import (
 from .playlist_core import PlaylistGenerator
 from .config import get_settings
 from .youtube_auth import YouTubeAuth
+from .url_parser import find_youtube_urls
+from .quota import QuotaExceededError
+from .database import db, AsyncPlaylistDatabase
+from .durations import format_duration
 
 # Configure logging
 logging.basicConfig(
@@ -41,9 +44,16 @@ class YouTubePlaylistBot:
             use_oauth=True
         )
         
+        # History and statistics queries run off the event loop
+        self.db = AsyncPlaylistDatabase(db, max_workers=settings.database_max_workers)
+        
         # User states for tracking ongoing operations
         self.user_states = {}
     
+    async def post_init(self, application: Application):
+        """Warm up the playlist generator in the background once the bot starts"""
+        self.playlist_generator.run_in_background(self.playlist_generator.warm_up())
+    
     def is_authorized(self, user_id: int) -> bool:
         """Check if user is authorized to use the bot"""
         return not self.allowed_users or user_id in self.allowed_users
@@ -81,13 +91,20 @@ class YouTubePlaylistBot:
         if not self.is_authorized(update.effective_user.id):
             return
         
+        # Each video costs 50 quota units on top of the 50 for creating the playlist
+        daily_videos = min(self.settings.max_videos_per_playlist, (self.settings.youtube_daily_quota - 50) // 50)
         help_text = (
             "🤖 *YouTube Playlist Generator Help*\n\n"
             "*Supported URL formats:*\n"
             "• youtube.com/watch?v=VIDEO_ID\n"
             "• youtu.be/VIDEO_ID\n"
             "• youtube.com/shorts/VIDEO_ID\n"
-            "• m.youtube.com/watch?v=VIDEO_ID\n\n"
+            "• youtube.com/live/VIDEO_ID\n"
+            "• youtube.com/embed/VIDEO_ID\n"
+            "• m.youtube.com/watch?v=VIDEO_ID\n"
+            "• music.youtube.com/watch?v=VIDEO_ID\n"
+            "• youtube.com/playlist?list=PLAYLIST_ID\n"
+            "• youtube.com/@channel (latest uploads)\n\n"
             "*Examples:*\n"
             "Send me messages like:\n"
             "```\n"
@@ -97,7 +114,7 @@ class YouTubePlaylistBot:
             "*Features:*\n"
             "• AI-generated playlist titles\n"
             "• Automatic video validation\n"
-            "• Support for up to 50 videos per playlist\n"
+            f"• Up to {daily_videos:,} videos per playlist a day (YouTube quota)\n"
             "• Private/unlisted playlist options\n\n"
             "*Tips:*\n"
             "• Send multiple URLs at once for bigger playlists\n"
@@ -109,46 +126,53 @@ class YouTubePlaylistBot:
     
     async def stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /stats command"""
-        if not self.is_authorized(update.effective_user.id):
+        user = update.effective_user
+        if not self.is_authorized(user.id):
             return
         
-        # TODO: Implement stats from database
-        await update.message.reply_text(
+        stats = await self.db.get_statistics(user_identifier=str(user.id))
+        
+        message = (
             "📊 *Your Statistics*\n\n"
-            "Feature coming soon! Will show:\n"
-            "• Total playlists created\n"
-            "• Total videos added\n"
-            "• Most used video sources\n"
-            "• Creation history",
-            parse_mode='Markdown'
+            f"📋 *Playlists:* {stats['total_playlists']} "
+            f"({stats['playlists_today']} today, {stats['playlists_this_week']} this week, "
+            f"{stats['playlists_this_month']} this month)\n"
+            f"📹 *Videos added:* {stats['total_videos']}\n"
+            f"⏱ *Total runtime:* {format_duration(stats['total_runtime_seconds'])}\n"
         )
+        if stats['most_common_videos']:
+            message += "\n*Most added videos:*\n"
+            for video in stats['most_common_videos'][:5]:
+                title = escape_markdown(video['video_title'] or video['video_id'])
+                message += f"  • {title} ({video['count']}×)\n"
+        
+        await update.message.reply_text(message, parse_mode='Markdown')
     
     async def history_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /history command"""
-        if not self.is_authorized(update.effective_user.id):
+        user = update.effective_user
+        if not self.is_authorized(user.id):
             return
         
-        # TODO: Implement history from database
-        await update.message.reply_text(
-            "📜 *Recent Playlists*\n\n"
-            "Feature coming soon! Will show your last 5 playlists.",
-            parse_mode='Markdown'
-        )
+        playlists = await self.db.get_playlist_history(user_identifier=str(user.id), limit=5)
+        if not playlists:
+            await update.message.reply_text(
+                "📜 You haven't created any playlists yet. Send me some YouTube links to start!"
+            )
+            return
+        
+        message = "📜 *Recent Playlists*\n\n"
+        for playlist in playlists:
+            message += (
+                f"• [{escape_markdown(playlist['title'])}]({playlist['url']})\n"
+                f"  {playlist['video_count']} videos, {playlist['created_at'][:10]}\n"
+            )
+        
+        await update.message.reply_text(message, parse_mode='Markdown', disable_web_page_preview=True)
     
     def extract_urls(self, text: str) -> List[str]:
         """Extract YouTube URLs from text"""
-        # Regex pattern for YouTube URLs
-        youtube_pattern = r'(?:https?://)?(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/shorts/|m\.youtube\.com/watch\?v=)[\w-]+'
-        urls = re.findall(youtube_pattern, text)
-        
-        # Ensure URLs have https://
-        formatted_urls = []
-        for url in urls:
-            if not url.startswith('http'):
-                url = 'https://' + url
-            formatted_urls.append(url)
-        
-        return formatted_urls
+        return find_youtube_urls(text)
     
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle text messages containing YouTube URLs"""
@@ -180,7 +204,9 @@ class YouTubePlaylistBot:
             result = await self.playlist_generator.create_playlist(
                 video_urls=urls,
                 custom_title=None,  # Let AI generate title
-                description=f"Playlist created via Telegram by {user.first_name}"
+                description=f"Playlist created via Telegram by {user.first_name}",
+                created_by="telegram",
+                user_identifier=str(user.id)
             )
             
             if result.success:
@@ -213,6 +239,11 @@ class YouTubePlaylistBot:
                     parse_mode='Markdown'
                 )
                 
+        except QuotaExceededError as e:
+            logger.warning(f"Rejected playlist for user {user.id}: {e}")
+            await status_message.edit_text(
+                "⏳ The YouTube API quota is used up for now. Please try again later."
+            )
         except Exception as e:
             logger.error(f"Error creating playlist: {e}")
             await status_message.edit_text(
@@ -241,7 +272,7 @@ def main():
     bot = YouTubePlaylistBot()
     
     # Create application
-    application = Application.builder().token(settings.telegram_token).build()
+    application = Application.builder().token(settings.telegram_token).post_init(bot.post_init).build()
     
     # Add command handlers
     application.add_handler(CommandHandler("start", bot.start))
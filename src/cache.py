@@ -0,0 +1,175 @@
+"""
+Caches for YouTube video metadata and AI-generated titles
+"""
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class VideoMetadataCache:
+    """Two-level cache for videos.list results.
+
+    Level one is an in-process LRU; level two is the `video_cache` table in
+    SQLite, which is shared by the API and bot processes. Entries older than
+    `ttl_seconds` are treated as misses at both levels.
+    """
+
+    # Prune the SQLite table after this many writes
+    PRUNE_INTERVAL = 500
+
+    def __init__(
+        self,
+        database,
+        ttl_seconds: int = 21600,
+        max_memory_entries: int = 2048,
+        max_db_entries: int = 50000
+    ):
+        self.database = database
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_db_entries = max_db_entries
+
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def get_many(self, video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Return fresh cached metadata for the given IDs, keyed by video ID"""
+        now = time.time()
+        min_fetched_at = now - self.ttl_seconds
+        found = {}
+
+        with self._lock:
+            for video_id in video_ids:
+                entry = self._entries.get(video_id)
+                if entry is None:
+                    continue
+                if entry[0] < min_fetched_at:
+                    del self._entries[video_id]
+                    continue
+                self._entries.move_to_end(video_id)
+                found[video_id] = entry[1]
+
+        memory_hits = len(found)
+        remaining = [video_id for video_id in video_ids if video_id not in found]
+
+        db_hits = 0
+        if remaining:
+            rows = self.database.get_cached_videos(remaining, min_fetched_at)
+            with self._lock:
+                for video_id, row in rows.items():
+                    fetched_at = row.pop('fetched_at')
+                    self._remember(video_id, row, fetched_at)
+                    found[video_id] = row
+            db_hits = len(rows)
+
+        with self._lock:
+            self.memory_hits += memory_hits
+            self.db_hits += db_hits
+            self.misses += len(video_ids) - memory_hits - db_hits
+
+        return found
+
+    def put_many(self, videos: List[Dict[str, Any]]):
+        """Store freshly fetched metadata at both cache levels"""
+        if not videos:
+            return
+
+        now = time.time()
+        with self._lock:
+            for video in videos:
+                self._remember(video['video_id'], dict(video), now)
+            self._writes_since_prune += len(videos)
+            should_prune = self._writes_since_prune >= self.PRUNE_INTERVAL
+            if should_prune:
+                self._writes_since_prune = 0
+
+        self.database.cache_videos(videos, now)
+
+        if should_prune:
+            removed = self.database.prune_video_cache(now - self.ttl_seconds, self.max_db_entries)
+            if removed:
+                logger.info(f"Evicted {removed} entries from video cache")
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters"""
+        with self._lock:
+            return {
+                'memory_hits': self.memory_hits,
+                'db_hits': self.db_hits,
+                'misses': self.misses,
+                'memory_entries': len(self._entries)
+            }
+
+    def _remember(self, video_id: str, video: Dict[str, Any], fetched_at: float):
+        """Insert into the LRU, evicting the least recently used entries (lock held)"""
+        self._entries[video_id] = (fetched_at, video)
+        self._entries.move_to_end(video_id)
+        while len(self._entries) > self.max_memory_entries:
+            self._entries.popitem(last=False)
+
+
+class TitleCache:
+    """Content-addressed cache of AI-generated playlist titles.
+
+    Keys hash exactly what goes into the prompt (the ordered titles) together
+    with the model and prompt version, so changing either one never serves a
+    stale title. Rows live in the `title_cache` table and are evicted least
+    recently used first.
+    """
+
+    # Prune the SQLite table after this many writes
+    PRUNE_INTERVAL = 100
+
+    def __init__(self, database, max_entries: int = 10000):
+        self.database = database
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, prompt_version: int, titles: List[str]) -> str:
+        """Hash the prompt inputs into a cache key"""
+        payload = json.dumps([model, prompt_version, titles], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        title = self.database.get_cached_title(key)
+        with self._lock:
+            if title is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return title
+
+    def put(self, key: str, title: str, model: str):
+        self.database.cache_title(key, title, model)
+
+        with self._lock:
+            self._writes_since_prune += 1
+            should_prune = self._writes_since_prune >= self.PRUNE_INTERVAL
+            if should_prune:
+                self._writes_since_prune = 0
+
+        if should_prune:
+            removed = self.database.prune_title_cache(self.max_entries)
+            if removed:
+                logger.info(f"Evicted {removed} entries from title cache")
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from functools import lru_cache
 
 
@@ -13,6 +13,12 @@ class Settings(BaseSettings):
     youtube_client_id: str = ""
     youtube_client_secret: str = ""
     youtube_redirect_uri: str = "http://localhost:8080"
+    # Token shared by the API and bot; renewed in the background this long before it expires
+    oauth_token_file: str = "token.json"
+    oauth_refresh_lead_seconds: int = 300
+    # Extra credentials to spread quota over: comma-separated name=token_file[:daily_quota].
+    # Empty means the single oauth_token_file account.
+    youtube_accounts: str = ""
     
     # API Settings
     api_host: str = "0.0.0.0"
@@ -23,12 +29,59 @@ class Settings(BaseSettings):
     allowed_telegram_user_id: Optional[str] = None
     
     # Feature Settings
-    max_videos_per_playlist: int = 50
+    # YouTube's own limit; larger requests need split_size. In practice the quota is
+    # the ceiling: 50 units per video, so 199 videos a day on a 10,000-unit account.
+    max_videos_per_playlist: int = 5000
+    max_videos_per_source: int = 200
     default_playlist_privacy: str = "unlisted"
     enable_ai_titles: bool = True
+    pipeline_title_generation: bool = True
+    
+    # Title generation: "openai", "fallback" (OpenAI, keyword title on failure),
+    # "race" (whichever of the two is ready within the budget) or "local"
+    title_strategy: str = "fallback"
+    title_race_budget_ms: int = 1500
+    
+    # YouTube API execution
+    youtube_max_workers: int = 8
+    batch_playlist_inserts: bool = True
+    playlist_insert_batch_size: int = 50
+    validation_concurrency: int = 4
+    # Service objects (each with its own HTTP connection) shared by the worker threads
+    youtube_pool_size: int = 8
+    # Newer discovery document to build services from (default: the one bundled with the client library)
+    youtube_discovery_path: str = ""
+    
+    # YouTube quota scheduling
+    youtube_daily_quota: int = 10000
+    quota_burst_units: int = 3000
+    quota_max_wait_seconds: float = 30.0
+    
+    # Retries and adaptive concurrency
+    youtube_max_attempts: int = 5
+    youtube_max_concurrency: int = 8
+    retry_base_delay: float = 0.5
+    retry_max_delay: float = 16.0
+    
+    # Playlist creation jobs
+    job_stale_seconds: int = 600
+    max_job_attempts: int = 5
+    
+    # Identical requests within this window return the existing playlist (0 disables)
+    idempotency_window_seconds: int = 3600
+    
+    # Video metadata cache
+    video_cache_ttl_seconds: int = 21600
+    video_cache_memory_entries: int = 2048
+    video_cache_db_entries: int = 50000
+    
+    # AI title cache
+    title_cache_entries: int = 10000
     
     # Database
     database_url: str = "sqlite:///playlists.db"
+    # Threads the API runs database queries on (each keeps its own connection)
+    database_max_workers: int = 4
     
     class Config:
         env_file = ".env"
@@ -40,6 +93,29 @@ class Settings(BaseSettings):
             return []
         return [int(uid.strip()) for uid in self.allowed_telegram_user_id.split(",") if uid.strip()]
     
+    def get_youtube_accounts(self) -> List[Tuple[str, str, int]]:
+        """Parse youtube_accounts into (name, token_file, daily_quota) entries"""
+        if not self.youtube_accounts.strip():
+            return [("default", self.oauth_token_file, self.youtube_daily_quota)]
+        
+        accounts = []
+        for entry in self.youtube_accounts.split(","):
+            if not entry.strip():
+                continue
+            name, _, token_file = entry.partition("=")
+            if not name.strip() or not token_file.strip():
+                raise ValueError(f"YOUTUBE_ACCOUNTS entry '{entry}' must look like name=token_file")
+            daily_quota = self.youtube_daily_quota
+            path, _, limit = token_file.rpartition(":")
+            if path and limit.strip().isdigit():
+                token_file, daily_quota = path, int(limit)
+            accounts.append((name.strip(), token_file.strip(), daily_quota))
+        return accounts
+    
+    def get_legacy_token_file(self, token_file: str) -> Optional[str]:
+        """token.pickle from before token.json; only the OAUTH_TOKEN_FILE account may inherit it"""
+        return "token.pickle" if token_file == self.oauth_token_file else None
+    
     def get_allowed_origins_list(self) -> List[str]:
         """Parse comma-separated allowed origins"""
         if not self.allowed_origins:
@@ -1,35 +1,112 @@
 """
 SQLite database interface for playlist history
 """
+import os
+import asyncio
+import base64
+import binascii
 import sqlite3
 import json
 import logging
+import threading
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from itertools import islice
+from typing import Iterable, List, Optional, Dict, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
 
+from .durations import parse_duration
+
 logger = logging.getLogger(__name__)
 
+# Connection tuning. WAL lets the API and bot processes read while the other
+# writes; synchronous=NORMAL is durable across application crashes in WAL mode
+# and only fsyncs at checkpoints.
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KIB = 16384
+MMAP_SIZE_BYTES = 64 * 1024 * 1024
+# Prepared statements kept per connection (the sqlite3 default is 128)
+CACHED_STATEMENTS = 256
+
+INSERT_PLAYLIST_SQL = '''
+    INSERT INTO playlists (
+        id, youtube_id, title, description, url,
+        video_count, created_by, user_identifier, metadata,
+        fingerprint, idempotency_key, account
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+# Bulk imports skip playlists that are already stored instead of failing the chunk
+INSERT_NEW_PLAYLIST_SQL = INSERT_PLAYLIST_SQL.replace('INSERT', 'INSERT OR IGNORE', 1)
+
+INSERT_PLAYLIST_VIDEO_SQL = '''
+    INSERT INTO playlist_videos (
+        playlist_id, video_id, video_title,
+        video_channel, video_duration, duration_seconds,
+        position, playlist_item_id
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
 
 class PlaylistDatabase:
     def __init__(self, db_path: str = "playlists.db"):
         self.db_path = db_path
+        # One persistent connection per thread; sqlite3 connections must not be shared
+        self._local = threading.local()
         self._init_database()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open and tune a connection for the calling thread"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            cached_statements=CACHED_STATEMENTS
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+        conn.execute(f'PRAGMA cache_size=-{CACHE_SIZE_KIB}')
+        conn.execute(f'PRAGMA mmap_size={MMAP_SIZE_BYTES}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+    
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        """Context manager for the calling thread's connection.
+        
+        The connection stays open between calls, so its page cache and prepared
+        statements are reused. The outermost block commits, or rolls back on
+        error; nested blocks join its transaction.
+        """
+        local = self._local
+        # A forked child must not reuse its parent's connection
+        if getattr(local, 'pid', None) != os.getpid():
+            local.conn = self._connect()
+            local.pid = os.getpid()
+            local.depth = 0
+        
+        conn = local.conn
+        local.depth += 1
         try:
             yield conn
-            conn.commit()
+            if local.depth == 1:
+                conn.commit()
         except Exception as e:
-            conn.rollback()
+            if local.depth == 1:
+                conn.rollback()
             raise e
         finally:
+            local.depth -= 1
+    
+    def close(self):
+        """Close the calling thread's connection; the next call reopens it"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
             conn.close()
+            self._local.pid = None
+            self._local.conn = None
     
     def _init_database(self):
         """Initialize database tables"""
@@ -48,7 +125,9 @@ class PlaylistDatabase:
                     created_by TEXT NOT NULL,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     user_identifier TEXT,
-                    metadata TEXT
+                    metadata TEXT,
+                    fingerprint TEXT,
+                    idempotency_key TEXT
                 )
             ''')
             
@@ -61,7 +140,9 @@ class PlaylistDatabase:
                     video_title TEXT,
                     video_channel TEXT,
                     video_duration TEXT,
+                    duration_seconds INTEGER,
                     position INTEGER NOT NULL,
+                    playlist_item_id TEXT,
                     added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (playlist_id) REFERENCES playlists(id)
                 )
@@ -79,13 +160,190 @@ class PlaylistDatabase:
                 )
             ''')
             
+            # Create video_cache table (shared videos.list metadata cache)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS video_cache (
+                    video_id TEXT PRIMARY KEY,
+                    title TEXT,
+                    channel TEXT,
+                    duration TEXT,
+                    status TEXT NOT NULL,
+                    error TEXT,
+                    fetched_at REAL NOT NULL
+                )
+            ''')
+            
+            # Create title_cache table (AI titles keyed by a hash of the prompt inputs)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS title_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Create playlist_jobs table (checkpointed playlist creation)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS playlist_jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    youtube_id TEXT,
+                    title TEXT NOT NULL,
+                    description TEXT,
+                    privacy TEXT NOT NULL,
+                    created_by TEXT NOT NULL,
+                    user_identifier TEXT,
+                    videos TEXT NOT NULL,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 1,
+                    fingerprint TEXT,
+                    idempotency_key TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Create playlist_job_items table (one row per inserted video)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS playlist_job_items (
+                    job_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    video_id TEXT NOT NULL,
+                    playlist_item_id TEXT,
+                    inserted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (job_id, position),
+                    FOREIGN KEY (job_id) REFERENCES playlist_jobs(id)
+                )
+            ''')
+            
+            # Create statistics rollups, updated in the same transaction as the playlists.
+            # user_identifier '' holds the totals over all users.
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS user_stats (
+                    user_identifier TEXT PRIMARY KEY,
+                    playlists INTEGER NOT NULL DEFAULT 0,
+                    videos INTEGER NOT NULL DEFAULT 0,
+                    runtime_seconds INTEGER NOT NULL DEFAULT 0
+                ) WITHOUT ROWID
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS daily_stats (
+                    user_identifier TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    playlists INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (user_identifier, day)
+                ) WITHOUT ROWID
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS video_popularity (
+                    user_identifier TEXT NOT NULL,
+                    video_id TEXT NOT NULL,
+                    video_title TEXT,
+                    count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (user_identifier, video_id)
+                ) WITHOUT ROWID
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS api_usage_stats (
+                    service TEXT PRIMARY KEY,
+                    calls INTEGER NOT NULL DEFAULT 0
+                ) WITHOUT ROWID
+            ''')
+            
+            # Trigger-maintained counters from before user_stats; the triggers
+            # would otherwise keep running on every playlist insert and delete
+            cursor.execute('DROP TRIGGER IF EXISTS trg_playlists_count_insert')
+            cursor.execute('DROP TRIGGER IF EXISTS trg_playlists_count_delete')
+            cursor.execute('DROP TABLE IF EXISTS playlist_counters')
+            
+            # Add columns introduced after the first release
+            self._add_missing_columns(cursor, 'playlists', {
+                'fingerprint': 'TEXT',
+                'idempotency_key': 'TEXT',
+                'account': 'TEXT'
+            })
+            added = self._add_missing_columns(cursor, 'playlist_videos', {
+                'playlist_item_id': 'TEXT',
+                'duration_seconds': 'INTEGER'
+            })
+            if 'duration_seconds' in added:
+                self._backfill_duration_seconds(conn)
+            self._add_missing_columns(cursor, 'playlist_jobs', {
+                'fingerprint': 'TEXT',
+                'idempotency_key': 'TEXT',
+                'account': 'TEXT'
+            })
+            self._add_missing_columns(cursor, 'api_usage', {
+                'account': 'TEXT'
+            })
+            
             # Create indexes
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_playlists_created_at ON playlists(created_at)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_playlists_user ON playlists(user_identifier)')
+            # Keyset pagination of the history, overall and per user
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_playlists_created_id ON playlists(created_at, id)')
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_playlists_user_created_id ON playlists(user_identifier, created_at, id)'
+            )
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_playlist_videos_playlist ON playlist_videos(playlist_id)')
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_playlist_videos_duration ON playlist_videos(duration_seconds)'
+            )
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_video_cache_fetched_at ON video_cache(fetched_at)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_api_usage_service_created ON api_usage(service, created_at)')
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_api_usage_account_created ON api_usage(service, account, created_at)'
+            )
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_playlist_jobs_status ON playlist_jobs(status, updated_at)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_title_cache_last_used ON title_cache(last_used_at)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_playlists_fingerprint ON playlists(fingerprint, created_at)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_playlists_idempotency_key ON playlists(idempotency_key)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_playlist_jobs_fingerprint ON playlist_jobs(fingerprint, created_at)')
+            cursor.execute(
+                'CREATE UNIQUE INDEX IF NOT EXISTS idx_playlist_jobs_idempotency_key ON playlist_jobs(idempotency_key)'
+            )
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_video_popularity_count ON video_popularity(user_identifier, count)'
+            )
+            
+            # First start with rollups: build them from the existing playlists
+            cursor.execute("SELECT 1 FROM user_stats WHERE user_identifier = ''")
+            if cursor.fetchone() is None:
+                self._rebuild_statistics(cursor)
+            cursor.execute('''
+                SELECT NOT EXISTS (SELECT 1 FROM api_usage_stats) AND EXISTS (SELECT 1 FROM api_usage)
+            ''')
+            if cursor.fetchone()[0]:
+                self._rebuild_api_usage_stats(cursor)
             
             logger.info("Database initialized successfully")
     
+    @staticmethod
+    def _add_missing_columns(cursor, table: str, columns: Dict[str, str]) -> List[str]:
+        """Add columns missing from a table created by an older version; returns the added names"""
+        cursor.execute(f'PRAGMA table_info({table})')
+        existing = {row['name'] for row in cursor.fetchall()}
+        added = []
+        for name, declaration in columns.items():
+            if name not in existing:
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {declaration}')
+                logger.info(f"Added column {table}.{name}")
+                added.append(name)
+        return added
+    
+    @staticmethod
+    def _backfill_duration_seconds(conn):
+        """Fill playlist_videos.duration_seconds from the stored strings with a single UPDATE"""
+        conn.create_function('parse_duration', 1, parse_duration, deterministic=True)
+        cursor = conn.execute('''
+            UPDATE playlist_videos SET duration_seconds = parse_duration(video_duration)
+            WHERE video_duration IS NOT NULL
+        ''')
+        logger.info(f"Backfilled duration_seconds for {cursor.rowcount} playlist videos")
+    
     def save_playlist(
         self,
         playlist_id: str,
@@ -97,47 +355,36 @@ class PlaylistDatabase:
         user_identifier: Optional[str] = None,
         description: Optional[str] = None,
         videos: Optional[List[Dict[str, Any]]] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        fingerprint: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+        account: Optional[str] = None
     ) -> bool:
-        """Save a playlist to the database"""
+        """Save a playlist to the database
+        
+        Returns False without touching the row when the playlist is already
+        recorded, e.g. by an earlier attempt of a resumed job.
+        """
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                # Insert playlist
-                cursor.execute('''
-                    INSERT INTO playlists (
-                        id, youtube_id, title, description, url, 
-                        video_count, created_by, user_identifier, metadata
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    playlist_id,
-                    youtube_id,
-                    title,
-                    description,
-                    url,
-                    video_count,
-                    created_by,
-                    user_identifier,
-                    json.dumps(metadata) if metadata else None
+                cursor.execute('SELECT 1 FROM playlists WHERE id = ?', (playlist_id,))
+                if cursor.fetchone():
+                    logger.info(f"Playlist {youtube_id} is already saved")
+                    return False
+                
+                cursor.execute(INSERT_PLAYLIST_SQL, self._playlist_row(
+                    playlist_id, youtube_id, title, url, video_count, created_by,
+                    user_identifier, description, metadata, fingerprint, idempotency_key, account
                 ))
                 
                 # Insert videos if provided
-                if videos:
-                    for position, video in enumerate(videos):
-                        cursor.execute('''
-                            INSERT INTO playlist_videos (
-                                playlist_id, video_id, video_title, 
-                                video_channel, video_duration, position
-                            ) VALUES (?, ?, ?, ?, ?, ?)
-                        ''', (
-                            playlist_id,
-                            video.get('video_id'),
-                            video.get('title'),
-                            video.get('channel'),
-                            video.get('duration'),
-                            position
-                        ))
+                video_rows = self._video_rows(playlist_id, videos or [])
+                if video_rows:
+                    cursor.executemany(INSERT_PLAYLIST_VIDEO_SQL, video_rows)
+                
+                self._update_statistics(cursor, [(user_identifier, 1, video_rows, 1)])
                 
                 logger.info(f"Saved playlist {youtube_id} to database")
                 return True
@@ -149,14 +396,306 @@ class PlaylistDatabase:
             logger.error(f"Error saving playlist: {e}")
             return False
     
+    def save_playlists_bulk(self, playlists: Iterable[Dict[str, Any]], chunk_size: int = 500) -> int:
+        """Save many playlists, committing once per chunk of `chunk_size` playlists.
+        
+        Each item takes the keyword arguments of save_playlist; video_count
+        defaults to the number of videos. `playlists` may be a generator, so
+        only one chunk is held in memory. Playlists that already exist are
+        skipped, so an interrupted import can simply be run again. Returns how
+        many playlists were committed; on error the current chunk is rolled
+        back, does not count, and the import stops there.
+        """
+        saved = 0
+        iterator = iter(playlists)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return saved
+            
+            try:
+                with self.get_connection() as conn:
+                    cursor = conn.cursor()
+                    
+                    video_rows = []
+                    rollups = []
+                    inserted = 0
+                    for playlist in chunk:
+                        videos = playlist.get('videos') or []
+                        cursor.execute(INSERT_NEW_PLAYLIST_SQL, self._playlist_row(
+                            playlist['playlist_id'],
+                            playlist['youtube_id'],
+                            playlist['title'],
+                            playlist['url'],
+                            playlist.get('video_count', len(videos)),
+                            playlist.get('created_by', 'api'),
+                            playlist.get('user_identifier'),
+                            playlist.get('description'),
+                            playlist.get('metadata'),
+                            playlist.get('fingerprint'),
+                            playlist.get('idempotency_key'),
+                            playlist.get('account')
+                        ))
+                        if cursor.rowcount == 1:
+                            rows = self._video_rows(playlist['playlist_id'], videos)
+                            video_rows.extend(rows)
+                            rollups.append((playlist.get('user_identifier'), 1, rows, 1))
+                            inserted += 1
+                        else:
+                            logger.warning(f"Skipped playlist {playlist['youtube_id']}: already stored or missing required fields")
+                    
+                    cursor.executemany(INSERT_PLAYLIST_VIDEO_SQL, video_rows)
+                    self._update_statistics(cursor, rollups)
+                
+                # Only count the chunk once its transaction has committed
+                saved += inserted
+                logger.info(f"Saved {saved} playlists to database")
+                
+            except Exception as e:
+                logger.error(f"Error saving playlists in bulk after {saved} playlists: {e}")
+                return saved
+    
+    @staticmethod
+    def _playlist_row(
+        playlist_id: str,
+        youtube_id: str,
+        title: str,
+        url: str,
+        video_count: int,
+        created_by: str,
+        user_identifier: Optional[str],
+        description: Optional[str],
+        metadata: Optional[Dict[str, Any]],
+        fingerprint: Optional[str],
+        idempotency_key: Optional[str],
+        account: Optional[str]
+    ) -> Tuple:
+        """Parameters for INSERT_PLAYLIST_SQL"""
+        return (
+            playlist_id,
+            youtube_id,
+            title,
+            description,
+            url,
+            video_count,
+            created_by,
+            user_identifier,
+            json.dumps(metadata) if metadata else None,
+            fingerprint,
+            idempotency_key,
+            account
+        )
+    
+    @staticmethod
+    def _video_rows(playlist_id: str, videos: List[Dict[str, Any]]) -> List[Tuple]:
+        """Parameters for INSERT_PLAYLIST_VIDEO_SQL, one tuple per video in playlist order"""
+        return [
+            (
+                playlist_id,
+                video.get('video_id'),
+                video.get('title'),
+                video.get('channel'),
+                video.get('duration'),
+                parse_duration(video.get('duration')),
+                position,
+                video.get('playlist_item_id')
+            )
+            for position, video in enumerate(videos)
+        ]
+    
+    @staticmethod
+    def _update_statistics(cursor, changes: List[Tuple[Optional[str], int, List[Tuple], int]]):
+        """Apply playlist changes to the statistics rollups.
+        
+        Each change is (user_identifier, playlists added, video rows as built by
+        _video_rows, +1 to add the videos or -1 to remove them). Deltas are
+        summed first, so a whole chunk costs one upsert per user, day and video.
+        """
+        users: Dict[str, List[int]] = {}
+        days: Dict[str, int] = {}
+        videos: Dict[Tuple[str, str], List[Any]] = {}
+        for user_identifier, playlists, rows, sign in changes:
+            for scope in ('', user_identifier) if user_identifier else ('',):
+                totals = users.setdefault(scope, [0, 0, 0])
+                totals[0] += playlists
+                totals[1] += sign * len(rows)
+                totals[2] += sign * sum(row[5] or 0 for row in rows)
+                if playlists:
+                    days[scope] = days.get(scope, 0) + playlists
+                for row in rows:
+                    entry = videos.setdefault((scope, row[1]), [None, 0])
+                    if sign > 0:
+                        entry[0] = row[2] or entry[0]
+                    entry[1] += sign
+        
+        cursor.executemany('''
+            INSERT INTO user_stats (user_identifier, playlists, videos, runtime_seconds) VALUES (?, ?, ?, ?)
+            ON CONFLICT(user_identifier) DO UPDATE SET
+                playlists = playlists + excluded.playlists,
+                videos = videos + excluded.videos,
+                runtime_seconds = runtime_seconds + excluded.runtime_seconds
+        ''', [(scope, *totals) for scope, totals in users.items()])
+        # Playlists are stamped with CURRENT_TIMESTAMP, i.e. today in UTC
+        cursor.executemany('''
+            INSERT INTO daily_stats (user_identifier, day, playlists) VALUES (?, date('now'), ?)
+            ON CONFLICT(user_identifier, day) DO UPDATE SET playlists = playlists + excluded.playlists
+        ''', list(days.items()))
+        cursor.executemany('''
+            INSERT INTO video_popularity (user_identifier, video_id, video_title, count) VALUES (?, ?, ?, ?)
+            ON CONFLICT(user_identifier, video_id) DO UPDATE SET
+                count = count + excluded.count,
+                video_title = COALESCE(excluded.video_title, video_title)
+        ''', [(scope, video_id, title, count) for (scope, video_id), (title, count) in videos.items() if count])
+        cursor.executemany(
+            'DELETE FROM video_popularity WHERE user_identifier = ? AND video_id = ? AND count <= 0',
+            [key for key, (_, count) in videos.items() if count < 0]
+        )
+    
+    @staticmethod
+    def _rebuild_statistics(cursor):
+        """Recompute the statistics rollups from the playlist tables"""
+        cursor.execute('DELETE FROM user_stats')
+        cursor.execute('DELETE FROM daily_stats')
+        cursor.execute('DELETE FROM video_popularity')
+        
+        cursor.execute('''
+            INSERT INTO user_stats (user_identifier, playlists, videos, runtime_seconds)
+            SELECT '',
+                (SELECT COUNT(*) FROM playlists),
+                COUNT(*),
+                COALESCE(SUM(duration_seconds), 0)
+            FROM playlist_videos
+        ''')
+        cursor.execute('''
+            INSERT INTO user_stats (user_identifier, playlists, videos, runtime_seconds)
+            SELECT p.user_identifier, COUNT(DISTINCT p.id), COUNT(pv.id), COALESCE(SUM(pv.duration_seconds), 0)
+            FROM playlists p
+            LEFT JOIN playlist_videos pv ON pv.playlist_id = p.id
+            WHERE p.user_identifier != ''
+            GROUP BY p.user_identifier
+        ''')
+        cursor.execute('''
+            INSERT INTO daily_stats (user_identifier, day, playlists)
+            SELECT '', date(created_at), COUNT(*) FROM playlists GROUP BY date(created_at)
+            UNION ALL
+            SELECT user_identifier, date(created_at), COUNT(*) FROM playlists
+            WHERE user_identifier != ''
+            GROUP BY user_identifier, date(created_at)
+        ''')
+        cursor.execute('''
+            INSERT INTO video_popularity (user_identifier, video_id, video_title, count)
+            SELECT '', video_id, MAX(video_title), COUNT(*) FROM playlist_videos GROUP BY video_id
+            UNION ALL
+            SELECT p.user_identifier, pv.video_id, MAX(pv.video_title), COUNT(*)
+            FROM playlist_videos pv
+            JOIN playlists p ON pv.playlist_id = p.id
+            WHERE p.user_identifier != ''
+            GROUP BY p.user_identifier, pv.video_id
+        ''')
+        PlaylistDatabase._rebuild_api_usage_stats(cursor)
+        logger.info("Rebuilt statistics rollups")
+    
+    @staticmethod
+    def _rebuild_api_usage_stats(cursor):
+        """Recompute the per-service call counts from the api_usage ledger"""
+        cursor.execute('DELETE FROM api_usage_stats')
+        cursor.execute('''
+            INSERT INTO api_usage_stats (service, calls)
+            SELECT service, COUNT(*) FROM api_usage GROUP BY service
+        ''')
+    
+    def rebuild_statistics(self) -> bool:
+        """Recompute the statistics rollups, e.g. after editing the tables by hand"""
+        try:
+            with self.get_connection() as conn:
+                self._rebuild_statistics(conn.cursor())
+                return True
+                
+        except Exception as e:
+            logger.error(f"Error rebuilding statistics: {e}")
+            return False
+    
+    def update_playlist_video_count(self, playlist_id: str, video_count: int) -> bool:
+        """Update the stored video count of a playlist"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute(
+                    'UPDATE playlists SET video_count = ? WHERE id = ?',
+                    (video_count, playlist_id)
+                )
+                
+                return cursor.rowcount == 1
+                
+        except Exception as e:
+            logger.error(f"Error updating playlist {playlist_id}: {e}")
+            return False
+    
+    def replace_playlist_videos(
+        self,
+        playlist_id: str,
+        videos: List[Dict[str, Any]],
+        title: Optional[str] = None,
+        description: Optional[str] = None
+    ) -> bool:
+        """Replace the stored videos of a playlist after it was edited
+        
+        The request fingerprint is cleared, since the playlist no longer holds
+        the videos of the request that created it and must not be replayed.
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('SELECT user_identifier FROM playlists WHERE id = ?', (playlist_id,))
+                owner = cursor.fetchone()
+                cursor.execute('''
+                    SELECT playlist_id, video_id, video_title, video_channel, video_duration,
+                           duration_seconds, position, playlist_item_id
+                    FROM playlist_videos WHERE playlist_id = ?
+                ''', (playlist_id,))
+                old_rows = [tuple(row) for row in cursor.fetchall()]
+                new_rows = self._video_rows(playlist_id, videos)
+                
+                cursor.execute('DELETE FROM playlist_videos WHERE playlist_id = ?', (playlist_id,))
+                cursor.executemany(INSERT_PLAYLIST_VIDEO_SQL, new_rows)
+                
+                if owner is not None:
+                    self._update_statistics(cursor, [
+                        (owner['user_identifier'], 0, old_rows, -1),
+                        (owner['user_identifier'], 0, new_rows, 1)
+                    ])
+                
+                cursor.execute('''
+                    UPDATE playlists
+                    SET video_count = ?, title = COALESCE(?, title), description = COALESCE(?, description),
+                        fingerprint = NULL
+                    WHERE id = ?
+                ''', (len(videos), title, description, playlist_id))
+                
+                return True
+                
+        except Exception as e:
+            logger.error(f"Error replacing videos of playlist {playlist_id}: {e}")
+            return False
+    
     def get_playlist_history(
         self,
         user_identifier: Optional[str] = None,
         limit: int = 10,
         offset: int = 0,
-        include_videos: bool = False
+        include_videos: bool = False,
+        after: Optional[str] = None
     ) -> List[Dict[str, Any]]:
-        """Get playlist history"""
+        """Get playlist history, newest first.
+        
+        `after` is a cursor from history_cursor(); the page then starts right
+        after that playlist and `offset` is ignored. Seeking on the
+        (created_at, id) index costs the same for every page, unlike OFFSET.
+        Raises ValueError for a malformed cursor.
+        """
+        position = decode_history_cursor(after) if after else None
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
@@ -164,18 +703,24 @@ class PlaylistDatabase:
                 # Build query
                 query = '''
                     SELECT * FROM playlists
-                    {} 
-                    ORDER BY created_at DESC
+                    {}
+                    ORDER BY created_at DESC, id DESC
                     LIMIT ? OFFSET ?
                 '''
                 
                 params = []
-                where_clause = ""
+                conditions = []
                 
                 if user_identifier:
-                    where_clause = "WHERE user_identifier = ?"
+                    conditions.append("user_identifier = ?")
                     params.append(user_identifier)
                 
+                if position:
+                    conditions.append("(created_at, id) < (?, ?)")
+                    params.extend(position)
+                    offset = 0
+                
+                where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
                 params.extend([limit, offset])
                 
                 # Execute query
@@ -213,6 +758,24 @@ class PlaylistDatabase:
             logger.error(f"Error getting playlist history: {e}")
             return []
     
+    def count_playlists(self, user_identifier: Optional[str] = None) -> int:
+        """Number of playlists, overall or for one user, read from the statistics rollups"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute(
+                    'SELECT playlists FROM user_stats WHERE user_identifier = ?',
+                    (user_identifier or '',)
+                )
+                row = cursor.fetchone()
+                
+                return row['playlists'] if row else 0
+                
+        except Exception as e:
+            logger.error(f"Error counting playlists: {e}")
+            return 0
+    
     def get_playlist_by_id(self, playlist_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific playlist by ID"""
         try:
@@ -243,75 +806,52 @@ class PlaylistDatabase:
             return None
     
     def get_statistics(self, user_identifier: Optional[str] = None) -> Dict[str, Any]:
-        """Get usage statistics"""
+        """Get usage statistics from the rollups; a handful of key lookups however big the history"""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                # Base WHERE clause
-                where_clause = ""
-                params = []
-                if user_identifier:
-                    where_clause = "WHERE user_identifier = ?"
-                    params = [user_identifier]
+                scope = user_identifier or ''
                 
-                # Total playlists
-                cursor.execute(f'SELECT COUNT(*) as count FROM playlists {where_clause}', params)
-                total_playlists = cursor.fetchone()['count']
+                # Totals
+                cursor.execute(
+                    'SELECT playlists, videos, runtime_seconds FROM user_stats WHERE user_identifier = ?',
+                    (scope,)
+                )
+                row = cursor.fetchone()
+                total_playlists, total_videos, total_runtime = tuple(row) if row else (0, 0, 0)
                 
-                # Total videos
-                if user_identifier:
-                    cursor.execute('''
-                        SELECT COUNT(*) as count FROM playlist_videos pv
-                        JOIN playlists p ON pv.playlist_id = p.id
-                        WHERE p.user_identifier = ?
-                    ''', [user_identifier])
-                else:
-                    cursor.execute('SELECT COUNT(*) as count FROM playlist_videos')
-                total_videos = cursor.fetchone()['count']
-                
-                # Playlists today
-                cursor.execute(f'''
-                    SELECT COUNT(*) as count FROM playlists
-                    {where_clause}
-                    {"AND" if where_clause else "WHERE"} date(created_at) = date('now')
-                ''', params)
-                playlists_today = cursor.fetchone()['count']
-                
-                # Average playlist size
-                cursor.execute(f'''
-                    SELECT AVG(video_count) as avg_size FROM playlists
-                    {where_clause}
-                ''', params)
-                avg_size = cursor.fetchone()['avg_size'] or 0
+                # Playlists today, this week (since Monday) and this month, all UTC
+                cursor.execute('''
+                    SELECT
+                        COALESCE(SUM(CASE WHEN day = date('now') THEN playlists END), 0) as today,
+                        COALESCE(SUM(CASE WHEN day >= date('now', 'weekday 0', '-6 days') THEN playlists END), 0) as week,
+                        COALESCE(SUM(CASE WHEN day >= date('now', 'start of month') THEN playlists END), 0) as month
+                    FROM daily_stats
+                    WHERE user_identifier = ?
+                      AND day >= min(date('now', 'weekday 0', '-6 days'), date('now', 'start of month'))
+                ''', (scope,))
+                periods = cursor.fetchone()
                 
                 # Most common videos
-                if user_identifier:
-                    cursor.execute('''
-                        SELECT video_id, video_title, COUNT(*) as count
-                        FROM playlist_videos pv
-                        JOIN playlists p ON pv.playlist_id = p.id
-                        WHERE p.user_identifier = ?
-                        GROUP BY video_id
-                        ORDER BY count DESC
-                        LIMIT 10
-                    ''', [user_identifier])
-                else:
-                    cursor.execute('''
-                        SELECT video_id, video_title, COUNT(*) as count
-                        FROM playlist_videos
-                        GROUP BY video_id
-                        ORDER BY count DESC
-                        LIMIT 10
-                    ''')
-                
+                cursor.execute('''
+                    SELECT video_id, video_title, count
+                    FROM video_popularity
+                    WHERE user_identifier = ?
+                    ORDER BY count DESC
+                    LIMIT 10
+                ''', (scope,))
                 most_common = [dict(row) for row in cursor.fetchall()]
                 
                 return {
                     'total_playlists': total_playlists,
                     'total_videos': total_videos,
-                    'playlists_today': playlists_today,
-                    'average_playlist_size': round(avg_size, 2),
+                    'playlists_today': periods['today'],
+                    'playlists_this_week': periods['week'],
+                    'playlists_this_month': periods['month'],
+                    'average_playlist_size': round(total_videos / total_playlists, 2) if total_playlists else 0,
+                    'total_runtime_seconds': total_runtime,
+                    'average_playlist_runtime_seconds': round(total_runtime / total_playlists, 2) if total_playlists else 0,
                     'most_common_videos': most_common
                 }
                 
@@ -321,16 +861,35 @@ class PlaylistDatabase:
                 'total_playlists': 0,
                 'total_videos': 0,
                 'playlists_today': 0,
+                'playlists_this_week': 0,
+                'playlists_this_month': 0,
                 'average_playlist_size': 0,
+                'total_runtime_seconds': 0,
+                'average_playlist_runtime_seconds': 0,
                 'most_common_videos': []
             }
     
+    def get_api_usage_counts(self) -> Dict[str, int]:
+        """Number of logged API calls per service, from the api_usage_stats rollup"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('SELECT service, calls FROM api_usage_stats')
+                
+                return {row['service']: row['calls'] for row in cursor.fetchall()}
+                
+        except Exception as e:
+            logger.error(f"Error counting API usage: {e}")
+            return {}
+    
     def log_api_usage(
         self,
         service: str,
         operation: str,
         tokens_used: Optional[int] = None,
-        cost_estimate: Optional[float] = None
+        cost_estimate: Optional[float] = None,
+        account: Optional[str] = None
     ):
         """Log API usage for cost tracking"""
         try:
@@ -338,13 +897,460 @@ class PlaylistDatabase:
                 cursor = conn.cursor()
                 
                 cursor.execute('''
-                    INSERT INTO api_usage (service, operation, tokens_used, cost_estimate)
-                    VALUES (?, ?, ?, ?)
-                ''', (service, operation, tokens_used, cost_estimate))
+                    INSERT INTO api_usage (service, operation, tokens_used, cost_estimate, account)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (service, operation, tokens_used, cost_estimate, account))
+                cursor.execute('''
+                    INSERT INTO api_usage_stats (service, calls) VALUES (?, 1)
+                    ON CONFLICT(service) DO UPDATE SET calls = calls + 1
+                ''', (service,))
                 
         except Exception as e:
             logger.error(f"Error logging API usage: {e}")
 
+    
+    def create_playlist_job(
+        self,
+        job_id: str,
+        title: str,
+        privacy: str,
+        videos: List[Dict[str, Any]],
+        created_by: str = "api",
+        user_identifier: Optional[str] = None,
+        description: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+        idempotency_key: Optional[str] = None
+    ) -> bool:
+        """Record a new playlist creation job, already claimed by the caller"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    INSERT INTO playlist_jobs (
+                        id, status, title, description, privacy,
+                        created_by, user_identifier, videos,
+                        fingerprint, idempotency_key
+                    ) VALUES (?, 'running', ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    job_id,
+                    title,
+                    description,
+                    privacy,
+                    created_by,
+                    user_identifier,
+                    json.dumps(videos),
+                    fingerprint,
+                    idempotency_key
+                ))
+                
+                return True
+                
+        except Exception as e:
+            logger.error(f"Error creating playlist job: {e}")
+            return False
+    
+    def get_playlist_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job with its videos and the positions inserted so far"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('SELECT * FROM playlist_jobs WHERE id = ?', (job_id,))
+                job = cursor.fetchone()
+                
+                if not job:
+                    return None
+                
+                job_dict = dict(job)
+                job_dict['videos'] = json.loads(job_dict['videos'])
+                
+                cursor.execute('''
+                    SELECT position, playlist_item_id FROM playlist_job_items
+                    WHERE job_id = ?
+                    ORDER BY position
+                ''', (job_id,))
+                job_dict['inserted'] = {row['position']: row['playlist_item_id'] for row in cursor.fetchall()}
+                
+                return job_dict
+                
+        except Exception as e:
+            logger.error(f"Error getting playlist job {job_id}: {e}")
+            return None
+    
+    def claim_playlist_job(self, job_id: str, stale_seconds: int) -> bool:
+        """Mark a job as running unless another worker is actively running it"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    UPDATE playlist_jobs
+                    SET status = 'running', attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ? AND (
+                        status = 'failed'
+                        OR (status = 'running' AND updated_at < datetime('now', ?))
+                    )
+                ''', (job_id, f'-{stale_seconds} seconds'))
+                
+                return cursor.rowcount == 1
+                
+        except Exception as e:
+            logger.error(f"Error claiming playlist job {job_id}: {e}")
+            return False
+    
+    def set_job_playlist(self, job_id: str, youtube_id: str, account: Optional[str] = None):
+        """Checkpoint the YouTube playlist created for a job and the account that owns it"""
+        with self.get_connection() as conn:
+            conn.execute('''
+                UPDATE playlist_jobs SET youtube_id = ?, account = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (youtube_id, account, job_id))
+    
+    def set_job_title(self, job_id: str, title: str):
+        """Update the title of a job"""
+        with self.get_connection() as conn:
+            conn.execute('''
+                UPDATE playlist_jobs SET title = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (title, job_id))
+    
+    def record_job_item(self, job_id: str, position: int, video_id: str, playlist_item_id: Optional[str]):
+        """Checkpoint one inserted video"""
+        with self.get_connection() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO playlist_job_items (job_id, position, video_id, playlist_item_id)
+                VALUES (?, ?, ?, ?)
+            ''', (job_id, position, video_id, playlist_item_id))
+            conn.execute(
+                'UPDATE playlist_jobs SET updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+                (job_id,)
+            )
+    
+    def finish_playlist_job(self, job_id: str, status: str, error: Optional[str] = None):
+        """Mark a job completed or failed"""
+        try:
+            with self.get_connection() as conn:
+                conn.execute('''
+                    UPDATE playlist_jobs SET status = ?, error = ?, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                ''', (status, error, job_id))
+                
+        except Exception as e:
+            logger.error(f"Error finishing playlist job {job_id}: {e}")
+    
+    def get_resumable_jobs(self, stale_seconds: int, max_attempts: int) -> List[str]:
+        """Get IDs of failed or abandoned jobs that may be retried"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    SELECT id FROM playlist_jobs
+                    WHERE attempts < ? AND (
+                        status = 'failed'
+                        OR (status = 'running' AND updated_at < datetime('now', ?))
+                    )
+                    ORDER BY created_at
+                ''', (max_attempts, f'-{stale_seconds} seconds'))
+                
+                return [row['id'] for row in cursor.fetchall()]
+                
+        except Exception as e:
+            logger.error(f"Error getting resumable jobs: {e}")
+            return []
+    
+    def find_idempotent_playlist(
+        self,
+        fingerprint: str,
+        idempotency_key: Optional[str] = None,
+        window_seconds: int = 0
+    ) -> Optional[Dict[str, Any]]:
+        """Find the playlist an earlier identical request created
+        
+        Matches on the idempotency key when one is given, otherwise on the
+        request fingerprint within the last window_seconds.
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                if idempotency_key:
+                    cursor.execute(
+                        'SELECT id FROM playlists WHERE idempotency_key = ? ORDER BY created_at DESC LIMIT 1',
+                        (idempotency_key,)
+                    )
+                else:
+                    cursor.execute('''
+                        SELECT id FROM playlists
+                        WHERE fingerprint = ? AND created_at >= datetime('now', ?)
+                        ORDER BY created_at DESC
+                        LIMIT 1
+                    ''', (fingerprint, f'-{window_seconds} seconds'))
+                row = cursor.fetchone()
+            
+            return self.get_playlist_by_id(row['id']) if row else None
+                
+        except Exception as e:
+            logger.error(f"Error finding idempotent playlist: {e}")
+            return None
+    
+    def find_idempotent_job(
+        self,
+        fingerprint: str,
+        idempotency_key: Optional[str] = None,
+        window_seconds: int = 0,
+        stale_seconds: int = 600,
+        max_attempts: int = 5
+    ) -> Optional[Dict[str, Any]]:
+        """Find an unfinished job for an earlier identical request
+        
+        The result carries a 'resumable' flag: false while another worker is
+        still actively running the job. A job keyed by idempotency_key is
+        returned even once it has used up max_attempts (flagged 'exhausted'),
+        since the key is unique and no new job can be recorded under it.
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                query = '''
+                    SELECT id, fingerprint, attempts, error,
+                           status = 'failed' OR updated_at < datetime('now', ?) AS resumable,
+                           attempts >= ? AS exhausted
+                    FROM playlist_jobs
+                    WHERE status != 'completed' AND {}
+                    ORDER BY created_at DESC
+                    LIMIT 1
+                '''
+                params = [f'-{stale_seconds} seconds', max_attempts]
+                
+                if idempotency_key:
+                    cursor.execute(query.format("idempotency_key = ?"), params + [idempotency_key])
+                else:
+                    cursor.execute(
+                        query.format("attempts < ? AND fingerprint = ? AND created_at >= datetime('now', ?)"),
+                        params + [max_attempts, fingerprint, f'-{window_seconds} seconds']
+                    )
+                row = cursor.fetchone()
+                
+                return dict(row) if row else None
+                
+        except Exception as e:
+            logger.error(f"Error finding idempotent job: {e}")
+            return None
+    
+    def get_cached_title(self, cache_key: str) -> Optional[str]:
+        """Get a cached title and mark it as recently used"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    UPDATE title_cache
+                    SET hits = hits + 1, last_used_at = CURRENT_TIMESTAMP
+                    WHERE cache_key = ?
+                ''', (cache_key,))
+                
+                if cursor.rowcount == 0:
+                    return None
+                
+                cursor.execute('SELECT title FROM title_cache WHERE cache_key = ?', (cache_key,))
+                return cursor.fetchone()['title']
+                
+        except Exception as e:
+            logger.error(f"Error reading title cache: {e}")
+            return None
+    
+    def cache_title(self, cache_key: str, title: str, model: str):
+        """Store a generated title"""
+        try:
+            with self.get_connection() as conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO title_cache (cache_key, title, model)
+                    VALUES (?, ?, ?)
+                ''', (cache_key, title, model))
+                
+        except Exception as e:
+            logger.error(f"Error writing title cache: {e}")
+    
+    def prune_title_cache(self, max_entries: int) -> int:
+        """Evict the least recently used titles beyond max_entries"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    DELETE FROM title_cache WHERE cache_key IN (
+                        SELECT cache_key FROM title_cache
+                        ORDER BY last_used_at DESC
+                        LIMIT -1 OFFSET ?
+                    )
+                ''', (max_entries,))
+                
+                return cursor.rowcount
+                
+        except Exception as e:
+            logger.error(f"Error pruning title cache: {e}")
+            return 0
+    
+    def get_quota_used(self, service: str, since: str, account: Optional[str] = None) -> int:
+        """Sum the quota units (cost_estimate) logged for a service since a UTC timestamp.
+        
+        With an account, only that account's calls count; otherwise all of them do.
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                if account is None:
+                    cursor.execute('''
+                        SELECT COALESCE(SUM(cost_estimate), 0) as used
+                        FROM api_usage
+                        WHERE service = ? AND created_at >= ?
+                    ''', (service, since))
+                else:
+                    cursor.execute('''
+                        SELECT COALESCE(SUM(cost_estimate), 0) as used
+                        FROM api_usage
+                        WHERE service = ? AND account = ? AND created_at >= ?
+                    ''', (service, account, since))
+                
+                return int(cursor.fetchone()['used'])
+                
+        except Exception as e:
+            logger.error(f"Error reading quota usage: {e}")
+            return 0
+    
+    def get_cached_videos(self, video_ids: List[str], min_fetched_at: float) -> Dict[str, Dict[str, Any]]:
+        """Get cached video metadata fetched at or after min_fetched_at"""
+        cached = {}
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                # Stay well below SQLite's bound parameter limit
+                for i in range(0, len(video_ids), 500):
+                    batch_ids = video_ids[i:i + 500]
+                    placeholders = ','.join(['?' for _ in batch_ids])
+                    cursor.execute(f'''
+                        SELECT * FROM video_cache
+                        WHERE video_id IN ({placeholders}) AND fetched_at >= ?
+                    ''', [*batch_ids, min_fetched_at])
+                    
+                    for row in cursor.fetchall():
+                        cached[row['video_id']] = dict(row)
+                
+        except Exception as e:
+            logger.error(f"Error reading video cache: {e}")
+        
+        return cached
+    
+    def cache_videos(self, videos: List[Dict[str, Any]], fetched_at: float):
+        """Insert or refresh cached video metadata"""
+        if not videos:
+            return
+        
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.executemany('''
+                    INSERT OR REPLACE INTO video_cache (
+                        video_id, title, channel, duration, status, error, fetched_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', [
+                    (
+                        video.get('video_id'),
+                        video.get('title'),
+                        video.get('channel'),
+                        video.get('duration'),
+                        video.get('status', 'valid'),
+                        video.get('error'),
+                        fetched_at
+                    )
+                    for video in videos
+                ])
+                
+        except Exception as e:
+            logger.error(f"Error writing video cache: {e}")
+    
+    def prune_video_cache(self, min_fetched_at: float, max_entries: int) -> int:
+        """Evict expired cache rows, then the oldest rows beyond max_entries"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('DELETE FROM video_cache WHERE fetched_at < ?', (min_fetched_at,))
+                removed = cursor.rowcount
+                
+                cursor.execute('''
+                    DELETE FROM video_cache WHERE video_id IN (
+                        SELECT video_id FROM video_cache
+                        ORDER BY fetched_at DESC
+                        LIMIT -1 OFFSET ?
+                    )
+                ''', (max_entries,))
+                removed += cursor.rowcount
+                
+                return removed
+                
+        except Exception as e:
+            logger.error(f"Error pruning video cache: {e}")
+            return 0
+
+
+def history_cursor(playlist: Dict[str, Any]) -> str:
+    """Opaque cursor pointing just past a playlist from get_playlist_history"""
+    position = json.dumps([playlist['created_at'], playlist['id']], separators=(',', ':'))
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip('=')
+
+
+def decode_history_cursor(token: str) -> Tuple[str, str]:
+    """(created_at, id) encoded in a history cursor; ValueError if it is not one"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        created_at, playlist_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeError, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {token}") from e
+    if not isinstance(created_at, str) or not isinstance(playlist_id, str):
+        raise ValueError(f"Invalid cursor: {token}")
+    return created_at, playlist_id
+
+
+class AsyncPlaylistDatabase:
+    """Awaitable PlaylistDatabase for async code.
+    
+    Every public method of the wrapped database is available as a coroutine
+    that runs the query on a small dedicated thread pool, so a slow query
+    never blocks the event loop and DB work cannot starve other executors.
+    Each pool thread keeps its own persistent connection.
+    """
+    
+    def __init__(self, database: PlaylistDatabase, max_workers: int = 4):
+        self.database = database
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="db")
+    
+    async def run(self, func, *args, **kwargs):
+        """Run a blocking database call on the pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+    
+    def __getattr__(self, name: str):
+        # get_connection is bound to the calling thread; use run() with a function instead
+        if name.startswith('_') or name == 'get_connection':
+            raise AttributeError(name)
+        method = getattr(self.database, name)
+        
+        async def call(*args, **kwargs):
+            return await self.run(method, *args, **kwargs)
+        call.__name__ = name
+        call.__doc__ = method.__doc__
+        return call
+    
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
 
 # Global database instance
 db = PlaylistDatabase()
\ No newline at end of file
@@ -0,0 +1,38 @@
+"""
+ISO-8601 video durations (as returned in contentDetails.duration) as whole seconds
+"""
+import re
+from functools import lru_cache
+from typing import Optional
+
+# YouTube only emits weeks, days, hours, minutes and seconds ("PT1H2M3S",
+# "P1DT2S", "P0D" for live streams); fractional seconds are accepted and
+# truncated. Years and months never appear, so they are rejected.
+ISO_DURATION_RE = re.compile(
+    r'P(?:(\d+)W)?(?:(\d+)D)?(?:T(?=\d)(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)(?:[.,]\d+)?S)?)?'
+)
+
+_UNIT_SECONDS = (604800, 86400, 3600, 60, 1)
+
+
+@lru_cache(maxsize=4096)
+def parse_duration(value: Optional[str]) -> Optional[int]:
+    """Seconds in an ISO-8601 duration, or None for "Unknown" and malformed values.
+
+    Cached, since the same few thousand durations make up most playlists.
+    """
+    if not value:
+        return None
+    match = ISO_DURATION_RE.fullmatch(value)
+    if match is None or value == 'P':
+        return None
+    return sum(int(part) * unit for part, unit in zip(match.groups(), _UNIT_SECONDS) if part)
+
+
+def format_duration(seconds: Optional[int]) -> str:
+    """Seconds as "1:02:03" or "2:03", for display"""
+    if seconds is None:
+        return "?"
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
@@ -6,25 +6,44 @@ from datetime import datetime
 from pydantic import BaseModel, Field, validator
 
 
+def check_youtube_urls(urls: List[str]) -> List[str]:
+    """Basic validation that URLs look like YouTube URLs"""
+    youtube_domains = ['youtube.com', 'youtu.be', 'm.youtube.com']
+    for url in urls:
+        if not any(domain in url.lower() for domain in youtube_domains):
+            raise ValueError(f"Invalid YouTube URL: {url}")
+    return urls
+
+
 # Request Models
 class CreatePlaylistRequest(BaseModel):
-    videos: List[str] = Field(..., description="List of YouTube video URLs", min_items=1, max_items=50)
+    videos: List[str] = Field(..., description="List of YouTube video URLs", min_items=1, max_items=5000)
     title: Optional[str] = Field(None, description="Custom playlist title", max_length=100)
     description: Optional[str] = Field(None, description="Custom playlist description", max_length=5000)
     privacy: str = Field("unlisted", description="Playlist privacy setting", pattern="^(public|unlisted|private)$")
+    split_size: Optional[int] = Field(
+        None, description="Split into several playlists of at most this many videos", ge=1, le=5000
+    )
+    
+    @validator('videos')
+    def validate_urls(cls, urls):
+        """Basic validation that URLs look like YouTube URLs"""
+        return check_youtube_urls(urls)
+
+
+class UpdatePlaylistRequest(BaseModel):
+    videos: List[str] = Field(..., description="Complete new list of YouTube video URLs, in order", min_items=1, max_items=5000)
+    title: Optional[str] = Field(None, description="New playlist title", max_length=100)
+    description: Optional[str] = Field(None, description="New playlist description", max_length=5000)
     
     @validator('videos')
     def validate_urls(cls, urls):
         """Basic validation that URLs look like YouTube URLs"""
-        youtube_domains = ['youtube.com', 'youtu.be', 'm.youtube.com']
-        for url in urls:
-            if not any(domain in url.lower() for domain in youtube_domains):
-                raise ValueError(f"Invalid YouTube URL: {url}")
-        return urls
+        return check_youtube_urls(urls)
 
 
 class ValidateVideosRequest(BaseModel):
-    videos: List[str] = Field(..., description="List of YouTube video URLs to validate", min_items=1, max_items=50)
+    videos: List[str] = Field(..., description="List of YouTube video URLs to validate", min_items=1, max_items=5000)
 
 
 # Response Models
@@ -48,7 +67,38 @@ class PlaylistResponse(BaseModel):
     videos_added: List[VideoInfo] = []
     videos_skipped: List[VideoInfo] = []
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    job_id: Optional[str] = None
+    reused: bool = Field(False, description="True when an earlier identical request's playlist was returned")
+    parts: List["PlaylistResponse"] = Field([], description="One entry per playlist when the request was split")
+    error: Optional[str] = None
+
+
+class PlaylistUpdateResponse(BaseModel):
+    success: bool
+    playlist_id: Optional[str] = None
+    playlist_url: Optional[str] = None
+    title: Optional[str] = None
+    video_count: int = 0
+    inserted: int = 0
+    moved: int = 0
+    deleted: int = 0
+    quota_used: int = Field(0, description="YouTube quota units spent on the update")
+    quota_saved: int = Field(0, description="Quota units saved compared with rebuilding the playlist")
+    videos_skipped: List[VideoInfo] = []
+    error: Optional[str] = None
+
+
+class JobResponse(BaseModel):
+    id: str
+    status: str
+    playlist_id: Optional[str] = None
+    title: str
+    total_videos: int
+    inserted_videos: int
+    attempts: int
     error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
 
 
 class ValidateVideosResponse(BaseModel):
@@ -74,11 +124,12 @@ class PlaylistHistoryItem(BaseModel):
 
 class PlaylistHistoryResponse(BaseModel):
     playlists: List[PlaylistHistoryItem]
-    total: int
+    total: Optional[int] = None
     page: int
     per_page: int
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None
 
 
 class StatsResponse(BaseModel):
@@ -89,9 +140,21 @@ class StatsResponse(BaseModel):
     playlists_this_month: int
     most_common_videos: List[Dict[str, Any]]
     average_playlist_size: float
+    total_runtime_seconds: int = 0
+    average_playlist_runtime_seconds: float = 0
     api_usage: Dict[str, int]
 
 
+class MetricsResponse(BaseModel):
+    video_cache: Dict[str, int]
+    title_cache: Dict[str, int]
+    quota: Dict[str, float]
+    retry: Dict[str, float]
+    youtube_pool: Dict[str, int]
+    youtube_accounts: Dict[str, Dict[str, float]]
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+
 class HealthResponse(BaseModel):
     status: str = "healthy"
     version: str = "1.0.0"
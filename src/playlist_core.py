@@ -1,21 +1,47 @@
-import re
+import json
+import uuid
+import hashlib
+import asyncio
+import contextvars
 import logging
-from typing import List, Optional, Dict, Tuple
-from dataclasses import dataclass
-from urllib.parse import urlparse, parse_qs
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from functools import partial
+from collections import deque
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Dict, Tuple
+from dataclasses import dataclass, asdict, replace
 
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-import openai
 
 from .config import get_settings
 from .youtube_auth import YouTubeAuth
+from . import youtube_service
 from .database import db
+from .cache import VideoMetadataCache, TitleCache
+from .quota import QuotaScheduler, QuotaExceededError, AccountQuotaExceededError
+from .accounts import AccountRouter, YouTubeAccount
+from .title_engine import keyword_title
+from .durations import parse_duration
+from .playlist_diff import PlaylistEdit, EDIT_OPERATIONS, diff_playlist
+from .retry import AdaptiveLimiter, RetryPolicy, classify_error, error_reason, FATAL, QUOTA_REASONS
+from . import url_parser
 
 logger = logging.getLogger(__name__)
 
+# Title generation; bump the prompt version whenever the prompt changes
+TITLE_MODEL = "gpt-3.5-turbo"
+TITLE_PROMPT_VERSION = 1
 
-@dataclass
+# playlistItems.insert error reasons that mean the requested position was not accepted
+POSITION_ERROR_REASONS = {'invalidPlaylistItemPosition', 'manualSortRequired'}
+
+# Calls any account can make, so they can move to another account mid-request
+READ_OPERATIONS = {'videos.list', 'channels.list', 'search.list', 'playlistItems.list'}
+
+
+@dataclass(slots=True)
 class VideoInfo:
     video_id: str
     title: str
@@ -23,6 +49,11 @@ class VideoInfo:
     duration: str
     status: str = "valid"
     error: Optional[str] = None
+    
+    @property
+    def duration_seconds(self) -> Optional[int]:
+        """Length in seconds, or None when YouTube did not report it"""
+        return parse_duration(self.duration)
 
 
 @dataclass
@@ -36,131 +67,513 @@ class PlaylistResult:
     videos_added: List[VideoInfo] = None
     videos_skipped: List[VideoInfo] = None
     error: Optional[str] = None
+    job_id: Optional[str] = None
+    reused: bool = False
+    parts: List["PlaylistResult"] = None
+
+
+@dataclass
+class PlaylistUpdateResult:
+    success: bool
+    playlist_id: Optional[str] = None
+    playlist_url: Optional[str] = None
+    title: Optional[str] = None
+    video_count: int = 0
+    inserted: int = 0
+    moved: int = 0
+    deleted: int = 0
+    quota_used: int = 0
+    quota_saved: int = 0
+    videos_skipped: List[VideoInfo] = None
+    error: Optional[str] = None
+
+
+class IdempotencyConflictError(Exception):
+    """Raised when a repeated request cannot be replayed or started again"""
+
+
+def request_fingerprint(video_ids: List[str], title: Optional[str], privacy: str) -> str:
+    """Hash what determines a playlist: the ordered video IDs, the custom title and privacy"""
+    payload = json.dumps([video_ids, title, privacy], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
 
 
 class PlaylistGenerator:
     def __init__(self, youtube_api_key: str, openai_api_key: Optional[str] = None, use_oauth: bool = False):
         self.settings = get_settings()
         self.use_oauth = use_oauth
+        self.youtube_api_key = youtube_api_key
         
-        if use_oauth:
-            # Use OAuth for full YouTube functionality
-            self.youtube_auth = YouTubeAuth()
-            self.youtube = self.youtube_auth.get_youtube_service()
-        else:
-            # Use API key for read-only operations
-            self.youtube = build('youtube', 'v3', developerKey=youtube_api_key)
+        # YouTube services and the OpenAI client are created on first use, so
+        # constructing a generator (and importing this module) stays cheap
+        self._auth_lock = threading.Lock()
         
-        if openai_api_key and self.settings.enable_ai_titles:
-            openai.api_key = openai_api_key
-            self.openai_client = openai
-        else:
-            self.openai_client = None
+        # Blocking YouTube/OpenAI calls run on this pool so the event loop stays free.
+        # httplib2 connections are not thread-safe, so workers check services out of
+        # the account's ServicePool.
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.settings.youtube_max_workers,
+            thread_name_prefix="youtube"
+        )
+        # Separate pool for concurrent videos.list chunks: validate_videos itself
+        # runs on _executor, so sharing it could deadlock under load
+        self._validation_executor = ThreadPoolExecutor(
+            max_workers=max(1, self.settings.validation_concurrency),
+            thread_name_prefix="youtube-validate"
+        )
+        self.accounts = AccountRouter(self._load_accounts())
+        
+        self.retry = RetryPolicy(
+            AdaptiveLimiter(
+                initial=self.settings.youtube_max_concurrency,
+                max_limit=self.settings.youtube_max_concurrency * 4
+            ),
+            max_attempts=self.settings.youtube_max_attempts,
+            base_delay=self.settings.retry_base_delay,
+            max_delay=self.settings.retry_max_delay
+        )
+        
+        self._openai_api_key = openai_api_key if self.settings.enable_ai_titles else None
+        self._openai_client = None
+        self._openai_lock = threading.Lock()
+        
+        self.video_cache = VideoMetadataCache(
+            db,
+            ttl_seconds=self.settings.video_cache_ttl_seconds,
+            max_memory_entries=self.settings.video_cache_memory_entries,
+            max_db_entries=self.settings.video_cache_db_entries
+        )
+        self.title_cache = TitleCache(db, max_entries=self.settings.title_cache_entries)
+        
+        # The event loop only keeps weak references to tasks
+        self._background_tasks = set()
 
-    def extract_video_ids(self, urls: List[str]) -> List[str]:
-        """Extract YouTube video IDs from various URL formats"""
-        video_ids = []
+    @property
+    def openai_client(self):
+        """OpenAI module, imported on first use (None when AI titles are off)"""
+        if self._openai_client is None and self._openai_api_key:
+            with self._openai_lock:
+                if self._openai_client is None:
+                    import openai
+                    openai.api_key = self._openai_api_key
+                    self._openai_client = openai
+        return self._openai_client
+    
+    @openai_client.setter
+    def openai_client(self, client):
+        self._openai_client = client
+        if client is None:
+            self._openai_api_key = None
+    
+    def _load_accounts(self) -> List[YouTubeAccount]:
+        """One account per configured credential; API-key mode has a single account.
         
-        patterns = [
-            r'(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/shorts/|youtube\.com/embed/)([\w-]+)',
-            r'youtube\.com/.*[?&]v=([\w-]+)',
+        Raises ValueError when a configured account has no saved token, rather
+        than starting without it (or with another project's token).
+        """
+        specs = self.settings.get_youtube_accounts() if self.use_oauth else [
+            ("default", None, self.settings.youtube_daily_quota)
         ]
+        auths = {}
+        if self.use_oauth:
+            for name, token_file, _ in specs:
+                auth = YouTubeAuth(
+                    token_file=token_file,
+                    legacy_token_file=self.settings.get_legacy_token_file(token_file)
+                )
+                if not auth.store.exists():
+                    raise ValueError(
+                        f"No OAuth token for YouTube account '{name}' at {token_file}; "
+                        f"run: python setup_oauth.py --token-file {token_file}"
+                    )
+                auths[name] = auth
         
-        for url in urls:
-            video_id = None
-            url = url.strip()
+        # A lone account keeps the ledger shared with usage logged before accounts existed
+        shared_ledger = len(specs) == 1
+        return [
+            YouTubeAccount(
+                name,
+                QuotaScheduler(
+                    db,
+                    daily_limit=daily_quota,
+                    burst_units=self.settings.quota_burst_units,
+                    max_wait_seconds=self.settings.quota_max_wait_seconds,
+                    account=None if shared_ledger else name
+                ),
+                auth=auths.get(name)
+            )
+            for name, token_file, daily_quota in specs
+        ]
+    
+    def _current_account(self) -> YouTubeAccount:
+        """Account the calling code is using (the default one outside any routing)"""
+        return self.accounts.current() or self.accounts.default
+    
+    @property
+    def quota(self) -> QuotaScheduler:
+        """Quota scheduler of the account the calling code is using"""
+        return self._current_account().quota
+    
+    def _account_pool(self, account: YouTubeAccount) -> youtube_service.ServicePool:
+        """Pool of YouTube services sharing an account's credentials, authenticating on first use"""
+        if account.pool is None:
+            with self._auth_lock:
+                if account.pool is None:
+                    if account.auth is not None:
+                        account.auth.authenticate()
+                        account.auth.start_refresher(self.settings.oauth_refresh_lead_seconds)
+                        credentials = {'credentials': account.auth.credentials}
+                    else:
+                        credentials = {'developer_key': self.youtube_api_key}
+                    account.pool = youtube_service.get_pool(
+                        size=self.settings.youtube_pool_size,
+                        discovery_path=self.settings.youtube_discovery_path,
+                        **credentials
+                    )
+        return account.pool
+    
+    @contextmanager
+    def _service(self, account: Optional[YouTubeAccount] = None):
+        """Check a YouTube service out for the duration of a with block.
+        
+        The service belongs to the pinned account, or else to one routed by
+        remaining quota; calls made inside the block are charged to it.
+        """
+        account = account or self.accounts.current() or self.accounts.choose()
+        with self._account_pool(account).service() as youtube, self.accounts.routed(account):
+            yield youtube
+    
+    def youtube_pool_stats(self) -> Dict[str, int]:
+        """Return service pool counters summed over accounts (empty until the first YouTube call)"""
+        totals: Dict[str, int] = {}
+        for account in self.accounts.accounts:
+            if account.pool is not None:
+                for name, value in account.pool.stats().items():
+                    totals[name] = totals.get(name, 0) + value
+        return totals
+    
+    def _execute(self, request, operation: str, http=None):
+        """Execute a YouTube API request with quota accounting and retries
+        
+        When YouTube reports the account out of quota, the account is skipped
+        for the rest of the quota day. Reads outside a pinned playlist are then
+        replayed on another account; anything else raises AccountQuotaExceededError.
+        """
+        def attempt():
+            # Every attempt is charged: YouTube bills failed calls too
+            self.quota.acquire(operation)
+            return request.execute(http=http) if http else request.execute()
+        
+        try:
+            return self.retry.call(attempt)
+        except HttpError as e:
+            if error_reason(e) not in QUOTA_REASONS:
+                raise
+            account = self._current_account()
+            account.quota.exhaust()
+            if self.accounts.pinned_account() is not None or operation not in READ_OPERATIONS:
+                raise AccountQuotaExceededError(
+                    f"YouTube quota exhausted for account '{account.name}'", account=account.name
+                ) from e
+        
+        self.accounts.record_failover(account)
+        other = self.accounts.choose(self.quota.cost(operation), exclude={account.name})
+        with self._service(other) as youtube:
+            # OAuth credentials live on the connection, so the same request runs under the other account
+            return self._execute(request, operation, http=youtube._http)
+    
+    def run_in_background(self, coro) -> asyncio.Task:
+        """Start a fire-and-forget task, keeping it alive until it ends and logging any failure"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_task_done)
+        return task
+    
+    def _background_task_done(self, task: asyncio.Task):
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Background task {task.get_coro().__qualname__} failed: {task.exception()!r}")
+    
+    async def warm_up(self):
+        """Do the first-request work ahead of time: authenticate, build a service and import OpenAI"""
+        def build_service():
+            for account in self.accounts.accounts:
+                with self._service(account):
+                    pass
+        
+        try:
+            await self.run_blocking(build_service)
+            if self._openai_api_key:
+                await self.run_blocking(lambda: self.openai_client)
+        except Exception as e:
+            logger.warning(f"Warm-up failed, deferring to first request: {e}")
+
+    async def run_blocking(self, func, *args, **kwargs):
+        """Run a blocking call on the worker pool without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        # Copy the context so quota reservations follow the call into the worker
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, partial(context.run, func, *args, **kwargs))
+
+    def extract_video_ids(self, urls: List[str]) -> List[str]:
+        """Extract YouTube video IDs from various URL formats"""
+        return url_parser.extract_video_ids(urls)
+
+    def iter_video_ids(self, urls: Iterable[str]) -> Iterator[str]:
+        """Yield unique video IDs, expanding playlist and channel URLs page by page"""
+        seen = set()
+        for kind, value in url_parser.iter_sources(urls):
+            if kind == 'video':
+                source_ids = (value,)
+            elif kind == 'playlist':
+                source_ids = self._iter_playlist_video_ids(value)
+            else:
+                source_ids = self._iter_channel_video_ids(kind, value)
             
-            # Try each pattern
-            for pattern in patterns:
-                match = re.search(pattern, url)
-                if match:
-                    video_id = match.group(1)
-                    break
+            for video_id in source_ids:
+                if video_id not in seen:
+                    seen.add(video_id)
+                    yield video_id
+    
+    def _iter_playlist_video_ids(self, playlist_id: str) -> Iterator[str]:
+        """Page through playlistItems.list, yielding video IDs as pages arrive"""
+        remaining = self.settings.max_videos_per_source
+        page_token = None
+        
+        while remaining > 0:
+            try:
+                with self._service() as youtube:
+                    response = self._execute(youtube.playlistItems().list(
+                        part='contentDetails',
+                        playlistId=playlist_id,
+                        maxResults=min(50, remaining),
+                        pageToken=page_token
+                    ), 'playlistItems.list')
+            except HttpError as e:
+                logger.error(f"Failed to list playlist {playlist_id}: {e}")
+                return
+            
+            for item in response.get('items', [])[:remaining]:
+                remaining -= 1
+                yield item['contentDetails']['videoId']
             
-            # Fallback: parse query parameters
-            if not video_id:
-                parsed = urlparse(url)
-                if parsed.netloc in ['www.youtube.com', 'youtube.com', 'm.youtube.com']:
-                    query_params = parse_qs(parsed.query)
-                    video_id = query_params.get('v', [None])[0]
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return
+        
+        logger.info(f"Stopped expanding playlist {playlist_id} at {self.settings.max_videos_per_source} videos")
+    
+    def _iter_channel_video_ids(self, kind: str, value: str) -> Iterator[str]:
+        """Yield video IDs from a channel's uploads playlist"""
+        try:
+            with self._service() as youtube:
+                if kind == 'channel':
+                    request = youtube.channels().list(part='contentDetails', id=value)
+                elif kind == 'user':
+                    request = youtube.channels().list(part='contentDetails', forUsername=value)
+                else:
+                    # Exact handle lookup (1 unit); youtube_service declares forHandle for older documents
+                    request = youtube.channels().list(part='contentDetails', forHandle=value)
             
-            if video_id and video_id not in video_ids:
-                video_ids.append(video_id)
-                logger.info(f"Extracted video ID: {video_id}")
+                response = self._execute(request, 'channels.list')
+        except HttpError as e:
+            logger.error(f"Failed to look up channel {value}: {e}")
+            return
+        
+        items = response.get('items', [])
+        if not items:
+            logger.warning(f"Channel not found: {value}")
+            return
         
-        return video_ids
+        uploads_id = items[0]['contentDetails']['relatedPlaylists']['uploads']
+        yield from self._iter_playlist_video_ids(uploads_id)
 
-    def validate_videos(self, video_ids: List[str]) -> Tuple[List[VideoInfo], List[VideoInfo]]:
+    def validate_videos(self, video_ids: Iterable[str]) -> Tuple[List[VideoInfo], List[VideoInfo]]:
         """Validate videos exist and are accessible"""
         valid_videos = []
         invalid_videos = []
         
-        # YouTube API allows up to 50 video IDs per request
-        for i in range(0, len(video_ids), 50):
-            batch_ids = video_ids[i:i + 50]
+        for video_info in self.iter_validated_videos(video_ids):
+            if video_info.status == 'valid':
+                valid_videos.append(video_info)
+            else:
+                invalid_videos.append(video_info)
+        
+        return valid_videos, invalid_videos
+    
+    def iter_validated_videos(self, video_ids: Iterable[str]) -> Iterator[VideoInfo]:
+        """Validate a stream of video IDs, yielding results in input order.
+        
+        IDs are read incrementally: cache hits resolve immediately, misses are
+        grouped into 50-ID videos.list calls that run on the validation pool with
+        at most validation_concurrency calls in flight.
+        """
+        limit = max(1, self.settings.validation_concurrency)
+        in_flight = deque()
+        hits = misses = 0
+        
+        # Current group: every ID consumed until its batch of misses is full
+        group_ids, group_cached, group_missing = [], {}, []
+        
+        def close_group():
+            nonlocal group_ids, group_cached, group_missing
+            future = None
+            if group_missing:
+                future = self._validation_executor.submit(self._fetch_video_batch, group_missing)
+            in_flight.append((group_ids, group_cached, future))
+            group_ids, group_cached, group_missing = [], {}, []
+        
+        def resolve(group):
+            ids, cached, future = group
+            fetched = future.result() if future else {}
+            for video_id in ids:
+                if video_id in cached:
+                    yield VideoInfo(**cached[video_id])
+                else:
+                    yield fetched[video_id]
+        
+        video_ids = iter(video_ids)
+        while True:
+            # Look up the cache 50 IDs at a time
+            window = list(islice(video_ids, 50))
+            if not window:
+                break
             
-            try:
-                response = self.youtube.videos().list(
+            cached = self.video_cache.get_many(window)
+            hits += len(cached)
+            for video_id in window:
+                group_ids.append(video_id)
+                if video_id in cached:
+                    group_cached[video_id] = cached[video_id]
+                else:
+                    misses += 1
+                    group_missing.append(video_id)
+                    # YouTube API allows up to 50 video IDs per request
+                    if len(group_missing) == 50:
+                        close_group()
+            
+            while len(in_flight) > limit:
+                yield from resolve(in_flight.popleft())
+        
+        if group_ids:
+            close_group()
+        while in_flight:
+            yield from resolve(in_flight.popleft())
+        
+        logger.info(f"Video cache: {hits} hits, {misses} misses for {hits + misses} videos")
+    
+    def _fetch_video_batch(self, batch_ids: List[str]) -> Dict[str, VideoInfo]:
+        """Fetch and classify up to 50 videos with a single videos.list call"""
+        videos = {}
+        
+        try:
+            with self._service() as youtube:
+                response = self._execute(youtube.videos().list(
                     part='snippet,status,contentDetails',
                     id=','.join(batch_ids)
-                ).execute()
-                
-                found_ids = {item['id'] for item in response.get('items', [])}
-                
-                # Process found videos
-                for item in response.get('items', []):
-                    video_info = VideoInfo(
-                        video_id=item['id'],
-                        title=item['snippet']['title'],
-                        channel=item['snippet']['channelTitle'],
-                        duration=item['contentDetails']['duration']
-                    )
-                    
-                    # Check if video is playable
-                    if item['status']['privacyStatus'] == 'private':
-                        video_info.status = 'invalid'
-                        video_info.error = 'Video is private'
-                        invalid_videos.append(video_info)
-                    elif item['status'].get('embeddable') == False:
-                        video_info.status = 'invalid'
-                        video_info.error = 'Video is not embeddable'
-                        invalid_videos.append(video_info)
-                    else:
-                        valid_videos.append(video_info)
-                
-                # Process not found videos
-                for video_id in batch_ids:
-                    if video_id not in found_ids:
-                        invalid_videos.append(VideoInfo(
-                            video_id=video_id,
-                            title="Unknown",
-                            channel="Unknown",
-                            duration="Unknown",
-                            status='invalid',
-                            error='Video not found'
-                        ))
-                
-            except HttpError as e:
-                logger.error(f"YouTube API error: {e}")
-                for video_id in batch_ids:
-                    invalid_videos.append(VideoInfo(
-                        video_id=video_id,
-                        title="Unknown",
-                        channel="Unknown",
-                        duration="Unknown",
-                        status='invalid',
-                        error=f'API error: {str(e)}'
-                    ))
+                ), 'videos.list')
+            
+        except HttpError as e:
+            logger.error(f"YouTube API error: {e}")
+            # Transient failures are reported but never cached
+            return {
+                video_id: VideoInfo(
+                    video_id=video_id,
+                    title="Unknown",
+                    channel="Unknown",
+                    duration="Unknown",
+                    status='invalid',
+                    error=f'API error: {str(e)}'
+                )
+                for video_id in batch_ids
+            }
         
-        return valid_videos, invalid_videos
+        # Process found videos
+        for item in response.get('items', []):
+            video_info = VideoInfo(
+                video_id=item['id'],
+                title=item['snippet']['title'],
+                channel=item['snippet']['channelTitle'],
+                duration=item['contentDetails']['duration']
+            )
+            
+            # Check if video is playable
+            if item['status']['privacyStatus'] == 'private':
+                video_info.status = 'invalid'
+                video_info.error = 'Video is private'
+            elif item['status'].get('embeddable') == False:
+                video_info.status = 'invalid'
+                video_info.error = 'Video is not embeddable'
+            
+            videos[video_info.video_id] = video_info
+        
+        # Process not found videos
+        for video_id in batch_ids:
+            if video_id not in videos:
+                videos[video_id] = VideoInfo(
+                    video_id=video_id,
+                    title="Unknown",
+                    channel="Unknown",
+                    duration="Unknown",
+                    status='invalid',
+                    error='Video not found'
+                )
+        
+        self.video_cache.put_many([asdict(v) for v in videos.values()])
+        
+        return videos
 
     async def generate_title(self, videos: List[VideoInfo]) -> str:
-        """Generate a creative playlist title using AI"""
-        if not self.openai_client or not videos:
+        """Generate a playlist title using the configured TITLE_STRATEGY"""
+        if not videos:
             return "My YouTube Playlist"
         
+        strategy = self.settings.title_strategy
+        if not self.openai_client:
+            return "My YouTube Playlist" if strategy == "openai" else self.local_title(videos)
+        if strategy == "local":
+            return self.local_title(videos)
+        
+        if strategy == "race":
+            # The AI call keeps running past the budget so its title still gets cached
+            ai_task = asyncio.ensure_future(self._generate_ai_title(videos))
+            try:
+                title = await asyncio.wait_for(
+                    asyncio.shield(ai_task), self.settings.title_race_budget_ms / 1000
+                )
+            except asyncio.TimeoutError:
+                logger.info("AI title missed its latency budget; using keyword title")
+                return self.local_title(videos)
+        else:
+            title = await self._generate_ai_title(videos)
+        
+        return title or self.fallback_title(videos)
+    
+    def local_title(self, videos: List[VideoInfo]) -> str:
+        """Build a title offline from the video titles and channel names"""
+        title = keyword_title([v.title for v in videos], [v.channel for v in videos])
+        return title or f"My Collection ({len(videos)} videos)"
+    
+    def fallback_title(self, videos: List[VideoInfo]) -> str:
+        """Title used when the AI title is unavailable"""
+        if self.settings.title_strategy == "openai":
+            return f"My Collection ({len(videos)} videos)"
+        return self.local_title(videos)
+    
+    async def _generate_ai_title(self, videos: List[VideoInfo]) -> Optional[str]:
+        """Ask OpenAI for a creative title, or return None on failure"""
+        # Reuse the title generated for the exact same prompt inputs
+        prompt_titles = [v.title for v in videos[:10]]
+        cache_key = self.title_cache.make_key(TITLE_MODEL, TITLE_PROMPT_VERSION, prompt_titles)
+        cached_title = await self.run_blocking(self.title_cache.get, cache_key)
+        if cached_title:
+            await self.run_blocking(
+                db.log_api_usage, "openai", "generate_title_cached", tokens_used=0, cost_estimate=0
+            )
+            return cached_title
+        
         # Prepare video list for prompt
-        video_list = "\n".join([f"{i+1}. {v.title}" for i, v in enumerate(videos[:10])])
+        video_list = "\n".join([f"{i+1}. {title}" for i, title in enumerate(prompt_titles)])
         
         prompt = f"""Given these YouTube videos:
 {video_list}
@@ -169,8 +582,9 @@ Generate a creative, concise playlist title (max 60 characters) that captures th
 Return only the title, nothing else."""
         
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            response = await self.run_blocking(
+                self.openai_client.chat.completions.create,
+                model=TITLE_MODEL,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=50,
                 temperature=0.7
@@ -181,11 +595,17 @@ Return only the title, nothing else."""
             if len(title) > 60:
                 title = title[:57] + "..."
             
+            usage = getattr(response, 'usage', None)
+            await self.run_blocking(
+                db.log_api_usage, "openai", "generate_title", tokens_used=getattr(usage, 'total_tokens', None)
+            )
+            await self.run_blocking(self.title_cache.put, cache_key, title, TITLE_MODEL)
+            
             return title
             
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
-            return f"My Collection ({len(videos)} videos)"
+            return None
 
     def create_youtube_playlist(
         self, 
@@ -209,10 +629,11 @@ Return only the title, nothing else."""
                 }
             }
             
-            response = self.youtube.playlists().insert(
-                part='snippet,status',
-                body=request_body
-            ).execute()
+            with self._service() as youtube:
+                response = self._execute(youtube.playlists().insert(
+                    part='snippet,status',
+                    body=request_body
+                ), 'playlists.insert')
             
             logger.info(f"Created playlist: {response['id']}")
             return response
@@ -221,71 +642,243 @@ Return only the title, nothing else."""
             logger.error(f"Failed to create playlist: {e}")
             raise
     
+    def update_youtube_playlist(self, playlist_id: str, title: str, description: str) -> Dict:
+        """Replace a playlist's title and description (requires OAuth)"""
+        if not self.use_oauth:
+            raise ValueError("OAuth authentication required to modify playlists")
+        
+        with self._service() as youtube:
+            response = self._execute(youtube.playlists().update(
+                part='snippet',
+                body={
+                    'id': playlist_id,
+                    'snippet': {
+                        'title': title,
+                        'description': description,
+                        'defaultLanguage': 'en'
+                    }
+                }
+            ), 'playlists.update')
+        
+        logger.info(f"Updated playlist {playlist_id} title to '{title}'")
+        return response
+    
     def add_videos_to_playlist(
         self,
         playlist_id: str,
-        video_ids: List[str]
+        video_ids: List[str],
+        batched: Optional[bool] = None,
+        inserted: Optional[Dict[int, Optional[str]]] = None,
+        on_inserted: Optional[Callable[[int, str, Dict], None]] = None
     ) -> List[Dict]:
-        """Add videos to a playlist (requires OAuth)"""
+        """Add videos to a playlist (requires OAuth)
+        
+        inserted maps indexes already in the playlist (e.g. from an earlier,
+        interrupted attempt) to their playlist item IDs; those are skipped.
+        on_inserted(index, video_id, response) is called after each successful insert.
+        """
         if not self.use_oauth:
             raise ValueError("OAuth authentication required to modify playlists")
         
-        results = []
-        for position, video_id in enumerate(video_ids):
-            try:
-                request_body = {
-                    'snippet': {
-                        'playlistId': playlist_id,
-                        'resourceId': {
-                            'kind': 'youtube#video',
-                            'videoId': video_id
-                        },
-                        'position': position
-                    }
-                }
-                
-                response = self.youtube.playlistItems().insert(
-                    part='snippet',
-                    body=request_body
-                ).execute()
-                
-                results.append({
-                    'video_id': video_id,
-                    'success': True,
-                    'response': response
-                })
-                logger.info(f"Added video {video_id} to playlist")
+        if batched is None:
+            batched = self.settings.batch_playlist_inserts
+        
+        results: List[Optional[Dict]] = [None] * len(video_ids)
+        for index, playlist_item_id in (inserted or {}).items():
+            results[index] = {
+                'video_id': video_ids[index],
+                'success': True,
+                'response': {'id': playlist_item_id},
+                'resumed': True
+            }
+        pending = [index for index, result in enumerate(results) if result is None]
+        
+        if batched:
+            batch_size = self.settings.playlist_insert_batch_size
+            for start in range(0, len(pending), batch_size):
+                indexes = pending[start:start + batch_size]
+                rejected = self._insert_batch(playlist_id, video_ids, indexes, results, on_inserted)
                 
-            except HttpError as e:
-                logger.error(f"Failed to add video {video_id}: {e}")
-                results.append({
+                if rejected:
+                    # The API refused out-of-order positions: finish one by one, in order
+                    logger.warning(
+                        f"Batch insert rejected {len(rejected)} positions, "
+                        "falling back to sequential inserts"
+                    )
+                    remaining = rejected + pending[start + batch_size:]
+                    self._insert_sequential(playlist_id, video_ids, remaining, results, on_inserted)
+                    break
+        else:
+            self._insert_sequential(playlist_id, video_ids, pending, results, on_inserted)
+        
+        return results
+    
+    @staticmethod
+    def _mark_inserted(
+        results: List[Optional[Dict]],
+        index: int,
+        video_id: str,
+        response: Dict,
+        on_inserted: Optional[Callable[[int, str, Dict], None]]
+    ):
+        """Record a successful insert and checkpoint it"""
+        # Keep only the item ID: full playlistItem resources add up on large playlists
+        results[index] = {
+            'video_id': video_id,
+            'success': True,
+            'response': {'id': response.get('id')}
+        }
+        logger.info(f"Added video {video_id} to playlist")
+        if on_inserted:
+            on_inserted(index, video_id, response)
+    
+    def _insert_request(self, youtube, playlist_id: str, video_id: str, position: Optional[int]):
+        """Build a playlistItems.insert request; without a position the video is appended"""
+        snippet = {
+            'playlistId': playlist_id,
+            'resourceId': {
+                'kind': 'youtube#video',
+                'videoId': video_id
+            }
+        }
+        if position is not None:
+            snippet['position'] = position
+        return youtube.playlistItems().insert(part='snippet', body={'snippet': snippet})
+    
+    @staticmethod
+    def _target_position(index: int, results: List[Optional[Dict]]) -> int:
+        """Playlist position for video_ids[index]: the number of earlier videos actually inserted"""
+        return sum(1 for r in results[:index] if r and r['success'])
+    
+    def _insert_sequential(
+        self,
+        playlist_id: str,
+        video_ids: List[str],
+        indexes,
+        results: List[Optional[Dict]],
+        on_inserted: Optional[Callable[[int, str, Dict], None]] = None
+    ):
+        """Insert the given videos one request at a time, in order"""
+        with self._service() as youtube:
+            for index in indexes:
+                video_id = video_ids[index]
+                try:
+                    response = self._execute(self._insert_request(
+                        youtube, playlist_id, video_id, self._target_position(index, results)
+                    ), 'playlistItems.insert')
+                    
+                    self._mark_inserted(results, index, video_id, response, on_inserted)
+                    
+                except HttpError as e:
+                    logger.error(f"Failed to add video {video_id}: {e}")
+                    results[index] = {
+                        'video_id': video_id,
+                        'success': False,
+                        'error': str(e)
+                    }
+    
+    def _insert_batch(
+        self,
+        playlist_id: str,
+        video_ids: List[str],
+        indexes: List[int],
+        results: List[Optional[Dict]],
+        on_inserted: Optional[Callable[[int, str, Dict], None]] = None
+    ) -> List[int]:
+        """Insert videos with one batch HTTP request.
+        
+        Returns the indexes the API rejected because of their position; those are
+        left unset in results so the caller can retry them sequentially.
+        """
+        rejected = []
+        base_position = self._target_position(indexes[0], results)
+        # When the batch goes at the end of the playlist, positions are left out: with
+        # them, one video that fails for good would push every later one past the end
+        appending = not any(r and r['success'] for r in results[indexes[0]:])
+        
+        def callback(request_id, response, exception):
+            index = int(request_id)
+            video_id = video_ids[index]
+            if exception is None:
+                self._mark_inserted(results, index, video_id, response, on_inserted)
+                return
+            
+            kind = classify_error(exception)
+            self.retry.observe(kind)
+            reason = error_reason(exception)
+            if reason in QUOTA_REASONS:
+                # The sequential retry raises AccountQuotaExceededError for the whole job
+                self._current_account().quota.exhaust()
+            if (
+                kind != FATAL
+                or reason in POSITION_ERROR_REASONS
+                or reason in QUOTA_REASONS
+                or getattr(exception, 'status_code', None) == 409
+            ):
+                # Position conflicts and throttled/transient failures are retried sequentially
+                rejected.append(index)
+            else:
+                logger.error(f"Failed to add video {video_id}: {exception}")
+                results[index] = {
                     'video_id': video_id,
                     'success': False,
-                    'error': str(e)
-                })
+                    'error': str(exception)
+                }
         
-        return results
+        with self._service() as youtube:
+            batch = youtube.new_batch_http_request(callback=callback)
+            for offset, index in enumerate(indexes):
+                self.quota.acquire('playlistItems.insert')
+                position = None if appending else base_position + offset
+                batch.add(
+                    self._insert_request(youtube, playlist_id, video_ids[index], position),
+                    request_id=str(index)
+                )
+            
+            try:
+                batch.execute()
+            except HttpError as e:
+                # The batch itself failed; let the sequential path handle this chunk
+                logger.error(f"Batch insert failed: {e}")
+                return [index for index in indexes if results[index] is None]
+        
+        return sorted(rejected)
 
     async def create_playlist(
         self,
         video_urls: List[str],
         custom_title: Optional[str] = None,
-        description: Optional[str] = None
+        description: Optional[str] = None,
+        privacy: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+        split_size: Optional[int] = None,
+        created_by: str = "api",
+        user_identifier: Optional[str] = None
     ) -> PlaylistResult:
-        """Main function to create a playlist from YouTube URLs"""
+        """Main function to create a playlist from YouTube URLs
+        
+        An identical request (same videos, title and privacy) within
+        IDEMPOTENCY_WINDOW_SECONDS, or one with the same idempotency_key,
+        returns the playlist created the first time instead of a new one.
+        With split_size, the videos are spread over as many playlists of at
+        most split_size videos as needed, returned in result.parts.
+        created_by and user_identifier attribute the playlist in the history
+        and statistics.
+        """
+        privacy = privacy or self.settings.default_playlist_privacy
         
-        # Extract video IDs
-        video_ids = self.extract_video_ids(video_urls)
+        # Extract video IDs, expanding playlists and channels as they are validated
+        video_ids = self.iter_video_ids(video_urls)
         
-        if not video_ids:
+        # Validate videos
+        valid_videos, invalid_videos = await self.run_blocking(self.validate_videos, video_ids)
+        
+        if not valid_videos and not invalid_videos:
             return PlaylistResult(
                 success=False,
                 error="No valid YouTube URLs found"
             )
         
-        # Validate videos
-        valid_videos, invalid_videos = self.validate_videos(video_ids)
-        
         if not valid_videos:
             return PlaylistResult(
                 success=False,
@@ -293,6 +886,209 @@ Return only the title, nothing else."""
                 videos_skipped=invalid_videos
             )
         
+        # YouTube playlists hold at most max_videos_per_playlist items
+        limit = self.settings.max_videos_per_playlist
+        part_size = min(split_size or limit, limit)
+        if not split_size and len(valid_videos) > limit:
+            invalid_videos.extend(
+                replace(v, status="skipped", error=f"Playlist limit of {limit} videos reached")
+                for v in valid_videos[limit:]
+            )
+            del valid_videos[limit:]
+        
+        if not self.use_oauth:
+            return await self._mock_playlist(valid_videos, invalid_videos, custom_title, description)
+        
+        if len(valid_videos) > part_size:
+            return await self._create_split_playlists(
+                valid_videos, invalid_videos, part_size, custom_title, description, privacy, idempotency_key,
+                created_by, user_identifier
+            )
+        return await self._create_single_playlist(
+            valid_videos, invalid_videos, custom_title, description, privacy, idempotency_key,
+            created_by, user_identifier
+        )
+    
+    async def _create_single_playlist(
+        self,
+        valid_videos: List[VideoInfo],
+        invalid_videos: List[VideoInfo],
+        custom_title: Optional[str],
+        description: Optional[str],
+        privacy: str,
+        idempotency_key: Optional[str],
+        created_by: str,
+        user_identifier: Optional[str]
+    ) -> PlaylistResult:
+        """Create one playlist for validated videos, or replay an identical earlier request"""
+        fingerprint = request_fingerprint([v.video_id for v in valid_videos], custom_title, privacy)
+        replayed = await self._replay_request(fingerprint, idempotency_key)
+        if replayed:
+            replayed.videos_skipped = invalid_videos
+            return replayed
+        
+        # Admit the whole write phase up front so quota never runs out halfway through a playlist
+        write_cost = (
+            self.quota.cost('playlists.insert')
+            + self.quota.cost('playlistItems.insert') * len(valid_videos)
+        )
+        if self._pipelines_title(custom_title):
+            # Covers patching the provisional title if the AI title arrives late
+            write_cost += self.quota.cost('playlists.update')
+        account, reservation = await self.run_blocking(self.accounts.reserve, write_cost)
+        
+        with reservation, self.accounts.pinned(account):
+            return await self._publish_playlist(
+                valid_videos,
+                invalid_videos,
+                custom_title,
+                description,
+                privacy=privacy,
+                fingerprint=fingerprint,
+                idempotency_key=idempotency_key,
+                created_by=created_by,
+                user_identifier=user_identifier
+            )
+    
+    async def _create_split_playlists(
+        self,
+        valid_videos: List[VideoInfo],
+        invalid_videos: List[VideoInfo],
+        part_size: int,
+        custom_title: Optional[str],
+        description: Optional[str],
+        privacy: str,
+        idempotency_key: Optional[str],
+        created_by: str,
+        user_identifier: Optional[str]
+    ) -> PlaylistResult:
+        """Create "Title (Part i/N)" playlists of at most part_size videos, concurrently"""
+        chunks = [valid_videos[start:start + part_size] for start in range(0, len(valid_videos), part_size)]
+        fingerprints = [
+            request_fingerprint([v.video_id for v in chunk], custom_title, privacy) for chunk in chunks
+        ]
+        keys = [f"{idempotency_key}:{number}" if idempotency_key else None for number in range(1, len(chunks) + 1)]
+        
+        # Parts an earlier identical request already created are replayed, not rebuilt
+        outcomes: List = [
+            await self._replay_request(fingerprint, key) for fingerprint, key in zip(fingerprints, keys)
+        ]
+        pending = [index for index, outcome in enumerate(outcomes) if outcome is None]
+        
+        if pending:
+            costs = {
+                index: self.quota.cost('playlists.insert') + self.quota.cost('playlistItems.insert') * len(chunks[index])
+                for index in pending
+            }
+            # Fail before creating anything when the accounts together cannot hold every part
+            remaining = await self.run_blocking(self.accounts.remaining)
+            if remaining < sum(costs.values()):
+                raise QuotaExceededError(
+                    f"YouTube quota exhausted: {sum(costs.values())} units needed for {len(pending)} playlists, "
+                    f"{remaining} remaining today over all accounts"
+                )
+            
+            title, combined_description = await self._resolve_title(valid_videos, custom_title, description)
+            
+            async def publish_part(index: int) -> PlaylistResult:
+                # Each part reserves and pins its own account, so parts spread over the accounts
+                account, reservation = await self.run_blocking(self.accounts.reserve, costs[index])
+                with reservation, self.accounts.pinned(account):
+                    return await self._publish_playlist(
+                        chunks[index],
+                        [],
+                        f"{title} (Part {index + 1}/{len(chunks)})",
+                        description or self._default_description(chunks[index]),
+                        privacy=privacy,
+                        fingerprint=fingerprints[index],
+                        idempotency_key=keys[index],
+                        created_by=created_by,
+                        user_identifier=user_identifier
+                    )
+            
+            created = await asyncio.gather(*(publish_part(index) for index in pending), return_exceptions=True)
+            for index, outcome in zip(pending, created):
+                outcomes[index] = outcome
+        else:
+            title = custom_title or (outcomes[0].title or "").rsplit(" (Part ", 1)[0]
+            combined_description = description or self._default_description(valid_videos)
+        
+        parts = []
+        for number, outcome in enumerate(outcomes, 1):
+            if isinstance(outcome, Exception):
+                logger.error(f"Failed to create part {number}/{len(chunks)}: {outcome}")
+                outcome = PlaylistResult(success=False, error=str(outcome))
+            parts.append(outcome)
+        
+        created = [part for part in parts if part.success]
+        errors = [f"Part {number}: {part.error}" for number, part in enumerate(parts, 1) if not part.success]
+        
+        # The combined result lists the videos once; parts only carry their playlist
+        videos_added = []
+        for part in created:
+            videos_added.extend(part.videos_added or [])
+            part.videos_added = []
+        
+        return PlaylistResult(
+            success=not errors,
+            playlist_id=created[0].playlist_id if created else None,
+            playlist_url=created[0].playlist_url if created else None,
+            title=title,
+            description=combined_description,
+            video_count=sum(part.video_count for part in created),
+            videos_added=videos_added,
+            videos_skipped=invalid_videos,
+            error="; ".join(errors) or None,
+            parts=parts
+        )
+    
+    async def _replay_request(self, fingerprint: str, idempotency_key: Optional[str]) -> Optional[PlaylistResult]:
+        """Return the outcome of an earlier identical request, resuming it if it was interrupted"""
+        window = self.settings.idempotency_window_seconds
+        if not idempotency_key and window <= 0:
+            return None
+        
+        # An unfinished job takes precedence: its playlist may be missing videos
+        job = await self.run_blocking(
+            db.find_idempotent_job,
+            fingerprint,
+            idempotency_key,
+            window,
+            self.settings.job_stale_seconds,
+            self.settings.max_job_attempts
+        )
+        if job:
+            if job['fingerprint'] != fingerprint:
+                raise IdempotencyConflictError("Idempotency-Key was already used for a different request")
+            if not job['resumable']:
+                raise IdempotencyConflictError(f"An identical request is already in progress (job {job['id']})")
+            if job['exhausted']:
+                raise IdempotencyConflictError(
+                    f"Job {job['id']} for this Idempotency-Key failed after {job['attempts']} attempts: {job['error']}"
+                )
+            logger.info(f"Resuming job {job['id']} for a repeated request")
+            return await self.resume_job(job['id'])
+        
+        playlist = await self.run_blocking(db.find_idempotent_playlist, fingerprint, idempotency_key, window)
+        if not playlist:
+            return None
+        if playlist['fingerprint'] is None:
+            raise IdempotencyConflictError(
+                f"Playlist {playlist['youtube_id']} for this Idempotency-Key has been edited since it was created"
+            )
+        if playlist['fingerprint'] != fingerprint:
+            raise IdempotencyConflictError("Idempotency-Key was already used for a different request")
+        
+        logger.info(f"Reusing playlist {playlist['youtube_id']} for a repeated request")
+        return self._replayed_result(playlist)
+    
+    async def _resolve_title(
+        self,
+        valid_videos: List[VideoInfo],
+        custom_title: Optional[str],
+        description: Optional[str]
+    ) -> Tuple[str, str]:
+        """Pick the playlist title and description"""
         # Generate title if not provided
         if not custom_title:
             title = await self.generate_title(valid_videos)
@@ -301,93 +1097,518 @@ Return only the title, nothing else."""
         
         # Generate description
         if not description:
-            description = f"Playlist with {len(valid_videos)} videos created by YouTube Playlist Generator"
+            description = self._default_description(valid_videos)
         
-        # Create the playlist if OAuth is enabled
-        if self.use_oauth:
+        return title, description
+    
+    @staticmethod
+    def _default_description(valid_videos: List[VideoInfo]) -> str:
+        return f"Playlist with {len(valid_videos)} videos created by YouTube Playlist Generator"
+    
+    def _pipelines_title(self, custom_title: Optional[str]) -> bool:
+        """Whether the AI title is generated concurrently with playlist population"""
+        return bool(
+            not custom_title
+            and self.openai_client
+            and self.settings.title_strategy != "local"
+            and self.settings.pipeline_title_generation
+        )
+    
+    async def _publish_playlist(
+        self,
+        valid_videos: List[VideoInfo],
+        invalid_videos: List[VideoInfo],
+        custom_title: Optional[str],
+        description: Optional[str],
+        privacy: str,
+        fingerprint: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+        created_by: str = "api",
+        user_identifier: Optional[str] = None
+    ) -> PlaylistResult:
+        """Create the YouTube playlist as a durable job, add the videos and record it"""
+        title_task = None
+        if self._pipelines_title(custom_title):
+            # Start on a provisional title; the AI title is patched in once it arrives
+            title_task = asyncio.create_task(self.generate_title(valid_videos))
+            title = self.fallback_title(valid_videos)
+            description = description or self._default_description(valid_videos)
+        else:
+            title, description = await self._resolve_title(valid_videos, custom_title, description)
+        
+        # Checkpoint the job before touching YouTube so a crash can be resumed
+        job_id = str(uuid.uuid4())
+        created = await self.run_blocking(
+            db.create_playlist_job,
+            job_id=job_id,
+            title=title,
+            privacy=privacy,
+            videos=[asdict(v) for v in valid_videos],
+            created_by=created_by,
+            user_identifier=user_identifier,
+            description=description,
+            fingerprint=fingerprint,
+            idempotency_key=idempotency_key
+        )
+        if not created:
+            if title_task:
+                title_task.cancel()
+            return PlaylistResult(
+                success=False,
+                error="Failed to record playlist job",
+                videos_skipped=invalid_videos
+            )
+        
+        result = await self._run_job(job_id, title_task)
+        result.videos_skipped = invalid_videos
+        return result
+    
+    async def resume_job(self, job_id: str) -> PlaylistResult:
+        """Resume a failed or abandoned playlist job at its first missing video"""
+        if not self.use_oauth:
+            raise ValueError("OAuth authentication required to modify playlists")
+        
+        job = await self.run_blocking(db.get_playlist_job, job_id)
+        if not job:
+            return PlaylistResult(success=False, error=f"Job {job_id} not found")
+        if job['status'] == 'completed':
+            return self._job_result(job, len(job['inserted']))
+        
+        claimed = await self.run_blocking(db.claim_playlist_job, job_id, self.settings.job_stale_seconds)
+        if not claimed:
+            return PlaylistResult(success=False, error=f"Job {job_id} is already running", job_id=job_id)
+        
+        write_cost = self._job_write_cost(job)
+        try:
+            if job['youtube_id']:
+                # The playlist exists, so only its owner can fill it
+                account = self.accounts.get(job['account'])
+                reservation = await self.run_blocking(account.quota.reserve, write_cost)
+            else:
+                account, reservation = await self.run_blocking(self.accounts.reserve, write_cost)
+        except (QuotaExceededError, ValueError) as e:
+            await self.run_blocking(db.finish_playlist_job, job_id, 'failed', str(e))
+            raise
+        
+        with reservation, self.accounts.pinned(account):
+            return await self._run_job(job_id)
+    
+    def _job_write_cost(self, job: Dict) -> int:
+        """Quota units needed to finish a job"""
+        missing = len(job['videos']) - len(job['inserted'])
+        write_cost = self.quota.cost('playlistItems.insert') * missing
+        if not job['youtube_id']:
+            write_cost += self.quota.cost('playlists.insert')
+        return write_cost
+    
+    async def update_playlist(
+        self,
+        playlist_id: str,
+        video_urls: List[str],
+        title: Optional[str] = None,
+        description: Optional[str] = None
+    ) -> PlaylistUpdateResult:
+        """Bring a stored playlist to a new video list with the fewest item operations
+        
+        Only the inserts, moves and deletes found by diff_playlist() are sent,
+        instead of the 50 + 50 x N units of rebuilding the playlist.
+        """
+        if not self.use_oauth:
+            raise ValueError("OAuth authentication required to modify playlists")
+        
+        playlist = await self.run_blocking(db.get_playlist_by_id, playlist_id)
+        if not playlist:
+            return PlaylistUpdateResult(success=False, error=f"Playlist {playlist_id} not found")
+        youtube_id = playlist['youtube_id']
+        
+        valid_videos, invalid_videos = await self.run_blocking(
+            self.validate_videos, self.iter_video_ids(video_urls)
+        )
+        if not valid_videos:
+            return PlaylistUpdateResult(
+                success=False,
+                playlist_id=youtube_id,
+                error="No valid videos found",
+                videos_skipped=invalid_videos
+            )
+        
+        # An update cannot split the playlist, so videos past the limit are skipped
+        limit = self.settings.max_videos_per_playlist
+        if len(valid_videos) > limit:
+            invalid_videos.extend(
+                replace(v, status="skipped", error=f"Playlist limit of {limit} videos reached")
+                for v in valid_videos[limit:]
+            )
+            del valid_videos[limit:]
+        
+        # Only the account that owns the playlist can change it
+        owner = self.accounts.get(playlist.get('account'))
+        with self.accounts.pinned(owner):
+            return await self._apply_playlist_update(playlist, valid_videos, invalid_videos, title, description)
+    
+    async def _apply_playlist_update(
+        self,
+        playlist: Dict,
+        valid_videos: List[VideoInfo],
+        invalid_videos: List[VideoInfo],
+        title: Optional[str],
+        description: Optional[str]
+    ) -> PlaylistUpdateResult:
+        """Diff a stored playlist against the validated videos and apply the edits"""
+        playlist_id = playlist['id']
+        youtube_id = playlist['youtube_id']
+        quota_used = 0
+        current = [(v['video_id'], v['playlist_item_id']) for v in playlist['videos']]
+        if any(item_id is None for _, item_id in current):
+            # Item IDs were not recorded (older or partially filled playlist): read the live playlist
+            current = await self.run_blocking(self._list_playlist_items, youtube_id)
+            quota_used += self._list_cost(len(current))
+        
+        edits = diff_playlist(current, [v.video_id for v in valid_videos])
+        new_title = title if title and title != playlist['title'] else None
+        new_description = description if description is not None and description != playlist['description'] else None
+        
+        write_cost = sum(self.quota.cost(EDIT_OPERATIONS[edit.op]) for edit in edits)
+        if new_title or new_description is not None:
+            write_cost += self.quota.cost('playlists.update')
+        reservation = await self.run_blocking(self.quota.reserve, write_cost)
+        
+        applied: List[PlaylistEdit] = []
+        error = None
+        with reservation:
             try:
-                # Create the playlist
-                playlist_response = self.create_youtube_playlist(
-                    title=title,
-                    description=description,
-                    privacy=self.settings.default_playlist_privacy
-                )
-                
-                playlist_id = playlist_response['id']
-                
-                # Add videos to the playlist
-                add_results = self.add_videos_to_playlist(
-                    playlist_id=playlist_id,
-                    video_ids=[v.video_id for v in valid_videos]
-                )
-                
-                # Count successful additions
-                successful_adds = sum(1 for r in add_results if r['success'])
-                
-                # Save to database
-                try:
-                    import uuid
-                    playlist_uuid = str(uuid.uuid4())
-                    
-                    videos_data = [
-                        {
-                            'video_id': v.video_id,
-                            'title': v.title,
-                            'channel': v.channel,
-                            'duration': v.duration
+                await self.run_blocking(self._apply_edits, youtube_id, edits, applied)
+                if new_title or new_description is not None:
+                    await self.run_blocking(
+                        self.update_youtube_playlist,
+                        youtube_id,
+                        new_title or playlist['title'],
+                        playlist['description'] if new_description is None else new_description
+                    )
+                    quota_used += self.quota.cost('playlists.update')
+            except HttpError as e:
+                logger.error(f"Failed to update playlist {youtube_id}: {e}")
+                error = f"Failed to update playlist: {e}"
+        quota_used += sum(self.quota.cost(EDIT_OPERATIONS[edit.op]) for edit in applied)
+        
+        # Record the playlist as it now stands
+        metadata = {v['video_id']: {
+            'title': v['video_title'], 'channel': v['video_channel'], 'duration': v['video_duration']
+        } for v in playlist['videos']}
+        metadata.update({v.video_id: {
+            'title': v.title, 'channel': v.channel, 'duration': v.duration
+        } for v in valid_videos})
+        
+        if error:
+            # Part of the script may have been applied: read back what YouTube has
+            items = await self.run_blocking(self._list_playlist_items, youtube_id)
+            quota_used += self._list_cost(len(items))
+        else:
+            deleted = {edit.item_id for edit in applied if edit.op == 'delete'}
+            item_ids = {video_id: item_id for video_id, item_id in current if item_id not in deleted}
+            item_ids.update({edit.video_id: edit.item_id for edit in applied if edit.op == 'insert'})
+            items = [(v.video_id, item_ids[v.video_id]) for v in valid_videos]
+        
+        await self.run_blocking(
+            db.replace_playlist_videos,
+            playlist_id,
+            [dict(metadata.get(video_id, {}), video_id=video_id, playlist_item_id=item_id) for video_id, item_id in items],
+            title=new_title if not error else None,
+            description=new_description if not error else None
+        )
+        
+        rebuild_cost = self.quota.cost('playlists.insert') + self.quota.cost('playlistItems.insert') * len(valid_videos)
+        counts = {op: sum(1 for edit in applied if edit.op == op) for op in EDIT_OPERATIONS}
+        logger.info(
+            f"Updated playlist {youtube_id}: {counts['insert']} inserted, {counts['move']} moved, "
+            f"{counts['delete']} deleted; {quota_used} quota units vs {rebuild_cost} for a rebuild"
+        )
+        
+        return PlaylistUpdateResult(
+            success=error is None,
+            playlist_id=youtube_id,
+            playlist_url=playlist['url'],
+            title=(new_title if not error else None) or playlist['title'],
+            video_count=len(items),
+            inserted=counts['insert'],
+            moved=counts['move'],
+            deleted=counts['delete'],
+            quota_used=quota_used,
+            quota_saved=rebuild_cost - quota_used,
+            videos_skipped=invalid_videos,
+            error=error
+        )
+    
+    def _list_cost(self, item_count: int) -> int:
+        """Quota spent listing a playlist of item_count items"""
+        return max(1, -(-item_count // 50)) * self.quota.cost('playlistItems.list')
+    
+    def _list_playlist_items(self, playlist_id: str) -> List[Tuple[str, str]]:
+        """List every (video_id, playlist_item_id) of a playlist in order"""
+        items = []
+        page_token = None
+        while True:
+            with self._service() as youtube:
+                response = self._execute(youtube.playlistItems().list(
+                    part='contentDetails',
+                    playlistId=playlist_id,
+                    maxResults=50,
+                    pageToken=page_token
+                ), 'playlistItems.list')
+            
+            items.extend((item['contentDetails']['videoId'], item['id']) for item in response.get('items', []))
+            
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return items
+    
+    def _apply_edits(self, playlist_id: str, edits: List[PlaylistEdit], applied: List[PlaylistEdit]):
+        """Send an edit script in order, appending each edit to applied once it succeeds"""
+        with self._service() as youtube:
+            for edit in edits:
+                if edit.op == 'delete':
+                    request = youtube.playlistItems().delete(id=edit.item_id)
+                elif edit.op == 'move':
+                    request = youtube.playlistItems().update(
+                        part='snippet',
+                        body={
+                            'id': edit.item_id,
+                            'snippet': {
+                                'playlistId': playlist_id,
+                                'resourceId': {
+                                    'kind': 'youtube#video',
+                                    'videoId': edit.video_id
+                                },
+                                'position': edit.position
+                            }
                         }
-                        for v in valid_videos
-                    ]
-                    
-                    db.save_playlist(
-                        playlist_id=playlist_uuid,
-                        youtube_id=playlist_id,
-                        title=title,
-                        url=f"https://youtube.com/playlist?list={playlist_id}",
-                        video_count=successful_adds,
-                        created_by="api",
-                        description=description,
-                        videos=videos_data
                     )
-                    
-                    # Log API usage
-                    db.log_api_usage("youtube", "create_playlist")
-                    if self.openai_client and not custom_title:
-                        db.log_api_usage("openai", "generate_title")
-                        
-                except Exception as e:
-                    logger.error(f"Failed to save playlist to database: {e}")
+                else:
+                    request = self._insert_request(youtube, playlist_id, edit.video_id, edit.position)
                 
-                return PlaylistResult(
-                    success=True,
-                    playlist_id=playlist_id,
-                    playlist_url=f"https://youtube.com/playlist?list={playlist_id}",
-                    title=title,
-                    description=description,
-                    video_count=successful_adds,
-                    videos_added=valid_videos,
-                    videos_skipped=invalid_videos
-                )
+                response = self._execute(request, EDIT_OPERATIONS[edit.op])
+                if edit.op == 'insert':
+                    edit.item_id = response['id']
+                applied.append(edit)
+    
+    async def resume_incomplete_jobs(self) -> List[PlaylistResult]:
+        """Resume every failed or abandoned job, e.g. after a process restart"""
+        job_ids = await self.run_blocking(
+            db.get_resumable_jobs,
+            self.settings.job_stale_seconds,
+            self.settings.max_job_attempts
+        )
+        
+        results = []
+        for job_id in job_ids:
+            logger.info(f"Resuming playlist job {job_id}")
+            try:
+                results.append(await self.resume_job(job_id))
+            except QuotaExceededError as e:
+                logger.warning(f"Stopped resuming jobs: {e}")
+                break
+        return results
+    
+    async def _run_job(self, job_id: str, title_task: Optional[asyncio.Task] = None) -> PlaylistResult:
+        """Drive a claimed job to completion, checkpointing every step
+        
+        title_task, if given, is a pending generate_title() whose result replaces
+        the job's provisional title.
+        """
+        job = await self.run_blocking(db.get_playlist_job, job_id)
+        video_ids = [v['video_id'] for v in job['videos']]
+        # Holds the reservation and pin of an account the job fails over to
+        failover = ExitStack()
+        
+        try:
+            playlist_id = job['youtube_id']
+            if not playlist_id:
+                if title_task and title_task.done():
+                    # The title arrived before the playlist exists: no patch needed
+                    await self._set_job_title(job, title_task.result())
+                    title_task = None
                 
-            except Exception as e:
-                logger.error(f"Failed to create playlist: {e}")
-                return PlaylistResult(
-                    success=False,
-                    error=f"Failed to create playlist: {str(e)}",
-                    videos_skipped=invalid_videos
+                # Create the playlist
+                playlist_response = await self._create_job_playlist(job, failover, title_pending=bool(title_task))
+                playlist_id = playlist_response['id']
+                await self.run_blocking(db.set_job_playlist, job_id, playlist_id, self._current_account().name)
+                job['youtube_id'] = playlist_id
+            else:
+                logger.info(
+                    f"Resuming playlist {playlist_id} at {len(job['inserted'])}/{len(video_ids)} videos"
                 )
-        else:
-            # Return mock result for non-OAuth mode
-            logger.info(f"Would create playlist: {title} with {len(valid_videos)} videos")
             
+            # Add the videos that are not in the playlist yet
+            add_videos = self.run_blocking(
+                self.add_videos_to_playlist,
+                playlist_id=playlist_id,
+                video_ids=video_ids,
+                inserted=job['inserted'],
+                on_inserted=lambda index, video_id, response: db.record_job_item(
+                    job_id, index, video_id, response.get('id')
+                )
+            )
+            
+            if title_task:
+                add_results, _ = await asyncio.gather(add_videos, self._patch_title(job, title_task))
+            else:
+                add_results = await add_videos
+            
+            # Count successful additions
+            successful_adds = sum(1 for r in add_results if r['success'])
+            
+            # Save to database
+            saved = await self.run_blocking(
+                db.save_playlist,
+                playlist_id=job_id,
+                youtube_id=playlist_id,
+                title=job['title'],
+                url=f"https://youtube.com/playlist?list={playlist_id}",
+                video_count=successful_adds,
+                created_by=job['created_by'],
+                user_identifier=job['user_identifier'],
+                description=job['description'],
+                videos=[
+                    dict(video, playlist_item_id=result['response'].get('id') if result['success'] else None)
+                    for video, result in zip(job['videos'], add_results)
+                ],
+                fingerprint=job['fingerprint'],
+                idempotency_key=job['idempotency_key'],
+                account=self._current_account().name
+            )
+            if saved:
+                await self.run_blocking(db.log_api_usage, "youtube", "create_playlist")
+            else:
+                # Already recorded by an earlier attempt
+                await self.run_blocking(db.update_playlist_video_count, job_id, successful_adds)
+            
+            # Leave partially filled playlists resumable
+            failed_adds = len(add_results) - successful_adds
+            if failed_adds:
+                await self.run_blocking(
+                    db.finish_playlist_job, job_id, 'failed', f"{failed_adds} videos could not be added"
+                )
+            else:
+                await self.run_blocking(db.finish_playlist_job, job_id, 'completed')
+            
+            return self._job_result(job, successful_adds)
+            
+        except Exception as e:
+            logger.error(f"Failed to create playlist: {e}")
+            if title_task:
+                title_task.cancel()
+            await self.run_blocking(db.finish_playlist_job, job_id, 'failed', str(e))
             return PlaylistResult(
-                success=True,
-                playlist_id="MOCK_PLAYLIST_ID",
-                playlist_url="https://youtube.com/playlist?list=MOCK_PLAYLIST_ID",
-                title=title,
-                description=description,
-                video_count=len(valid_videos),
-                videos_added=valid_videos,
-                videos_skipped=invalid_videos,
-                error="Note: This is a mock result. Enable OAuth to actually create playlists."
-            )
\ No newline at end of file
+                success=False,
+                error=f"Failed to create playlist: {str(e)}",
+                job_id=job_id
+            )
+        finally:
+            failover.close()
+    
+    async def _create_job_playlist(self, job: Dict, failover: ExitStack, title_pending: bool = False) -> Dict:
+        """Create a job's playlist, moving the job to another account while YouTube reports quota exhausted
+        
+        Nothing belongs to an account until its playlist exists, so the job's
+        remaining cost is reserved on the next account and the job carries on
+        there. The new reservation and pin stay in `failover` until the job ends.
+        """
+        while True:
+            try:
+                return await self.run_blocking(
+                    self.create_youtube_playlist,
+                    title=job['title'],
+                    description=job['description'],
+                    privacy=job['privacy']
+                )
+            except AccountQuotaExceededError:
+                exhausted = self._current_account()
+                write_cost = self._job_write_cost(job)
+                if title_pending:
+                    write_cost += self.quota.cost('playlists.update')
+                account, reservation = await self.run_blocking(self.accounts.reserve, write_cost)
+                self.accounts.record_failover(exhausted)
+                failover.enter_context(reservation)
+                failover.enter_context(self.accounts.pinned(account))
+    
+    async def _patch_title(self, job: Dict, title_task: asyncio.Task):
+        """Replace the provisional title with the generated one in a single playlists.update"""
+        title = await title_task
+        if title == job['title']:
+            return
+        
+        try:
+            await self.run_blocking(self.update_youtube_playlist, job['youtube_id'], title, job['description'])
+        except Exception as e:
+            logger.warning(f"Keeping provisional title for playlist {job['youtube_id']}: {e}")
+            return
+        
+        await self._set_job_title(job, title)
+    
+    async def _set_job_title(self, job: Dict, title: str):
+        await self.run_blocking(db.set_job_title, job['id'], title)
+        job['title'] = title
+    
+    @staticmethod
+    def _job_result(job: Dict, video_count: int) -> PlaylistResult:
+        """Build the result for a finished job"""
+        playlist_id = job['youtube_id']
+        return PlaylistResult(
+            success=True,
+            playlist_id=playlist_id,
+            playlist_url=f"https://youtube.com/playlist?list={playlist_id}",
+            title=job['title'],
+            description=job['description'],
+            video_count=video_count,
+            videos_added=[VideoInfo(**v) for v in job['videos']],
+            videos_skipped=[],
+            job_id=job['id']
+        )
+    
+    @staticmethod
+    def _replayed_result(playlist: Dict) -> PlaylistResult:
+        """Build the result for a playlist created by an earlier identical request"""
+        return PlaylistResult(
+            success=True,
+            playlist_id=playlist['youtube_id'],
+            playlist_url=playlist['url'],
+            title=playlist['title'],
+            description=playlist['description'],
+            video_count=playlist['video_count'],
+            videos_added=[
+                VideoInfo(
+                    video_id=v['video_id'],
+                    title=v['video_title'],
+                    channel=v['video_channel'],
+                    duration=v['video_duration']
+                ) for v in playlist['videos']
+            ],
+            videos_skipped=[],
+            job_id=playlist['id'],
+            reused=True
+        )
+    
+    async def _mock_playlist(
+        self,
+        valid_videos: List[VideoInfo],
+        invalid_videos: List[VideoInfo],
+        custom_title: Optional[str],
+        description: Optional[str]
+    ) -> PlaylistResult:
+        """Describe the playlist that would be created without OAuth"""
+        title, description = await self._resolve_title(valid_videos, custom_title, description)
+        
+        # Return mock result for non-OAuth mode
+        logger.info(f"Would create playlist: {title} with {len(valid_videos)} videos")
+        
+        return PlaylistResult(
+            success=True,
+            playlist_id="MOCK_PLAYLIST_ID",
+            playlist_url="https://youtube.com/playlist?list=MOCK_PLAYLIST_ID",
+            title=title,
+            description=description,
+            video_count=len(valid_videos),
+            videos_added=valid_videos,
+            videos_skipped=invalid_videos,
+            error="Note: This is a mock result. Enable OAuth to actually create playlists."
+        )
\ No newline at end of file
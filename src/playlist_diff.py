@@ -0,0 +1,116 @@
+"""
+Minimal edit scripts for reordering an existing YouTube playlist
+"""
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Quota operation charged for each edit
+EDIT_OPERATIONS = {
+    'insert': 'playlistItems.insert',
+    'move': 'playlistItems.update',
+    'delete': 'playlistItems.delete',
+}
+
+
+@dataclass
+class PlaylistEdit:
+    op: str  # 'insert', 'move' or 'delete'
+    video_id: str
+    item_id: Optional[str] = None  # existing playlist item, for moves and deletes
+    position: Optional[int] = None  # playlist position at the time the edit is applied
+    index: Optional[int] = None  # index in the target list, for inserts and moves
+
+
+def longest_increasing_subsequence(values: Sequence[int]) -> List[int]:
+    """Indexes of a longest strictly increasing subsequence (patience sorting, O(n log n))"""
+    tails: List[int] = []  # tails[k]: value ending the best run of length k + 1
+    tail_indexes: List[int] = []
+    previous: List[int] = [-1] * len(values)
+
+    for i, value in enumerate(values):
+        k = bisect_left(tails, value)
+        if k == len(tails):
+            tails.append(value)
+            tail_indexes.append(i)
+        else:
+            tails[k] = value
+            tail_indexes[k] = i
+        previous[i] = tail_indexes[k - 1] if k else -1
+
+    result = []
+    i = tail_indexes[-1] if tail_indexes else -1
+    while i >= 0:
+        result.append(i)
+        i = previous[i]
+    result.reverse()
+    return result
+
+
+def diff_playlist(current: Sequence[Tuple[str, str]], target: Sequence[str]) -> List[PlaylistEdit]:
+    """Turn the current playlist into the target order with the fewest item operations.
+
+    current holds (video_id, playlist_item_id) pairs in playlist order; target
+    holds unique video IDs. The items kept in place are a longest common
+    subsequence of the two lists; because target IDs are unique it is found as
+    a longest increasing subsequence of target indexes. Every other target
+    video is moved from a spare copy already in the playlist, or inserted, and
+    whatever is left over is deleted.
+
+    Deletes come first, then moves and inserts in target order. Each of those
+    is positioned right after its predecessor in the target, which keeps the
+    kept and already placed items in order no matter where unplaced items sit.
+    """
+    target_index: Dict[str, int] = {video_id: i for i, video_id in enumerate(target)}
+
+    # Current items that appear in the target, as target indexes in playlist order
+    matched = [i for i, (video_id, _) in enumerate(current) if video_id in target_index]
+    lis = longest_increasing_subsequence([target_index[current[i][0]] for i in matched])
+    kept = {matched[i] for i in lis}
+    kept_targets = {target_index[current[i][0]] for i in kept}
+
+    # Spare copies of each video that can be moved instead of inserted
+    spare: Dict[str, List[int]] = {}
+    for i, (video_id, _) in enumerate(current):
+        if i not in kept:
+            spare.setdefault(video_id, []).append(i)
+
+    sources: Dict[int, int] = {}  # target index -> current index it is moved from
+    for index, video_id in enumerate(target):
+        if index not in kept_targets and spare.get(video_id):
+            sources[index] = spare[video_id].pop(0)
+    moved = set(sources.values())
+
+    edits = [
+        PlaylistEdit('delete', video_id, item_id=item_id)
+        for i, (video_id, item_id) in enumerate(current)
+        if i not in kept and i not in moved
+    ]
+
+    # Simulate the playlist as a list of tokens: current indexes, or ('new', index)
+    playlist: List = [i for i in range(len(current)) if i in kept or i in moved]
+    tokens: Dict[int, object] = {
+        target_index[current[i][0]]: i for i in kept
+    }
+    for index, video_id in enumerate(target):
+        if index in kept_targets:
+            continue
+
+        if index in sources:
+            token = sources[index]
+            playlist.remove(token)
+        else:
+            token = ('new', index)
+
+        position = playlist.index(tokens[index - 1]) + 1 if index else 0
+        playlist.insert(position, token)
+        tokens[index] = token
+
+        if index in sources:
+            edits.append(PlaylistEdit(
+                'move', video_id, item_id=current[token][1], position=position, index=index
+            ))
+        else:
+            edits.append(PlaylistEdit('insert', video_id, position=position, index=index))
+
+    return edits
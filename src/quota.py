@@ -0,0 +1,223 @@
+"""
+Quota-aware scheduling for YouTube Data API calls
+"""
+import time
+import logging
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Quota units charged per call (https://developers.google.com/youtube/v3/determine_quota_cost)
+YOUTUBE_QUOTA_COSTS = {
+    'videos.list': 1,
+    'channels.list': 1,
+    'playlists.list': 1,
+    'playlistItems.list': 1,
+    'search.list': 100,
+    'playlists.insert': 50,
+    'playlists.update': 50,
+    'playlists.delete': 50,
+    'playlistItems.insert': 50,
+    'playlistItems.update': 50,
+    'playlistItems.delete': 50,
+}
+
+# Reservation the calling code is running under, if any. run_blocking() copies
+# the context into worker threads, so calls made there draw from it too.
+_current_reservation: ContextVar[Optional["QuotaReservation"]] = ContextVar(
+    "current_quota_reservation", default=None
+)
+
+
+class QuotaExceededError(Exception):
+    """Raised when the YouTube quota budget cannot cover a request"""
+
+
+class AccountQuotaExceededError(QuotaExceededError):
+    """Raised when YouTube itself reports an account's quota as used up"""
+
+    def __init__(self, message: str, account: Optional[str] = None):
+        super().__init__(message)
+        self.account = account
+
+
+def quota_day_start() -> datetime:
+    """Start of the current quota day in UTC (YouTube resets quota at midnight Pacific)"""
+    try:
+        from zoneinfo import ZoneInfo
+        pacific = ZoneInfo("America/Los_Angeles")
+    except Exception:
+        pacific = timezone(timedelta(hours=-8))
+    now = datetime.now(pacific)
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class QuotaReservation:
+    """Units set aside up front for a multi-call operation such as creating a playlist"""
+
+    def __init__(self, scheduler: "QuotaScheduler", units: int):
+        self.scheduler = scheduler
+        self.units = units
+        self.remaining = units
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current_reservation.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_reservation.reset(self._token)
+        self.scheduler.release(self)
+        return False
+
+
+class QuotaScheduler:
+    """Token-bucket pacing plus a daily budget for YouTube API calls.
+
+    Every call is charged against a ledger persisted in `api_usage`
+    (service='youtube', cost_estimate=units), so the API and bot processes see
+    the same daily total. The bucket refills at daily_limit / 86400 units per
+    second up to burst_units, spreading ad-hoc calls across the day.
+    Reservations are admitted against the daily budget alone: their units are
+    already set aside, so the calls they cover are not paced and a large
+    playlist never leaves the next one waiting hours for the bucket.
+
+    With an `account`, the ledger only counts that account's calls, so each
+    credential (Google Cloud project) keeps its own budget.
+    """
+
+    # Re-read the shared ledger at most this often
+    LEDGER_REFRESH_SECONDS = 30
+
+    def __init__(
+        self,
+        database,
+        daily_limit: int = 10000,
+        burst_units: int = 3000,
+        max_wait_seconds: float = 30.0,
+        account: Optional[str] = None
+    ):
+        self.database = database
+        self.account = account
+        self.daily_limit = daily_limit
+        self.burst_units = max(burst_units, max(YOUTUBE_QUOTA_COSTS.values()))
+        self.max_wait_seconds = max_wait_seconds
+        self.refill_rate = daily_limit / 86400
+
+        self._cond = threading.Condition()
+        self._tokens = float(self.burst_units)
+        self._last_refill = time.monotonic()
+        self._reserved = 0
+        self._used_today = 0
+        self._day_start = None
+        self._ledger_read_at = 0.0
+        self._exhausted_day = None
+
+    @staticmethod
+    def cost(operation: str) -> int:
+        return YOUTUBE_QUOTA_COSTS.get(operation, 1)
+
+    def reserve(self, units: int) -> QuotaReservation:
+        """Admit an operation needing `units` out of today's budget, or raise QuotaExceededError up front"""
+        with self._cond:
+            self._refresh_ledger(force=True)
+            if self._available_today() < units:
+                raise QuotaExceededError(
+                    f"YouTube quota exhausted: {units} units needed, "
+                    f"{max(0, self._available_today())} remaining today"
+                )
+            self._reserved += units
+
+        return QuotaReservation(self, units)
+
+    def release(self, reservation: QuotaReservation):
+        """Return a reservation's unused units"""
+        with self._cond:
+            self._reserved -= reservation.remaining
+            reservation.remaining = 0
+
+    def acquire(self, operation: str) -> int:
+        """Charge one call to the ledger, pacing it through the bucket unless a reservation covers it"""
+        units = self.cost(operation)
+        reservation = _current_reservation.get()
+
+        with self._cond:
+            if reservation is not None and reservation.remaining >= units:
+                reservation.remaining -= units
+                self._reserved -= units
+            else:
+                self._refresh_ledger()
+                if self._available_today() < units:
+                    raise QuotaExceededError(f"YouTube quota exhausted: cannot run {operation}")
+                self._take_tokens(units)
+            self._used_today += units
+
+        self.database.log_api_usage("youtube", operation, cost_estimate=units, account=self.account)
+        return units
+
+    def remaining(self) -> int:
+        """Units still available today"""
+        with self._cond:
+            self._refresh_ledger()
+            return max(0, self._available_today())
+
+    def exhaust(self):
+        """Treat the budget as spent until the next quota day, e.g. after YouTube reports quotaExceeded"""
+        with self._cond:
+            self._refresh_ledger()
+            self._exhausted_day = self._day_start
+
+    def stats(self) -> Dict[str, float]:
+        """Return the current budget"""
+        with self._cond:
+            self._refresh_ledger()
+            self._refill()
+            return {
+                'daily_limit': self.daily_limit,
+                'used_today': self._used_today,
+                'reserved': self._reserved,
+                'remaining_today': max(0, self._available_today()),
+                'tokens': round(self._tokens, 1),
+                'exhausted': self._exhausted_day == self._day_start
+            }
+
+    def _available_today(self) -> int:
+        if self._exhausted_day is not None and self._exhausted_day == self._day_start:
+            return 0
+        return self.daily_limit - self._used_today - self._reserved
+
+    def _refresh_ledger(self, force: bool = False):
+        """Reload today's usage from the shared ledger (lock held)"""
+        day_start = quota_day_start()
+        now = time.monotonic()
+        if not force and day_start == self._day_start and now - self._ledger_read_at < self.LEDGER_REFRESH_SECONDS:
+            return
+        self._used_today = self.database.get_quota_used(
+            "youtube", day_start.strftime('%Y-%m-%d %H:%M:%S'), account=self.account
+        )
+        self._day_start = day_start
+        self._ledger_read_at = now
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst_units, self._tokens + (now - self._last_refill) * self.refill_rate)
+        self._last_refill = now
+
+    def _take_tokens(self, units: int):
+        """Block until the bucket holds `units` tokens, then take them (lock held)"""
+        deadline = time.monotonic() + self.max_wait_seconds
+        self._refill()
+        while self._tokens < units:
+            wait = (units - self._tokens) / self.refill_rate
+            if time.monotonic() + wait > deadline:
+                raise QuotaExceededError(
+                    f"YouTube quota rate limit: {units} units would take {wait:.0f}s to accrue"
+                )
+            logger.info(f"Pacing YouTube call: waiting {wait:.1f}s for {units} quota units")
+            self._cond.wait(wait)
+            self._refill()
+        self._tokens -= units
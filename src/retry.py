@@ -0,0 +1,162 @@
+"""
+Retry and adaptive rate control for YouTube Data API calls
+"""
+import json
+import time
+import random
+import socket
+import logging
+import threading
+from typing import Callable, Dict, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Error classes
+THROTTLE = "throttle"
+TRANSIENT = "transient"
+FATAL = "fatal"
+
+THROTTLE_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+TRANSIENT_REASONS = {'backendError', 'internalError', 'serviceUnavailable'}
+# The project's daily quota is spent; retrying with the same credentials cannot help
+QUOTA_REASONS = {'quotaExceeded', 'dailyLimitExceeded'}
+
+
+def error_reason(error: Exception) -> str:
+    """Get the first error reason from a YouTube API HttpError, if any"""
+    try:
+        data = json.loads(error.content.decode('utf-8'))
+        return data['error']['errors'][0].get('reason', '')
+    except (AttributeError, ValueError, KeyError, IndexError, TypeError):
+        return ''
+
+
+def classify_error(error: Exception) -> str:
+    """Classify an exception as THROTTLE, TRANSIENT or FATAL"""
+    status = getattr(getattr(error, 'resp', None), 'status', None)
+    if status is not None:
+        reason = error_reason(error)
+        if status == 429 or reason in THROTTLE_REASONS:
+            return THROTTLE
+        if status >= 500 or reason in TRANSIENT_REASONS:
+            return TRANSIENT
+        return FATAL
+    if isinstance(error, (socket.timeout, ConnectionError, TimeoutError)):
+        return TRANSIENT
+    return FATAL
+
+
+class AdaptiveLimiter:
+    """AIMD limit on concurrent in-flight calls.
+
+    Each success raises the limit by 1/limit (about +1 per round of calls);
+    each throttle halves it. Transient errors leave it unchanged.
+    """
+
+    def __init__(self, initial: int = 8, min_limit: int = 1, max_limit: int = 32):
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, initial)
+        self.limit = float(initial)
+        self._in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self._in_flight >= int(self.limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, outcome: str):
+        with self._cond:
+            self._in_flight -= 1
+            self.record(outcome)
+            self._cond.notify_all()
+
+    def record(self, outcome: str):
+        """Adjust the limit for an outcome without an acquired slot"""
+        with self._cond:
+            if outcome == "success":
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            elif outcome == THROTTLE:
+                self.limit = max(self.min_limit, self.limit / 2)
+            self._cond.notify_all()
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter around API calls, with counters"""
+
+    def __init__(
+        self,
+        limiter: AdaptiveLimiter,
+        max_attempts: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 16.0
+    ):
+        self.limiter = limiter
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._lock = threading.Lock()
+        self.successes = 0
+        self.retries = 0
+        self.throttled = 0
+        self.transient_errors = 0
+        self.gave_up = 0
+
+    def call(self, func: Callable[[], T]) -> T:
+        """Run func, retrying throttled and transient failures"""
+        attempt = 0
+        while True:
+            attempt += 1
+            self.limiter.acquire()
+            try:
+                result = func()
+            except Exception as e:
+                kind = classify_error(e)
+                self.limiter.release(kind)
+                self.record(kind)
+                if kind == FATAL:
+                    raise
+                if attempt >= self.max_attempts:
+                    with self._lock:
+                        self.gave_up += 1
+                    raise
+
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+                logger.warning(f"Retrying after {kind} error ({e}); attempt {attempt + 1} in {delay:.2f}s")
+                with self._lock:
+                    self.retries += 1
+                time.sleep(delay)
+            else:
+                self.limiter.release("success")
+                with self._lock:
+                    self.successes += 1
+                return result
+
+    def record(self, kind: str):
+        """Count an error outcome"""
+        with self._lock:
+            if kind == THROTTLE:
+                self.throttled += 1
+            elif kind == TRANSIENT:
+                self.transient_errors += 1
+
+    def observe(self, kind: str):
+        """Feed an outcome seen outside call(), such as a batch item, to the counters and limiter"""
+        self.record(kind)
+        self.limiter.record(kind)
+
+    def stats(self) -> Dict[str, float]:
+        """Return retry and throttling counters"""
+        with self._lock:
+            return {
+                'successes': self.successes,
+                'retries': self.retries,
+                'throttled': self.throttled,
+                'transient_errors': self.transient_errors,
+                'gave_up': self.gave_up,
+                'concurrency_limit': round(self.limiter.limit, 2)
+            }
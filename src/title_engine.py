@@ -0,0 +1,154 @@
+"""
+Offline playlist title generation from video titles and channel names
+"""
+import re
+import math
+import logging
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Words that never make a good title on their own: English function words plus
+# the boilerplate YouTube uploaders put in titles
+STOPWORDS = frozenset('''
+    a about after all also am an and any are as at be been before being but by can
+    could did do does doing down during each few for from had has have having he her
+    here hers him his how i if in into is it its just me more most my no nor not now
+    of off on once only or other our out over own same she should so some such than
+    that the their them then there these they this those through to too under until
+    up very was we were what when where which while who whom why will with would you
+    your vs via ft feat featuring x
+    official video videos audio lyric lyrics visualizer clip hd hq 4k 1080p 720p
+    full version remastered remaster live new shorts short ep episode part pt vol
+    trailer teaser reaction review explained ultimate best top how-to tutorial
+'''.split())
+
+# Bracketed boilerplate such as "(Official Video)" or "[HD]"
+BRACKETED_RE = re.compile(r'[\(\[\{][^\)\]\}]*[\)\]\}]')
+TOKEN_RE = re.compile(r"[^\W_]+(?:['’.-][^\W_]+)*", re.UNICODE)
+HASHTAG_RE = re.compile(r'#\w+')
+
+# A channel "dominates" a batch when it uploaded at least this share of the videos
+CHANNEL_DOMINANCE = 0.5
+
+# Keywords must occur in at least this many titles
+MIN_DOCUMENT_FREQUENCY = 2
+
+# Titles scored per batch; a larger sample rarely changes the theme
+MAX_SCORED_TITLES = 30
+
+
+def _tokenize(title: str) -> List[str]:
+    title = HASHTAG_RE.sub(' ', BRACKETED_RE.sub(' ', title))
+    return TOKEN_RE.findall(title)
+
+
+def _display(tokens: List[str]) -> str:
+    """Title-case a phrase, keeping words that already carry capitals (iPhone, NASA)"""
+    words = []
+    for i, token in enumerate(tokens):
+        if any(c.isupper() for c in token):
+            words.append(token)
+        elif i and token in STOPWORDS:
+            words.append(token)
+        else:
+            words.append(token.title())
+    return ' '.join(words)
+
+
+def score_keywords(titles: Sequence[str], max_ngram: int = 4) -> List[Tuple[str, float]]:
+    """Rank the batch's unigrams and n-grams by TF-IDF weight summed over titles.
+
+    Each title is a document and counts a term once. Summing the smoothed TF-IDF
+    weight over the batch rewards terms shared by many titles, while the IDF
+    factor keeps a word that appears everywhere from outranking a more specific
+    phrase. Longer n-grams are boosted so "Lo-Fi Hip Hop" wins over "Hip".
+    """
+    n_docs = len(titles)
+    doc_freq: Counter = Counter()
+    # First occurrence of each term, used for display: (tokens, start, end)
+    first_seen: Dict[str, Tuple[List[str], int, int]] = {}
+
+    for title in titles:
+        tokens = _tokenize(title)
+        lowered = [token.lower() for token in tokens]
+        keyword = [len(token) > 1 and token not in STOPWORDS and not token.isdigit() for token in lowered]
+        terms = set()
+        n_tokens = len(tokens)
+        for i in range(n_tokens):
+            if not keyword[i]:
+                continue
+            key = lowered[i]
+            # N-grams start and end on keywords; inner stopwords are fine ("Lord of the Rings")
+            for j in range(i, min(i + max_ngram, n_tokens)):
+                if j > i:
+                    key = f"{key} {lowered[j]}"
+                if keyword[j] and key not in terms:
+                    terms.add(key)
+                    if key not in first_seen:
+                        first_seen[key] = (tokens, i, j + 1)
+        doc_freq.update(terms)
+
+    ranked = []
+    for term, df in doc_freq.items():
+        if df < MIN_DOCUMENT_FREQUENCY:
+            continue
+        idf = math.log((1 + n_docs) / (1 + df)) + 1
+        score = df * idf * (1 + 0.5 * term.count(' '))
+        tokens, start, end = first_seen[term]
+        ranked.append((_display(tokens[start:end]), score))
+    ranked.sort(key=lambda item: (-item[1], item[0]))
+    return ranked
+
+
+def dominant_channel(channels: Sequence[str]) -> Optional[str]:
+    """The channel that uploaded most of the batch, if any"""
+    counts = Counter(channel for channel in channels if channel)
+    if not counts:
+        return None
+    channel, count = counts.most_common(1)[0]
+    if count >= 2 and count / len(channels) >= CHANNEL_DOMINANCE:
+        return channel
+    return None
+
+
+def _pick_keywords(ranked: List[Tuple[str, float]], exclude: str = '', limit: int = 2) -> List[str]:
+    """Top keywords, skipping ones contained in (or containing) a keyword already picked"""
+    picked = []
+    seen = [f" {exclude.lower()} "] if exclude else []
+    for keyword, _ in ranked:
+        lowered = f" {keyword.lower()} "
+        if any(lowered in other or other in lowered for other in seen):
+            continue
+        picked.append(keyword)
+        seen.append(lowered)
+        if len(picked) == limit:
+            break
+    return picked
+
+
+def keyword_title(titles: Sequence[str], channels: Sequence[str], max_length: int = 60) -> Optional[str]:
+    """Build a playlist title from the batch, or None when there is no common theme"""
+    if not titles:
+        return None
+
+    channel = dominant_channel(channels)
+    keywords = _pick_keywords(score_keywords(titles[:MAX_SCORED_TITLES]), exclude=channel or '')
+
+    candidates = []
+    if channel and keywords:
+        candidates.append(f"{channel}: {keywords[0]}")
+    if channel:
+        candidates.append(f"Best of {channel}")
+    if len(keywords) == 2:
+        candidates.append(f"{keywords[0]} & {keywords[1]}")
+    if keywords:
+        candidates.append(f"{keywords[0]} Collection")
+
+    for title in candidates:
+        if len(title) <= max_length:
+            return title
+    if candidates:
+        return candidates[0][:max_length - 3] + "..."
+    return None
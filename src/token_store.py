@@ -0,0 +1,185 @@
+"""
+OAuth token storage shared by the API and bot processes, with background refresh
+"""
+import os
+import json
+import pickle
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Optional, TYPE_CHECKING
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+
+logger = logging.getLogger(__name__)
+
+
+class TokenStore:
+    """OAuth credentials persisted as JSON.
+
+    Every read and write holds an exclusive flock on a sidecar `.lock` file,
+    and writes replace the token file atomically, so the API and bot never
+    see a half-written token or refresh it twice. A legacy token.pickle, if
+    given, is converted the first time the store is read.
+    """
+
+    def __init__(self, path: str = 'token.json', legacy_path: Optional[str] = 'token.pickle'):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.lock_path = f"{path}.lock"
+        self._thread_lock = threading.Lock()
+
+    def exists(self) -> bool:
+        """Whether a token has been saved (in either format)"""
+        return os.path.exists(self.path) or bool(self.legacy_path and os.path.exists(self.legacy_path))
+
+    @contextmanager
+    def locked(self):
+        """Hold the store lock across processes (and threads of this process)"""
+        with self._thread_lock, open(self.lock_path, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def load(self) -> Optional["Credentials"]:
+        """Read the saved credentials, if any"""
+        with self.locked():
+            return self._read()
+
+    def save(self, credentials: "Credentials"):
+        """Persist credentials for both processes"""
+        with self.locked():
+            self._write(credentials)
+
+    def refresh(self, credentials: "Credentials", lead_seconds: int = 0) -> bool:
+        """Renew credentials that expire within lead_seconds, updating them in place.
+
+        If the other process already renewed the token, its copy is adopted
+        instead of calling Google again. Returns True when a new token was fetched.
+        """
+        with self.locked():
+            stored = self._read()
+            if stored is not None and stored.token and _is_later(stored.expiry, credentials.expiry):
+                credentials.token = stored.token
+                credentials.expiry = stored.expiry
+                logger.info("Adopted OAuth token refreshed by another process")
+
+            if not needs_refresh(credentials, lead_seconds):
+                return False
+
+            from google.auth.transport.requests import Request
+            credentials.refresh(Request())
+            self._write(credentials)
+            logger.info(f"Refreshed OAuth token, valid until {credentials.expiry} UTC")
+            return True
+
+    def _read(self) -> Optional["Credentials"]:
+        """Load credentials (lock held), converting a legacy pickle on first use"""
+        from google.oauth2.credentials import Credentials
+
+        if not os.path.exists(self.path):
+            if not self.legacy_path or not os.path.exists(self.legacy_path):
+                return None
+            with open(self.legacy_path, 'rb') as token:
+                credentials = pickle.load(token)
+            self._write(credentials)
+            logger.info(f"Migrated {self.legacy_path} to {self.path}; the old file can be deleted")
+            return credentials
+
+        try:
+            with open(self.path, encoding='utf-8') as token:
+                return Credentials.from_authorized_user_info(json.load(token))
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading token file {self.path}: {e}")
+            return None
+
+    def _write(self, credentials: "Credentials"):
+        """Atomically replace the token file (lock held)"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.token-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as token:
+                token.write(credentials.to_json())
+            os.chmod(temp_path, 0o600)
+            os.replace(temp_path, self.path)
+        except Exception:
+            os.unlink(temp_path)
+            raise
+
+
+def needs_refresh(credentials: "Credentials", lead_seconds: int = 0) -> bool:
+    """Whether credentials are missing a token or expire within lead_seconds"""
+    if not credentials.token:
+        return True
+    if credentials.expiry is None:
+        return False
+    return credentials.expiry - timedelta(seconds=lead_seconds) <= datetime.utcnow()
+
+
+def _is_later(expiry: Optional[datetime], than: Optional[datetime]) -> bool:
+    if expiry is None:
+        return False
+    return than is None or expiry > than
+
+
+class TokenRefresher:
+    """Daemon thread that renews credentials lead_seconds before they expire.
+
+    Requests keep using a token that is still valid while the new one is
+    fetched, so they never wait on oauth2.googleapis.com.
+    """
+
+    # Wake up at least this often, so a suspended host or clock jump is noticed
+    MAX_SLEEP_SECONDS = 300
+    # Wait this long after a failed refresh before trying again
+    RETRY_SECONDS = 30
+
+    def __init__(self, store: TokenStore, credentials: "Credentials", lead_seconds: int = 300):
+        self.store = store
+        self.credentials = credentials
+        self.lead_seconds = lead_seconds
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.refreshes = 0
+        self.failures = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="oauth-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _delay(self) -> float:
+        """Seconds until the token enters the refresh window"""
+        if self.credentials.expiry is None:
+            return self.MAX_SLEEP_SECONDS
+        due = self.credentials.expiry - timedelta(seconds=self.lead_seconds)
+        return min(self.MAX_SLEEP_SECONDS, max(0.0, (due - datetime.utcnow()).total_seconds()))
+
+    def _run(self):
+        delay = self._delay()
+        while not self._stop.wait(delay):
+            try:
+                if self.store.refresh(self.credentials, self.lead_seconds):
+                    self.refreshes += 1
+                delay = self._delay()
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f"OAuth token refresh failed, retrying in {self.RETRY_SECONDS}s: {e}")
+                delay = self.RETRY_SECONDS
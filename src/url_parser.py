@@ -0,0 +1,127 @@
+"""
+YouTube URL parsing shared by the API and the Telegram bot
+"""
+import re
+import logging
+from typing import Iterable, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# One precompiled pattern for every supported video URL form. The ID group is
+# exactly 11 characters and may not be followed by another ID character, which
+# rejects truncated or over-long IDs without a second pass. Anything after the
+# ID (timestamps, list=, index=, si=...) is consumed but ignored.
+YOUTUBE_VIDEO_URL_RE = re.compile(r'''
+    (?:https?://)?
+    (?:(?:www|m|music)\.)?
+    (?:
+        youtu\.be/(?P<short>[A-Za-z0-9_-]{11})
+      | youtube(?:-nocookie)?\.com/
+        (?:
+            (?:embed|live|shorts|v|e)/(?P<path>[A-Za-z0-9_-]{11})
+          | watch/?\?(?:[^\s#&]*&)*?v=(?P<query>[A-Za-z0-9_-]{11})
+        )
+    )
+    (?![A-Za-z0-9_-])
+    [^\s<>"']*
+''', re.VERBOSE)
+
+# Playlist pages; watch?v=...&list=... URLs are matched as videos first
+YOUTUBE_PLAYLIST_URL_RE = re.compile(r'''
+    (?:https?://)?
+    (?:(?:www|m|music)\.)?
+    youtube\.com/playlist\?(?:[^\s#&]*&)*?list=(?P<list>[A-Za-z0-9_-]{2,64})
+    (?![A-Za-z0-9_-])
+    [^\s<>"']*
+''', re.VERBOSE)
+
+# Channel pages: /@handle, /channel/UC..., /user/name
+YOUTUBE_CHANNEL_URL_RE = re.compile(r'''
+    (?:https?://)?
+    (?:(?:www|m)\.)?
+    youtube\.com/
+    (?:
+        (?P<handle>@[A-Za-z0-9._-]{3,30})
+      | channel/(?P<channel>UC[A-Za-z0-9_-]{22})
+      | user/(?P<user>[A-Za-z0-9]{1,100})
+    )
+    (?![A-Za-z0-9._-])
+    [^\s<>"']*
+''', re.VERBOSE)
+
+# Any supported source, for scanning free text
+YOUTUBE_SOURCE_URL_RE = re.compile(
+    '|'.join(
+        f'(?:{pattern.pattern})'
+        for pattern in (YOUTUBE_VIDEO_URL_RE, YOUTUBE_PLAYLIST_URL_RE, YOUTUBE_CHANNEL_URL_RE)
+    ),
+    re.VERBOSE
+)
+
+
+def _match_video_id(match) -> str:
+    return match.group('short') or match.group('path') or match.group('query')
+
+
+def iter_video_ids(urls: Iterable[str]) -> Iterator[str]:
+    """Yield unique video IDs from URLs in input order, one pass per URL"""
+    seen = set()
+    search = YOUTUBE_VIDEO_URL_RE.search
+    for url in urls:
+        # Cheap precheck before running the regex
+        if 'youtu' not in url:
+            continue
+        match = search(url)
+        if match:
+            video_id = _match_video_id(match)
+            if video_id not in seen:
+                seen.add(video_id)
+                yield video_id
+
+
+def extract_video_ids(urls: Iterable[str]) -> List[str]:
+    """Extract unique YouTube video IDs from various URL formats"""
+    video_ids = list(iter_video_ids(urls))
+    logger.info(f"Extracted {len(video_ids)} video IDs")
+    return video_ids
+
+
+def iter_sources(urls: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """Classify URLs as unique (kind, value) sources in input order.
+
+    kind is one of 'video', 'playlist', 'handle', 'channel' or 'user'.
+    """
+    seen = set()
+    for url in urls:
+        if 'youtu' not in url:
+            continue
+        
+        source = None
+        match = YOUTUBE_VIDEO_URL_RE.search(url)
+        if match:
+            source = ('video', _match_video_id(match))
+        else:
+            match = YOUTUBE_PLAYLIST_URL_RE.search(url)
+            if match:
+                source = ('playlist', match.group('list'))
+            else:
+                match = YOUTUBE_CHANNEL_URL_RE.search(url)
+                if match:
+                    kind = match.lastgroup
+                    source = (kind, match.group(kind))
+        
+        if source and source not in seen:
+            seen.add(source)
+            yield source
+
+
+def find_youtube_urls(text: str) -> List[str]:
+    """Find YouTube video, playlist and channel URLs in free text, normalized to https://"""
+    urls = []
+    for match in YOUTUBE_SOURCE_URL_RE.finditer(text):
+        # Drop sentence punctuation that trails a URL in chat messages
+        url = match.group(0).rstrip('.,;:!?)')
+        if not url.startswith('http'):
+            url = 'https://' + url
+        urls.append(url)
+    return urls
@@ -2,13 +2,15 @@
 YouTube OAuth2 authentication handler
 """
 import os
-import pickle
 import logging
-from typing import Optional
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from typing import Optional, TYPE_CHECKING
+
+from . import youtube_service
+from .token_store import TokenStore, TokenRefresher
+
+# google-auth and the OAuth flow are imported when first needed to keep startup fast
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
 
 logger = logging.getLogger(__name__)
 
@@ -17,24 +19,31 @@ SCOPES = ['https://www.googleapis.com/auth/youtube.force-ssl']
 
 
 class YouTubeAuth:
-    def __init__(self, credentials_file: str = 'credentials.json', token_file: str = 'token.pickle'):
+    def __init__(
+        self,
+        credentials_file: str = 'credentials.json',
+        token_file: str = 'token.json',
+        legacy_token_file: Optional[str] = None
+    ):
         self.credentials_file = credentials_file
         self.token_file = token_file
-        self.credentials: Optional[Credentials] = None
+        self.store = TokenStore(token_file, legacy_path=legacy_token_file)
+        self.credentials: Optional["Credentials"] = None
+        self.refresher: Optional[TokenRefresher] = None
         
-    def authenticate(self) -> Credentials:
+    def authenticate(self) -> "Credentials":
         """Authenticate and return YouTube credentials"""
         # Load existing token
-        if os.path.exists(self.token_file):
-            with open(self.token_file, 'rb') as token:
-                self.credentials = pickle.load(token)
-                logger.info("Loaded existing credentials from token file")
+        self.credentials = self.store.load()
+        if self.credentials:
+            logger.info("Loaded existing credentials from token file")
         
         # If there are no (valid) credentials available, let the user log in
         if not self.credentials or not self.credentials.valid:
             if self.credentials and self.credentials.expired and self.credentials.refresh_token:
                 logger.info("Refreshing expired credentials")
-                self.credentials.refresh(Request())
+                self.store.refresh(self.credentials)
+                return self.credentials
             else:
                 logger.info("Starting OAuth2 flow")
                 if not os.path.exists(self.credentials_file):
@@ -43,6 +52,7 @@ class YouTubeAuth:
                         "Please download it from Google Cloud Console."
                     )
                 
+                from google_auth_oauthlib.flow import InstalledAppFlow
                 flow = InstalledAppFlow.from_client_secrets_file(
                     self.credentials_file, SCOPES
                 )
@@ -61,16 +71,22 @@ class YouTubeAuth:
                         logger.warning(f"Port {port} failed, trying next...")
             
             # Save the credentials for the next run
-            with open(self.token_file, 'wb') as token:
-                pickle.dump(self.credentials, token)
-                logger.info("Saved credentials to token file")
+            self.store.save(self.credentials)
+            logger.info("Saved credentials to token file")
         
         return self.credentials
     
+    def start_refresher(self, lead_seconds: int = 300) -> TokenRefresher:
+        """Keep the credentials renewed in the background, ahead of expiry"""
+        if self.refresher is None:
+            self.refresher = TokenRefresher(self.store, self.credentials, lead_seconds)
+            self.refresher.start()
+        return self.refresher
+    
     def get_youtube_service(self):
         """Get authenticated YouTube service"""
         credentials = self.authenticate()
-        return build('youtube', 'v3', credentials=credentials)
+        return youtube_service.build_service(credentials=credentials)
     
     def create_credentials_json(self, client_id: str, client_secret: str, output_file: str = 'credentials.json'):
         """Create credentials.json file from client ID and secret"""
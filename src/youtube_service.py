@@ -0,0 +1,189 @@
+"""
+YouTube Data API service objects built from a static discovery document
+"""
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+API_NAME = 'youtube'
+API_VERSION = 'v3'
+
+# Parameters the live API accepts but the bundled discovery document predates
+MISSING_PARAMETERS = {
+    ('channels', 'list'): {
+        'forHandle': {
+            'description': "Return the channel associated with a YouTube handle, e.g. '@GoogleDevelopers'.",
+            'location': 'query',
+            'type': 'string'
+        }
+    }
+}
+
+_document: Optional[Dict[str, Any]] = None
+_document_lock = threading.Lock()
+
+# Shared pools, keyed by API key or credentials object
+_pools: Dict[tuple, "ServicePool"] = {}
+_pools_lock = threading.Lock()
+
+
+def discovery_document(path: str = "") -> Dict[str, Any]:
+    """Parsed YouTube discovery document, loaded once per process.
+
+    Defaults to the copy bundled with google-api-python-client, so building a
+    service never fetches it over the network; `path` points at a newer copy.
+    """
+    global _document
+    if _document is not None:
+        return _document
+
+    with _document_lock:
+        if _document is None:
+            if path:
+                with open(path, encoding='utf-8') as f:
+                    document = json.load(f)
+            else:
+                from googleapiclient import discovery_cache
+                content = discovery_cache.get_static_doc(API_NAME, API_VERSION)
+                if content is None:
+                    raise RuntimeError(f"No static discovery document bundled for {API_NAME} {API_VERSION}")
+                document = json.loads(content)
+            _add_missing_parameters(document)
+            _prime(document)
+            _document = document
+            logger.info(f"Loaded {API_NAME} {API_VERSION} discovery document")
+    return _document
+
+
+def _add_missing_parameters(document: Dict[str, Any]):
+    """Declare MISSING_PARAMETERS, so the client library does not reject them as unknown"""
+    for (resource, method), parameters in MISSING_PARAMETERS.items():
+        declared = document['resources'][resource]['methods'][method]['parameters']
+        for name, description in parameters.items():
+            declared.setdefault(name, description)
+
+
+def _prime(document: Dict[str, Any]):
+    """Build every resource once.
+
+    The client library adds its own parameters to the method descriptions the
+    first time a resource is built. Doing that here, under the lock, means
+    later builds from other threads only overwrite existing keys.
+    """
+    from googleapiclient.discovery import build_from_document
+
+    def touch(resource, description):
+        for name, child in description.get('resources', {}).items():
+            touch(getattr(resource, name)(), child)
+
+    service = build_from_document(document, developerKey='prime')
+    touch(service, document)
+    service.close()
+
+
+def build_service(developer_key: Optional[str] = None, credentials=None, discovery_path: str = ""):
+    """Build a new service object with its own HTTP connection"""
+    from googleapiclient.discovery import build_from_document
+    return build_from_document(
+        discovery_document(discovery_path),
+        developerKey=developer_key,
+        credentials=credentials
+    )
+
+
+class ServicePool:
+    """Bounded pool of service objects, each with its own keep-alive HTTP connection.
+
+    httplib2 connections are not thread-safe, so a service is only ever used by
+    the thread that checked it out. Services are built on demand up to `size`;
+    when all of them are checked out, checkout() waits for one to be returned.
+    The most recently returned service is handed out first, so its connection
+    is the one most likely to still be open.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int = 8):
+        self.factory = factory
+        self.size = max(1, size)
+
+        self._idle: List[Any] = []
+        self._created = 0
+        self._cond = threading.Condition()
+
+        self.checkouts = 0
+        self.waits = 0
+
+    def checkout(self, timeout: Optional[float] = None):
+        """Take a service from the pool, building one if the pool is not full yet"""
+        with self._cond:
+            self.checkouts += 1
+            if not self._idle and self._created >= self.size:
+                self.waits += 1
+                if not self._cond.wait_for(lambda: self._idle or self._created < self.size, timeout):
+                    raise TimeoutError(f"No YouTube service available within {timeout}s")
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+
+        try:
+            return self.factory()
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+    def checkin(self, service):
+        """Return a service to the pool"""
+        with self._cond:
+            self._idle.append(service)
+            self._cond.notify()
+
+    @contextmanager
+    def service(self, timeout: Optional[float] = None):
+        """Check a service out for the duration of a with block"""
+        service = self.checkout(timeout)
+        try:
+            yield service
+        finally:
+            self.checkin(service)
+
+    def stats(self) -> Dict[str, int]:
+        """Return pool usage counters"""
+        with self._cond:
+            return {
+                'size': self.size,
+                'created': self._created,
+                'idle': len(self._idle),
+                'in_use': self._created - len(self._idle),
+                'checkouts': self.checkouts,
+                'waits': self.waits
+            }
+
+
+def get_pool(
+    developer_key: Optional[str] = None,
+    credentials=None,
+    size: int = 8,
+    discovery_path: str = ""
+) -> ServicePool:
+    """Process-wide pool for an API key or a set of credentials, shared by every generator.
+
+    All services in a credentials pool wrap the same credentials object, so a
+    token refresh made through one connection is seen by the others.
+    """
+    key = ('credentials', id(credentials)) if credentials is not None else ('key', developer_key)
+    with _pools_lock:
+        entry = _pools.get(key)
+        # Keep the credentials alive alongside the pool so their id() is never reused
+        if entry is None or entry[0] is not credentials:
+            pool = ServicePool(
+                lambda: build_service(developer_key, credentials, discovery_path),
+                size=size
+            )
+            entry = (credentials, pool)
+            _pools[key] = entry
+    return entry[1]
@@ -12,6 +12,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from src.api import app, health_check, create_playlist, validate_videos
 from src.models import CreatePlaylistRequest, ValidateVideosRequest
+from src.token_store import TokenStore
 
 load_dotenv()
 
@@ -42,7 +43,7 @@ async def test_endpoints():
         generator = PlaylistGenerator(
             youtube_api_key=settings.youtube_api_key,
             openai_api_key=settings.openai_api_key,
-            use_oauth=os.path.exists('token.pickle')
+            use_oauth=TokenStore().exists()
         )
         
         request = ValidateVideosRequest(
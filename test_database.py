@@ -13,6 +13,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from src.database import PlaylistDatabase
 from src.playlist_core import PlaylistGenerator
 from src.config import get_settings
+from src.token_store import TokenStore
 
 
 async def test_database():
@@ -79,7 +80,7 @@ async def test_database():
     print("\n4. Testing real playlist creation with database...")
     settings = get_settings()
     
-    if os.path.exists('token.pickle'):
+    if TokenStore().exists():
         try:
             generator = PlaylistGenerator(
                 youtube_api_key=settings.youtube_api_key,
@@ -14,6 +14,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from src.playlist_core import PlaylistGenerator
 from src.config import get_settings
+from src.token_store import TokenStore
 
 # Configure logging
 logging.basicConfig(
@@ -31,7 +32,7 @@ async def test_playlist_creation_with_oauth():
     settings = get_settings()
     
     # Check if OAuth is set up
-    use_oauth = os.path.exists('token.pickle')
+    use_oauth = TokenStore().exists()
     
     if not use_oauth:
         print("\n⚠️  OAuth not set up. Run 'python setup_oauth.py' first to enable actual playlist creation.")
@@ -0,0 +1,57 @@
+"""
+Shared pytest setup
+"""
+import os
+import tempfile
+
+import pytest
+
+# src.database opens playlists.db in the working directory on import; keep it out of the checkout
+os.chdir(tempfile.mkdtemp(prefix="playlist-tests-"))
+os.environ.setdefault("YOUTUBE_API_KEY", "test-key")
+os.environ.setdefault("OPENAI_API_KEY", "")
+
+from src import playlist_core  # noqa: E402
+from src.accounts import AccountRouter, YouTubeAccount  # noqa: E402
+from src.database import PlaylistDatabase  # noqa: E402
+from src.quota import QuotaScheduler  # noqa: E402
+from src.youtube_service import ServicePool  # noqa: E402
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """A fresh database, also used by any generator the test builds"""
+    database = PlaylistDatabase(str(tmp_path / 'playlists.db'))
+    monkeypatch.setattr(playlist_core, 'db', database)
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def make_generator(database):
+    """Build an OAuth PlaylistGenerator whose accounts talk to fake YouTube services.
+
+    Takes {account name: FakeYouTube}, the daily quota of each account and
+    any settings to override.
+    """
+    def make(services, daily_quota=10000, **settings):
+        generator = playlist_core.PlaylistGenerator('test-key')
+        generator.settings = generator.settings.model_copy(update=settings)
+        generator.retry.base_delay = generator.retry.max_delay = 0
+        generator.use_oauth = True
+        generator.openai_client = None
+
+        accounts = []
+        for name, youtube in services.items():
+            account = YouTubeAccount(name, QuotaScheduler(
+                database,
+                daily_limit=daily_quota,
+                burst_units=daily_quota,
+                account=name if len(services) > 1 else None
+            ))
+            account.pool = ServicePool(lambda youtube=youtube: youtube, size=4)
+            accounts.append(account)
+        generator.accounts = AccountRouter(accounts)
+        return generator
+
+    return make
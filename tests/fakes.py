@@ -0,0 +1,156 @@
+"""
+In-memory stand-in for the YouTube Data API client used by PlaylistGenerator
+"""
+import json
+import itertools
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+
+def video_urls(video_ids):
+    return [f'https://youtu.be/{video_id}' for video_id in video_ids]
+
+
+def http_error(status: int, reason: str) -> HttpError:
+    """HttpError shaped like a YouTube API error response"""
+    response = httplib2.Response({'status': status})
+    response.reason = reason
+    content = json.dumps({'error': {'message': reason, 'errors': [{'reason': reason}]}})
+    return HttpError(response, content.encode())
+
+
+class FakeRequest:
+    def __init__(self, youtube, resource: str, method: str, kwargs: dict):
+        self.youtube = youtube
+        self.resource = resource
+        self.method = method
+        self.kwargs = kwargs
+
+    def execute(self, http=None):
+        # A request replayed over another account's connection runs against that account
+        youtube = http or self.youtube
+        youtube.calls.append(f"{self.resource}.{self.method}")
+        return youtube.handle(self.resource, self.method, self.kwargs)
+
+
+class FakeResource:
+    def __init__(self, youtube, name: str):
+        self.youtube = youtube
+        self.name = name
+
+    def __getattr__(self, method):
+        if method.startswith('_'):
+            raise AttributeError(method)
+        return lambda **kwargs: FakeRequest(self.youtube, self.name, method, kwargs)
+
+
+class FakeBatch:
+    def __init__(self, callback, reverse: bool = False):
+        self.callback = callback
+        self.reverse = reverse
+        self.requests = []
+
+    def add(self, request, request_id=None):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        for request_id, request in reversed(self.requests) if self.reverse else self.requests:
+            try:
+                response = request.execute()
+            except HttpError as e:
+                self.callback(request_id, None, e)
+            else:
+                self.callback(request_id, response, None)
+
+
+class FakeYouTube:
+    """Keeps playlists in memory and enforces the API's position rules.
+
+    videos: the video IDs that exist. dead: IDs whose inserts fail with
+    videoNotFound, like a video deleted after validation. quota_exceeded:
+    every call fails with quotaExceeded. reverse_batches: batch requests run
+    last to first, as the API is free to run them in any order.
+    """
+
+    # Shared, so playlists and items are unique across accounts
+    _ids = itertools.count(1)
+
+    def __init__(self, videos=(), dead=()):
+        self.known = set(videos) | set(dead)
+        self.dead = set(dead)
+        self.quota_exceeded = False
+        self.reverse_batches = False
+        self.contents = {}  # playlist ID -> [(item ID, video ID)]
+        self.calls = []
+        self._http = self  # stands in for the connection that carries the credentials
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return lambda: FakeResource(self, name)
+
+    def new_batch_http_request(self, callback=None):
+        return FakeBatch(callback, reverse=self.reverse_batches)
+
+    def video_ids(self, playlist_id: str):
+        return [video_id for _, video_id in self.contents[playlist_id]]
+
+    def handle(self, resource: str, method: str, kwargs: dict):
+        if self.quota_exceeded:
+            raise http_error(403, 'quotaExceeded')
+        return getattr(self, f"_{resource}_{method}")(**kwargs)
+
+    def _videos_list(self, id, **kwargs):
+        return {'items': [
+            {
+                'id': video_id,
+                'snippet': {'title': f"Video {video_id}", 'channelTitle': 'Channel'},
+                'contentDetails': {'duration': 'PT3M'},
+                'status': {'privacyStatus': 'public'}
+            }
+            for video_id in id.split(',') if video_id in self.known
+        ]}
+
+    def _playlists_insert(self, body, **kwargs):
+        playlist_id = f"PL{next(self._ids)}"
+        self.contents[playlist_id] = []
+        return {'id': playlist_id, 'snippet': body['snippet']}
+
+    def _playlists_update(self, body, **kwargs):
+        return body
+
+    def _playlistItems_insert(self, body, **kwargs):
+        snippet = body['snippet']
+        video_id = snippet['resourceId']['videoId']
+        if video_id in self.dead:
+            raise http_error(404, 'videoNotFound')
+        items = self.contents[snippet['playlistId']]
+        position = snippet.get('position', len(items))
+        if position > len(items):
+            raise http_error(400, 'invalidPlaylistItemPosition')
+        item_id = f"item{next(self._ids)}"
+        items.insert(position, (item_id, video_id))
+        return {'id': item_id}
+
+    def _playlistItems_update(self, body, **kwargs):
+        snippet = body['snippet']
+        items = self.contents[snippet['playlistId']]
+        item = next(item for item in items if item[0] == body['id'])
+        items.remove(item)
+        items.insert(snippet['position'], item)
+        return body
+
+    def _playlistItems_delete(self, id, **kwargs):
+        for items in self.contents.values():
+            for item in items:
+                if item[0] == id:
+                    items.remove(item)
+                    return {}
+        raise http_error(404, 'playlistItemNotFound')
+
+    def _playlistItems_list(self, playlistId, **kwargs):
+        return {'items': [
+            {'id': item_id, 'contentDetails': {'videoId': video_id}}
+            for item_id, video_id in self.contents[playlistId]
+        ]}
@@ -0,0 +1,88 @@
+"""
+Several YouTube accounts: routing, failover and per-account tokens
+"""
+import asyncio
+
+import pytest
+
+from src import accounts, playlist_core
+from src.quota import QuotaExceededError
+
+from .fakes import FakeYouTube, video_urls
+
+VIDEOS = [f'v{i:010d}' for i in range(5)]
+
+
+@pytest.fixture
+def services(monkeypatch):
+    """Accounts 'a' and 'b'; routing always tries 'a' first"""
+    monkeypatch.setattr(accounts.random, 'choices', lambda population, weights: [population[0]])
+    return {'a': FakeYouTube(videos=VIDEOS), 'b': FakeYouTube(videos=VIDEOS)}
+
+
+def test_reads_fail_over_to_another_account(make_generator, services):
+    generator = make_generator(services)
+    services['a'].quota_exceeded = True
+
+    valid, invalid = generator.validate_videos(VIDEOS)
+
+    assert [video.video_id for video in valid] == VIDEOS and not invalid
+    assert generator.accounts.failovers == 1
+    assert 'videos.list' in services['b'].calls
+    # YouTube said 'a' is out of quota, so it is not tried again today
+    assert generator.accounts.get('a').quota.remaining() == 0
+
+
+def test_new_playlist_moves_to_another_account(make_generator, database, services):
+    generator = make_generator(services)
+    services['a'].quota_exceeded = True
+
+    result = asyncio.run(generator.create_playlist(video_urls(VIDEOS), custom_title='Mix'))
+
+    assert result.success
+    assert services['b'].video_ids(result.playlist_id) == VIDEOS
+    assert not services['a'].contents
+    assert database.get_playlist_by_id(result.job_id)['account'] == 'b'
+
+
+def test_playlist_is_only_changed_by_its_owner(make_generator, services):
+    generator = make_generator(services)
+
+    async def scenario():
+        created = await generator.create_playlist(video_urls(VIDEOS), custom_title='Mix')
+        services['a'].quota_exceeded = True
+        services['b'].calls.clear()
+        await generator.update_playlist(created.job_id, video_urls(VIDEOS[::-1]))
+
+    with pytest.raises(QuotaExceededError, match="'a'"):
+        asyncio.run(scenario())
+    assert not [call for call in services['b'].calls if call.startswith('playlist')]
+
+
+def test_usage_is_charged_to_the_account_that_made_the_call(make_generator, services):
+    generator = make_generator(services)
+
+    asyncio.run(generator.create_playlist(video_urls(VIDEOS), custom_title='Mix'))
+
+    stats = generator.accounts.stats()
+    assert stats['a']['used_today'] == 50 + 50 * len(VIDEOS) + 1
+    assert stats['b']['used_today'] == 0
+
+
+def test_every_configured_account_needs_its_own_token(tmp_path, monkeypatch):
+    (tmp_path / 'main.json').write_text('{}')
+    settings = playlist_core.get_settings().model_copy(update={
+        'oauth_token_file': str(tmp_path / 'main.json'),
+        'youtube_accounts': f"main={tmp_path / 'main.json'},backup={tmp_path / 'backup.json'}"
+    })
+    monkeypatch.setattr(playlist_core, 'get_settings', lambda: settings)
+
+    with pytest.raises(ValueError, match="'backup'"):
+        playlist_core.PlaylistGenerator('test-key', use_oauth=True)
+
+
+def test_only_the_primary_token_inherits_the_legacy_pickle():
+    settings = playlist_core.get_settings().model_copy(update={'oauth_token_file': 'token.json'})
+
+    assert settings.get_legacy_token_file('token.json') == 'token.pickle'
+    assert settings.get_legacy_token_file('backup.json') is None
@@ -0,0 +1,37 @@
+"""
+ISO-8601 video durations
+"""
+import pytest
+
+from src.durations import format_duration, parse_duration
+
+
+@pytest.mark.parametrize('value, seconds', [
+    ('PT0S', 0),
+    ('P0D', 0),
+    ('PT45S', 45),
+    ('PT3M', 180),
+    ('PT1H2M3S', 3723),
+    ('PT1H3S', 3603),
+    ('P1DT2S', 86402),
+    ('P1W', 604800),
+    ('PT12.5S', 12),
+])
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == seconds
+
+
+@pytest.mark.parametrize('value', [None, '', 'Unknown', 'P', 'PT', 'P1Y', 'P1M', '1H2M', 'PT1H2M3SX'])
+def test_parse_duration_rejects(value):
+    assert parse_duration(value) is None
+
+
+@pytest.mark.parametrize('seconds, text', [
+    (None, '?'),
+    (0, '0:00'),
+    (65, '1:05'),
+    (3600, '1:00:00'),
+    (3723, '1:02:03'),
+])
+def test_format_duration(seconds, text):
+    assert format_duration(seconds) == text
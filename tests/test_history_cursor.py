@@ -0,0 +1,75 @@
+"""
+Keyset pagination of playlist history
+"""
+import pytest
+
+from src.database import decode_history_cursor, history_cursor
+
+
+@pytest.fixture
+def history(database):
+    """Seven playlists from two users, newest p6"""
+    for i in range(7):
+        database.save_playlist(
+            playlist_id=f'p{i}',
+            youtube_id=f'PL{i}',
+            title=f'Playlist {i}',
+            url=f'https://www.youtube.com/playlist?list=PL{i}',
+            video_count=0,
+            user_identifier='alice' if i % 2 else 'bob'
+        )
+    # Two playlists share a timestamp, so the id has to break the tie
+    with database.get_connection() as conn:
+        for i in range(7):
+            conn.execute(
+                "UPDATE playlists SET created_at = ? WHERE id = ?",
+                (f'2024-01-0{min(i, 5) + 1} 12:00:00', f'p{i}')
+            )
+    return database
+
+
+def test_cursor_round_trip():
+    playlist = {'id': 'p1', 'created_at': '2024-01-02 12:00:00'}
+    token = history_cursor(playlist)
+
+    assert '=' not in token
+    assert decode_history_cursor(token) == ('2024-01-02 12:00:00', 'p1')
+
+
+@pytest.mark.parametrize('token', [
+    'not a cursor!',
+    'bm90IGpzb24',  # base64 of "not json"
+    'WzEsMl0',  # [1,2]
+    'WyJvbmx5Il0',  # ["only"]
+    '',
+])
+def test_bad_cursor_is_rejected(token):
+    with pytest.raises(ValueError):
+        decode_history_cursor(token)
+
+
+def test_bad_cursor_raises_from_history(history):
+    with pytest.raises(ValueError):
+        history.get_playlist_history(after='not a cursor!')
+
+
+def test_pages_cover_history_once_in_order(history):
+    everything = [p['id'] for p in history.get_playlist_history(limit=100)]
+    assert everything == ['p6', 'p5', 'p4', 'p3', 'p2', 'p1', 'p0']
+
+    seen, after = [], None
+    while True:
+        page = history.get_playlist_history(limit=3, after=after)
+        if not page:
+            break
+        seen.extend(p['id'] for p in page)
+        after = history_cursor(page[-1])
+
+    assert seen == everything
+
+
+def test_cursor_pages_per_user(history):
+    first = history.get_playlist_history(user_identifier='alice', limit=2)
+    rest = history.get_playlist_history(user_identifier='alice', limit=10, after=history_cursor(first[-1]))
+
+    assert [p['id'] for p in first + rest] == ['p5', 'p3', 'p1']
@@ -0,0 +1,92 @@
+"""
+Repeated create requests: replay, resume and conflicts
+"""
+import asyncio
+import logging
+
+import pytest
+
+from src.playlist_core import IdempotencyConflictError
+
+from .fakes import FakeYouTube, video_urls
+
+VIDEOS = [f'v{i:010d}' for i in range(4)]
+DEAD = 'dead0000000'
+
+
+@pytest.fixture
+def youtube():
+    return FakeYouTube(videos=VIDEOS, dead=[DEAD])
+
+
+def test_identical_request_is_replayed(make_generator, youtube):
+    generator = make_generator({'main': youtube})
+
+    async def scenario():
+        first = await generator.create_playlist(video_urls(VIDEOS), custom_title='Mix')
+        second = await generator.create_playlist(video_urls(VIDEOS), custom_title='Mix')
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert second.reused and not first.reused
+    assert second.playlist_id == first.playlist_id
+    assert len(youtube.contents) == 1
+
+
+def test_identical_request_outside_window_creates_new_playlist(make_generator, youtube):
+    generator = make_generator({'main': youtube}, idempotency_window_seconds=0)
+
+    async def scenario():
+        first = await generator.create_playlist(video_urls(VIDEOS), custom_title='Mix')
+        second = await generator.create_playlist(video_urls(VIDEOS), custom_title='Mix')
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert not second.reused
+    assert second.playlist_id != first.playlist_id
+
+
+def test_key_reused_for_different_request_is_a_conflict(make_generator, youtube):
+    generator = make_generator({'main': youtube})
+
+    async def scenario():
+        await generator.create_playlist(video_urls(VIDEOS), custom_title='Mix', idempotency_key='k1')
+        await generator.create_playlist(video_urls(VIDEOS[:2]), custom_title='Mix', idempotency_key='k1')
+
+    with pytest.raises(IdempotencyConflictError, match='different request'):
+        asyncio.run(scenario())
+
+
+def test_repeat_resumes_a_partly_filled_playlist_quietly(make_generator, database, youtube, caplog):
+    generator = make_generator({'main': youtube})
+
+    async def scenario():
+        first = await generator.create_playlist(video_urls(VIDEOS + [DEAD]), custom_title='Mix')
+        youtube.dead.clear()
+        caplog.clear()
+        second = await generator.create_playlist(video_urls(VIDEOS + [DEAD]), custom_title='Mix')
+        return first, second
+
+    with caplog.at_level(logging.INFO):
+        first, second = asyncio.run(scenario())
+
+    assert first.video_count == len(VIDEOS)
+    assert second.playlist_id == first.playlist_id
+    assert database.get_playlist_job(first.job_id)['status'] == 'completed'
+    assert youtube.video_ids(first.playlist_id) == VIDEOS + [DEAD]
+    assert not [record for record in caplog.records if record.levelno >= logging.ERROR]
+
+
+def test_key_of_job_out_of_attempts_is_a_conflict(make_generator, youtube):
+    generator = make_generator({'main': youtube}, max_job_attempts=2)
+
+    async def scenario():
+        for _ in range(2):
+            await generator.create_playlist(video_urls(VIDEOS + [DEAD]), custom_title='Mix', idempotency_key='k1')
+        await generator.create_playlist(video_urls(VIDEOS + [DEAD]), custom_title='Mix', idempotency_key='k1')
+
+    with pytest.raises(IdempotencyConflictError, match='failed after 2 attempts'):
+        asyncio.run(scenario())
+    assert len(youtube.contents) == 1
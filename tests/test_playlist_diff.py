@@ -0,0 +1,102 @@
+"""
+diff_playlist(): the edits must reach the target in order, touching as few items as possible
+"""
+import random
+
+import pytest
+
+from src.playlist_diff import diff_playlist, longest_increasing_subsequence
+
+
+def playlist(video_ids):
+    return [(video_id, f"item-{video_id}-{i}") for i, video_id in enumerate(video_ids)]
+
+
+def apply_edits(current, edits):
+    """Replay edits the way YouTube applies them, one at a time"""
+    items = list(current)
+    for edit in edits:
+        if edit.op in ('delete', 'move'):
+            index = next(i for i, (_, item_id) in enumerate(items) if item_id == edit.item_id)
+            item = items.pop(index)
+            if edit.op == 'move':
+                items.insert(edit.position, item)
+        else:
+            items.insert(edit.position, (edit.video_id, None))
+    return [video_id for video_id, _ in items]
+
+
+def common_subsequence_length(current, target):
+    """Longest common subsequence of two video ID lists (O(n*m) reference)"""
+    lengths = [[0] * (len(target) + 1) for _ in range(len(current) + 1)]
+    for i, left in enumerate(current):
+        for j, right in enumerate(target):
+            lengths[i + 1][j + 1] = (
+                lengths[i][j] + 1 if left == right else max(lengths[i][j + 1], lengths[i + 1][j])
+            )
+    return lengths[-1][-1]
+
+
+def test_unchanged_playlist_needs_no_edits():
+    assert diff_playlist(playlist('abcde'), list('abcde')) == []
+
+
+@pytest.mark.parametrize('current, target, ops', [
+    ('abc', 'abcd', ['insert']),
+    ('abc', 'dabc', ['insert']),
+    ('abcd', 'abd', ['delete']),
+    ('abcde', 'abdce', ['move']),
+    ('abcde', 'eabcd', ['move']),
+    ('abcd', 'dcba', ['move', 'move', 'move']),
+    ('abc', 'xyz', ['delete', 'delete', 'delete', 'insert', 'insert', 'insert']),
+])
+def test_small_edits(current, target, ops):
+    edits = diff_playlist(playlist(current), list(target))
+
+    assert [edit.op for edit in edits] == ops
+    assert apply_edits(playlist(current), edits) == list(target)
+
+
+def test_deletes_come_first_then_target_order():
+    edits = diff_playlist(playlist('abcdef'), list('fxbdy'))
+
+    ops = [edit.op for edit in edits]
+    assert ops == sorted(ops, key=lambda op: op != 'delete')
+    placed = [edit.index for edit in edits if edit.op != 'delete']
+    assert placed == sorted(placed)
+
+
+def test_duplicate_in_current_is_moved_once_and_spare_deleted():
+    current = playlist('abab')
+    edits = diff_playlist(current, list('ba'))
+
+    assert apply_edits(current, edits) == ['b', 'a']
+    assert len(edits) == 2
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_random_playlists_reach_target_with_fewest_edits(seed):
+    rng = random.Random(seed)
+    pool = [f"v{i}" for i in range(30)]
+    current = playlist(rng.choices(pool, k=rng.randint(0, 25)))
+    target = rng.sample(pool, rng.randint(0, 25))
+
+    edits = diff_playlist(current, target)
+
+    assert apply_edits(current, edits) == target
+    # Every item outside a longest common subsequence has to be touched exactly once
+    kept = common_subsequence_length([video_id for video_id, _ in current], target)
+    moves = sum(edit.op == 'move' for edit in edits)
+    assert sum(edit.op == 'insert' for edit in edits) + moves == len(target) - kept
+    assert sum(edit.op == 'delete' for edit in edits) + moves == len(current) - kept
+
+
+def test_longest_increasing_subsequence():
+    values = [3, 1, 4, 1, 5, 9, 2, 6]
+    indexes = longest_increasing_subsequence(values)
+
+    assert len(indexes) == 4
+    assert indexes == sorted(indexes)
+    picked = [values[i] for i in indexes]
+    assert picked == sorted(set(picked))
+    assert longest_increasing_subsequence([]) == []
@@ -0,0 +1,68 @@
+"""
+add_videos_to_playlist(): batched inserts and the sequential fallback
+"""
+import pytest
+
+from .fakes import FakeYouTube
+
+VIDEOS = [f'v{i:010d}' for i in range(6)]
+
+
+@pytest.fixture
+def youtube():
+    return FakeYouTube(videos=VIDEOS, dead=['dead0000000'])
+
+
+def new_playlist(youtube):
+    return youtube.playlists().insert(part='snippet', body={'snippet': {}}).execute()['id']
+
+
+def test_batch_appends_in_order_with_one_request_per_video(make_generator, youtube):
+    generator = make_generator({'main': youtube})
+    playlist_id = new_playlist(youtube)
+
+    results = generator.add_videos_to_playlist(playlist_id, VIDEOS)
+
+    assert all(result['success'] for result in results)
+    assert youtube.video_ids(playlist_id) == VIDEOS
+    assert youtube.calls.count('playlistItems.insert') == len(VIDEOS)
+
+
+def test_dead_video_does_not_push_later_ones_past_the_end(make_generator, youtube):
+    generator = make_generator({'main': youtube})
+    playlist_id = new_playlist(youtube)
+    video_ids = VIDEOS[:1] + ['dead0000000'] + VIDEOS[1:]
+
+    results = generator.add_videos_to_playlist(playlist_id, video_ids)
+
+    assert [result['success'] for result in results] == [True, False] + [True] * 5
+    assert youtube.video_ids(playlist_id) == VIDEOS
+    # Nothing is retried: one insert per video
+    assert youtube.calls.count('playlistItems.insert') == len(video_ids)
+
+
+def test_rejected_positions_fall_back_to_sequential_inserts(make_generator, youtube):
+    generator = make_generator({'main': youtube})
+    playlist_id = new_playlist(youtube)
+    # An interrupted attempt already inserted videos 0 and 2, so the batch has to place videos by position
+    for video_id in (VIDEOS[0], VIDEOS[2]):
+        youtube.playlistItems().insert(part='snippet', body={'snippet': {
+            'playlistId': playlist_id, 'resourceId': {'videoId': video_id}
+        }}).execute()
+    inserted = {0: youtube.contents[playlist_id][0][0], 2: youtube.contents[playlist_id][1][0]}
+    youtube.reverse_batches = True
+
+    results = generator.add_videos_to_playlist(playlist_id, VIDEOS, inserted=inserted)
+
+    assert all(result['success'] for result in results)
+    assert youtube.video_ids(playlist_id) == VIDEOS
+
+
+def test_sequential_mode(make_generator, youtube):
+    generator = make_generator({'main': youtube})
+    playlist_id = new_playlist(youtube)
+
+    results = generator.add_videos_to_playlist(playlist_id, VIDEOS[:3] + ['dead0000000'], batched=False)
+
+    assert [result['success'] for result in results] == [True, True, True, False]
+    assert youtube.video_ids(playlist_id) == VIDEOS[:3]
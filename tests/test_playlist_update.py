@@ -0,0 +1,62 @@
+"""
+update_playlist(): edit a stored playlist in place
+"""
+import asyncio
+
+import pytest
+
+from src.playlist_core import IdempotencyConflictError
+
+from .fakes import FakeYouTube, video_urls
+
+LIST_A = [f'a{i:010d}' for i in range(5)]
+LIST_B = [LIST_A[3], LIST_A[0], 'b0000000000', LIST_A[1]]
+
+
+@pytest.fixture
+def youtube():
+    return FakeYouTube(videos=LIST_A + LIST_B)
+
+
+def test_update_reaches_new_list(make_generator, database, youtube):
+    generator = make_generator({'main': youtube})
+
+    async def scenario():
+        created = await generator.create_playlist(video_urls(LIST_A), custom_title='Mix')
+        updated = await generator.update_playlist(created.job_id, video_urls(LIST_B))
+        return created, updated
+
+    created, updated = asyncio.run(scenario())
+
+    assert updated.success
+    assert youtube.video_ids(created.playlist_id) == LIST_B
+    stored = database.get_playlist_by_id(created.job_id)
+    assert [v['video_id'] for v in stored['videos']] == LIST_B
+
+
+def test_resubmitting_original_after_update_creates_new_playlist(make_generator, youtube):
+    generator = make_generator({'main': youtube})
+
+    async def scenario():
+        created = await generator.create_playlist(video_urls(LIST_A), custom_title='Mix')
+        await generator.update_playlist(created.job_id, video_urls(LIST_B))
+        again = await generator.create_playlist(video_urls(LIST_A), custom_title='Mix')
+        return created, again
+
+    created, again = asyncio.run(scenario())
+
+    assert again.success and not again.reused
+    assert again.playlist_id != created.playlist_id
+    assert youtube.video_ids(again.playlist_id) == LIST_A
+
+
+def test_keyed_retry_after_update_is_a_conflict(make_generator, youtube):
+    generator = make_generator({'main': youtube})
+
+    async def scenario():
+        created = await generator.create_playlist(video_urls(LIST_A), custom_title='Mix', idempotency_key='k1')
+        await generator.update_playlist(created.job_id, video_urls(LIST_B))
+        await generator.create_playlist(video_urls(LIST_A), custom_title='Mix', idempotency_key='k1')
+
+    with pytest.raises(IdempotencyConflictError, match='edited'):
+        asyncio.run(scenario())
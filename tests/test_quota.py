@@ -0,0 +1,74 @@
+"""
+YouTube quota budget and token bucket
+"""
+import pytest
+
+from src.quota import QuotaExceededError, QuotaScheduler
+
+
+def test_calls_are_charged_to_the_shared_ledger(database):
+    quota = QuotaScheduler(database, daily_limit=1000)
+    quota.acquire('videos.list')
+    quota.acquire('playlists.insert')
+
+    assert quota.stats()['used_today'] == 51
+    # Another process reading the same ledger sees the calls
+    assert QuotaScheduler(database, daily_limit=1000).remaining() == 949
+
+
+def test_ledger_is_per_account(database):
+    QuotaScheduler(database, daily_limit=1000, account='main').acquire('playlists.insert')
+
+    assert QuotaScheduler(database, daily_limit=1000, account='main').remaining() == 950
+    assert QuotaScheduler(database, daily_limit=1000, account='backup').remaining() == 1000
+
+
+def test_reservation_is_checked_against_the_daily_budget(database):
+    quota = QuotaScheduler(database, daily_limit=1000)
+
+    with pytest.raises(QuotaExceededError):
+        quota.reserve(1001)
+    assert quota.stats()['reserved'] == 0
+
+
+def test_reservations_are_not_paced_by_the_bucket(database):
+    quota = QuotaScheduler(database, daily_limit=10000, burst_units=100, max_wait_seconds=0)
+
+    # Far more than the bucket holds, in sequence
+    for videos in (51, 8, 30):
+        with quota.reserve(50 + 50 * videos):
+            quota.acquire('playlists.insert')
+            for _ in range(videos):
+                quota.acquire('playlistItems.insert')
+
+    stats = quota.stats()
+    assert stats['used_today'] == 50 * 92
+    assert stats['reserved'] == 0
+
+
+def test_unused_reservation_is_released(database):
+    quota = QuotaScheduler(database, daily_limit=1000)
+
+    with quota.reserve(500):
+        quota.acquire('playlists.insert')
+        assert quota.remaining() == 500
+
+    assert quota.remaining() == 950
+
+
+def test_unreserved_calls_are_paced_by_the_bucket(database):
+    quota = QuotaScheduler(database, daily_limit=10000, burst_units=100, max_wait_seconds=0)
+    quota.acquire('playlists.insert')
+    quota.acquire('playlists.insert')
+
+    with pytest.raises(QuotaExceededError):
+        quota.acquire('playlists.insert')
+
+
+def test_exhausted_budget_rejects_calls(database):
+    quota = QuotaScheduler(database, daily_limit=1000)
+    quota.exhaust()
+
+    assert quota.remaining() == 0
+    with pytest.raises(QuotaExceededError):
+        quota.acquire('videos.list')
@@ -0,0 +1,82 @@
+"""
+Split mode: one request, several playlists spread over the YouTube accounts
+"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import api
+from src.quota import QuotaExceededError
+
+from .fakes import FakeYouTube, video_urls
+
+VIDEOS = [f'v{i:010d}' for i in range(400)]
+
+
+@pytest.fixture
+def services():
+    return {'a': FakeYouTube(videos=VIDEOS), 'b': FakeYouTube(videos=VIDEOS)}
+
+
+def owners(services, result):
+    """Account each part's playlist was created on"""
+    return [
+        next(name for name, youtube in services.items() if part.playlist_id in youtube.contents)
+        for part in result.parts
+    ]
+
+
+def test_parts_spread_over_accounts(make_generator, services):
+    # 150 videos cost 7,550 units, so two parts cannot both fit on one 10,000-unit account
+    generator = make_generator(services, daily_quota=10000)
+
+    result = asyncio.run(generator.create_playlist(video_urls(VIDEOS[:300]), custom_title='Mix', split_size=150))
+
+    assert result.success
+    assert sorted(owners(services, result)) == ['a', 'b']
+    assert [part.title for part in result.parts] == ['Mix (Part 1/2)', 'Mix (Part 2/2)']
+    assert [part.description for part in result.parts] == [
+        'Playlist with 150 videos created by YouTube Playlist Generator'
+    ] * 2
+    assert result.description == 'Playlist with 300 videos created by YouTube Playlist Generator'
+
+
+def test_request_larger_than_all_accounts_is_rejected_up_front(make_generator, services):
+    generator = make_generator(services, daily_quota=10000)
+
+    with pytest.raises(QuotaExceededError):
+        asyncio.run(generator.create_playlist(video_urls(VIDEOS), custom_title='Mix', split_size=150))
+
+    assert not any(youtube.contents for youtube in services.values())
+
+
+def test_parts_that_do_not_fit_fail_alone(make_generator, services):
+    # 18,150 units fit in 20,000 overall, but no account has room for all of its share
+    generator = make_generator(services, daily_quota=10000)
+
+    result = asyncio.run(generator.create_playlist(video_urls(VIDEOS[:360]), custom_title='Mix', split_size=150))
+
+    assert not result.success
+    assert [part.success for part in result.parts].count(True) == 2
+    assert 'quota' in result.error
+
+
+def test_api_answers_207_with_the_created_parts(make_generator, services):
+    generator = make_generator(services, daily_quota=10000)
+    api.app.dependency_overrides[api.get_playlist_generator] = lambda: generator
+    try:
+        response = TestClient(api.app).post('/api/v1/playlists', json={
+            'videos': video_urls(VIDEOS[:360]),
+            'title': 'Mix',
+            'split_size': 150
+        })
+    finally:
+        api.app.dependency_overrides.clear()
+
+    assert response.status_code == 207
+    body = response.json()
+    assert not body['success']
+    created = [part for part in body['parts'] if part['success']]
+    assert len(created) == 2
+    assert all(part['playlist_id'] for part in created)
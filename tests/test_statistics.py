@@ -0,0 +1,140 @@
+"""
+Statistics served from rollups kept up to date on every save
+"""
+import pytest
+
+from src.database import PlaylistDatabase
+
+
+def videos(*video_ids):
+    return [{'video_id': video_id, 'title': f"Video {video_id}", 'duration': 'PT1M30S'} for video_id in video_ids]
+
+
+def save(database, playlist_id, user, video_list):
+    assert database.save_playlist(
+        playlist_id=playlist_id,
+        youtube_id=f'PL{playlist_id}',
+        title=f'Playlist {playlist_id}',
+        url=f'https://www.youtube.com/playlist?list=PL{playlist_id}',
+        video_count=len(video_list),
+        user_identifier=user,
+        videos=video_list
+    )
+
+
+@pytest.fixture
+def stats_database(database):
+    save(database, 'p1', 'alice', videos('x', 'y'))
+    save(database, 'p2', 'alice', videos('x'))
+    save(database, 'p3', 'bob', videos('x', 'z', 'y'))
+    return database
+
+
+def restart(database):
+    """Open the same file again, as a new process would"""
+    return PlaylistDatabase(database.db_path)
+
+
+def assert_matches_rebuild(database, *users):
+    """The incrementally maintained rollups equal the ones rebuilt from scratch"""
+    before = {user: database.get_statistics(user) for user in users}
+    assert database.rebuild_statistics()
+    assert {user: database.get_statistics(user) for user in users} == before
+
+
+def test_totals_overall_and_per_user(stats_database):
+    overall = stats_database.get_statistics()
+    alice = stats_database.get_statistics('alice')
+
+    assert (overall['total_playlists'], overall['total_videos']) == (3, 6)
+    assert overall['playlists_today'] == overall['playlists_this_week'] == overall['playlists_this_month'] == 3
+    assert overall['total_runtime_seconds'] == 6 * 90
+    assert overall['average_playlist_size'] == 2
+    assert overall['most_common_videos'][0]['video_id'] == 'x'
+    assert overall['most_common_videos'][0]['count'] == 3
+
+    assert (alice['total_playlists'], alice['total_videos']) == (2, 3)
+    assert alice['average_playlist_runtime_seconds'] == 135
+    assert stats_database.count_playlists() == 3
+    assert stats_database.count_playlists('bob') == 1
+    assert_matches_rebuild(stats_database, None, 'alice', 'bob')
+
+
+def test_bulk_import_updates_rollups(database):
+    saved = database.save_playlists_bulk(
+        (
+            {
+                'playlist_id': f'b{i}',
+                'youtube_id': f'PLb{i}',
+                'title': f'Imported {i}',
+                'url': f'https://www.youtube.com/playlist?list=PLb{i}',
+                'user_identifier': 'carol',
+                'videos': videos('x', f'only{i}')
+            }
+            for i in range(7)
+        ),
+        chunk_size=3
+    )
+
+    assert saved == 7
+    carol = database.get_statistics('carol')
+    assert (carol['total_playlists'], carol['total_videos']) == (7, 14)
+    assert carol['most_common_videos'][0] == {'video_id': 'x', 'video_title': 'Video x', 'count': 7}
+    assert_matches_rebuild(database, None, 'carol')
+
+
+def test_replaced_videos_move_the_totals(stats_database):
+    assert stats_database.replace_playlist_videos('p3', videos('z'))
+
+    bob = stats_database.get_statistics('bob')
+    assert (bob['total_playlists'], bob['total_videos']) == (1, 1)
+    assert [v['video_id'] for v in bob['most_common_videos']] == ['z']
+    assert stats_database.get_statistics()['total_videos'] == 4
+    assert_matches_rebuild(stats_database, None, 'alice', 'bob')
+
+
+def test_existing_playlists_are_rolled_up_on_first_start(stats_database):
+    with stats_database.get_connection() as conn:
+        conn.execute('DELETE FROM user_stats')
+        conn.execute('DELETE FROM daily_stats')
+        conn.execute('DELETE FROM video_popularity')
+
+    restarted = restart(stats_database)
+
+    assert restarted.get_statistics()['total_playlists'] == 3
+    assert restarted.get_statistics('alice')['total_videos'] == 3
+    restarted.close()
+
+
+def test_api_calls_are_counted_per_service(database):
+    for _ in range(3):
+        database.log_api_usage('youtube', 'videos.list', cost_estimate=1)
+    database.log_api_usage('openai', 'title_generation', tokens_used=20)
+
+    assert database.get_api_usage_counts() == {'youtube': 3, 'openai': 1}
+
+    # A ledger from before the rollup existed is counted once on startup
+    with database.get_connection() as conn:
+        conn.execute('DELETE FROM api_usage_stats')
+    restarted = restart(database)
+    assert restarted.get_api_usage_counts() == {'youtube': 3, 'openai': 1}
+    restarted.close()
+
+
+def test_trigger_maintained_counters_are_dropped(database):
+    with database.get_connection() as conn:
+        conn.execute('CREATE TABLE playlist_counters (name TEXT PRIMARY KEY, count INTEGER NOT NULL DEFAULT 0)')
+        conn.execute('''
+            CREATE TRIGGER trg_playlists_count_insert AFTER INSERT ON playlists
+            BEGIN
+                UPDATE playlist_counters SET count = count + 1 WHERE name = 'all';
+            END
+        ''')
+
+    restart(database).close()
+
+    with database.get_connection() as conn:
+        leftovers = conn.execute(
+            "SELECT name FROM sqlite_master WHERE name IN ('playlist_counters', 'trg_playlists_count_insert')"
+        ).fetchall()
+    assert leftovers == []
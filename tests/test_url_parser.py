@@ -0,0 +1,74 @@
+"""
+URL forms accepted by the API and the Telegram bot
+"""
+import pytest
+
+from src.url_parser import extract_video_ids, find_youtube_urls, iter_sources
+
+VIDEO_ID = 'dQw4w9WgXcQ'
+
+
+@pytest.mark.parametrize('url', [
+    f'https://www.youtube.com/watch?v={VIDEO_ID}',
+    f'http://youtube.com/watch?v={VIDEO_ID}',
+    f'youtube.com/watch?v={VIDEO_ID}',
+    f'https://m.youtube.com/watch?v={VIDEO_ID}',
+    f'https://music.youtube.com/watch?v={VIDEO_ID}',
+    f'https://www.youtube.com/watch?feature=share&v={VIDEO_ID}',
+    f'https://www.youtube.com/watch?v={VIDEO_ID}&t=42s&list=PL123',
+    f'https://youtu.be/{VIDEO_ID}',
+    f'https://youtu.be/{VIDEO_ID}?si=abc&t=10',
+    f'https://www.youtube.com/embed/{VIDEO_ID}',
+    f'https://www.youtube-nocookie.com/embed/{VIDEO_ID}',
+    f'https://www.youtube.com/shorts/{VIDEO_ID}',
+    f'https://www.youtube.com/live/{VIDEO_ID}?feature=share',
+    f'https://www.youtube.com/v/{VIDEO_ID}',
+])
+def test_video_url_forms(url):
+    assert extract_video_ids([url]) == [VIDEO_ID]
+
+
+@pytest.mark.parametrize('url', [
+    'https://www.youtube.com/watch?v=short',
+    f'https://www.youtube.com/watch?v={VIDEO_ID}X',
+    f'https://example.com/watch?v={VIDEO_ID}',
+    'https://www.youtube.com/',
+    'not a url',
+])
+def test_rejected_urls(url):
+    assert extract_video_ids([url]) == []
+
+
+def test_ids_are_unique_and_keep_input_order():
+    urls = [
+        'https://youtu.be/bbbbbbbbbbb',
+        f'https://youtu.be/{VIDEO_ID}',
+        f'https://www.youtube.com/watch?v={VIDEO_ID}',
+        'https://youtu.be/bbbbbbbbbbb?t=5',
+    ]
+    assert extract_video_ids(urls) == ['bbbbbbbbbbb', VIDEO_ID]
+
+
+def test_sources_are_classified():
+    urls = [
+        f'https://www.youtube.com/watch?v={VIDEO_ID}&list=PLabcdef',
+        'https://www.youtube.com/playlist?list=PLabcdef',
+        'https://www.youtube.com/@SomeChannel',
+        'https://www.youtube.com/channel/UC' + 'x' * 22,
+        'https://www.youtube.com/user/someone',
+    ]
+    assert list(iter_sources(urls)) == [
+        ('video', VIDEO_ID),
+        ('playlist', 'PLabcdef'),
+        ('handle', '@SomeChannel'),
+        ('channel', 'UC' + 'x' * 22),
+        ('user', 'someone'),
+    ]
+
+
+def test_urls_found_in_chat_text():
+    text = f"Watch youtu.be/{VIDEO_ID}, and https://www.youtube.com/playlist?list=PLabcdef."
+    assert find_youtube_urls(text) == [
+        f'https://youtu.be/{VIDEO_ID}',
+        'https://www.youtube.com/playlist?list=PLabcdef',
+    ]
@@ -0,0 +1,24 @@
+"""
+Services built from the static discovery document
+"""
+from src import youtube_service
+
+
+def test_channels_can_be_looked_up_by_handle():
+    youtube = youtube_service.build_service(developer_key='test-key')
+
+    request = youtube.channels().list(part='contentDetails', forHandle='@GoogleDevelopers')
+
+    assert 'forHandle=%40GoogleDevelopers' in request.uri
+
+
+def test_missing_parameters_are_declared_without_replacing_newer_ones():
+    newer = {'description': 'From a newer document', 'location': 'query', 'type': 'string'}
+    document = {'resources': {'channels': {'methods': {'list': {'parameters': {'forHandle': newer}}}}}}
+    older = {'resources': {'channels': {'methods': {'list': {'parameters': {}}}}}}
+
+    youtube_service._add_missing_parameters(document)
+    youtube_service._add_missing_parameters(older)
+
+    assert document['resources']['channels']['methods']['list']['parameters']['forHandle'] is newer
+    assert 'forHandle' in older['resources']['channels']['methods']['list']['parameters']